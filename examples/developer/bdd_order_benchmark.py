@@ -0,0 +1,66 @@
+"""Time to solve `gridworld` games with different BDD variable orders.
+
+Each world has trolls (environment agents), so the specification
+has variables of several transition systems. Usage:
+
+    python bdd_order_benchmark.py [size] [n_trolls] [seed]
+"""
+from __future__ import print_function
+
+import logging
+import random
+import sys
+import time
+
+import numpy as np
+from tulip import gridworld
+from tulip.interfaces import omega as omega_int
+
+
+logging.getLogger('dd').setLevel('ERROR')
+logging.getLogger('omega').setLevel('ERROR')
+
+
+def make_spec(size, n_trolls, seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    Y = gridworld.random_world(
+        (size, size), wall_density=0.2, num_init=1,
+        num_goals=2, prefix='Y', ensure_feasible=True)
+    cells = [(i, j) for i in range(size) for j in range(size)
+             if Y.is_empty((i, j))]
+    trolls = [(c, 1) for c in random.sample(cells, n_trolls)]
+    spec, _ = gridworld.add_trolls(Y, trolls)
+    spec.moore = False
+    spec.qinit = r'\A \E'
+    return spec
+
+
+def run(spec, order):
+    """Return seconds to build and solve, and BDD size."""
+    t0 = time.time()
+    s = omega_int.SynthesisSession(spec, order=order)
+    t1 = time.time()
+    s.is_realizable()
+    t2 = time.time()
+    return t1 - t0, t2 - t1, len(s.bdd), s.is_realizable()
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    n_trolls = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    spec = make_spec(size, n_trolls, seed)
+    print('{n}x{n} world, {t} trolls'.format(n=size, t=n_trolls))
+    print('dependency order: {v}'.format(
+        v=omega_int.variable_order(spec)))
+    for order in (None,) + omega_int.ORDERINGS:
+        build, solve, nodes, r = run(spec.copy(), order)
+        print((
+            '{o:>12}: build {b:.2f} sec, solve {s:.2f} sec, '
+            '{n} nodes, realizable: {r}').format(
+                o=str(order), b=build, s=solve, n=nodes, r=r))
+
+
+if __name__ == '__main__':
+    main()
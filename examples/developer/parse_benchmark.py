@@ -0,0 +1,65 @@
+"""Throughput of the LTL parsers on generated specifications.
+
+The clauses are those of `synth.sys_to_spec` for random
+transition systems. Usage:
+
+    python parse_benchmark.py [n_states] [out_degree]
+"""
+from __future__ import division
+from __future__ import print_function
+
+import random
+import sys
+import time
+
+from tulip import synth
+from tulip import transys as trs
+from tulip.spec import parser
+
+
+def random_fts(n, degree, seed=0):
+    rng = random.Random(seed)
+    states = ['s{i}'.format(i=i) for i in range(n)]
+    ts = trs.FTS()
+    ts.states.add_from(states)
+    ts.states.initial.add(states[0])
+    ts.atomic_propositions.add_from({'home', 'lot'})
+    for u in states:
+        for v in rng.sample(states, degree):
+            ts.transitions.add(u, v)
+    ts.states.add(states[0], ap={'home'})
+    ts.states.add(states[-1], ap={'lot'})
+    return ts
+
+
+def clauses(n, degree):
+    ts = random_fts(n, degree)
+    spec = synth.sys_to_spec(ts, ignore_initial=False, statevar='loc')
+    return [f for p in spec._parts for f in getattr(spec, p)]
+
+
+def throughput(formulas, name):
+    """Return MB/s of parsing C{formulas} with parser C{name}."""
+    parser.parse('a', parser=name)  # build parser
+    size = sum(len(f) for f in formulas)
+    t0 = time.time()
+    for f in formulas:
+        parser.parse(f, parser=name)
+    t1 = time.time()
+    return size / (t1 - t0) / 2**20
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    degree = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    formulas = clauses(n, degree)
+    size = sum(len(f) for f in formulas)
+    print('{m} clauses, {s:.2f} MB'.format(
+        m=len(formulas), s=size / 2**20))
+    for name in ('ply', 'opp'):
+        print('{name}: {r:.2f} MB/s'.format(
+            name=name, r=throughput(formulas, name)))
+
+
+if __name__ == '__main__':
+    main()
@@ -178,11 +178,15 @@ def main():
 
     else:
         base = [
+            'cache_test',
             'dumpsmach_test',
             'form_test',
             'gr1_test',
+            'gr1c_session_test',
+            'interfaces_process_test',
             'omega_interface_test',
             'spec_test',
+            'spec_opparser_test',
             'synth_test',
             'transform_test',
             'translation_test',
@@ -192,6 +196,8 @@ def main():
             'transys_mathset_test',
             'transys_ts_test',
             'transys_simu_abstract_test',
+            'transys_symbolic_test',
+            'transys_export_test',
             'gridworld_test']
         hybrid = [
             'abstract_test',
@@ -0,0 +1,132 @@
+"""Tests for the persistent cache of synthesis results."""
+import logging
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+
+from nose.tools import assert_raises
+from tulip import cache, spec, synth, transys
+
+
+logging.getLogger('tulip').setLevel('ERROR')
+logging.getLogger('omega').setLevel('ERROR')
+
+
+def cycle_fts():
+    ts = transys.FTS()
+    ts.states.add_from(['s0', 's1', 's2'])
+    ts.states.initial.add('s0')
+    ts.atomic_propositions.add('home')
+    ts.states.add('s0', ap={'home'})
+    ts.transitions.add_from([('s0', 's1'), ('s1', 's2'), ('s2', 's0')])
+    return ts
+
+
+def _put(path, key, value):
+    c = cache.SynthesisCache(path)
+    c[key] = value
+    # other writers may have replaced the value meanwhile
+    assert c[key] in (0, 1)
+
+
+class SynthesisCache_test(object):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.cache = cache.SynthesisCache(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_get_set(self):
+        c = self.cache
+        with assert_raises(KeyError):
+            c['ab12']
+        assert (c.hits, c.misses) == (0, 1)
+        c['ab12'] = {'x': 1}
+        assert 'ab12' in c
+        assert c['ab12'] == {'x': 1}
+        assert (c.hits, c.misses) == (1, 1)
+        # another instance sees the entry
+        other = cache.SynthesisCache(self.path)
+        assert other['ab12'] == {'x': 1}
+        assert len(other) == 1
+        c.clear()
+        assert len(c) == 0
+        assert 'ab12' not in c
+
+    def test_lru_eviction(self):
+        c = self.cache
+        c['aa'] = 'a' * 1000
+        size = c.size()
+        c.max_size = 3 * size
+        c['bb'] = 'b' * 1000
+        c['cc'] = 'c' * 1000
+        # mark `aa` as used more recently than `bb`
+        os.utime(c._fname('bb'), (0, 0))
+        c['aa']
+        c['dd'] = 'd' * 1000
+        assert len(c) == 3, len(c)
+        assert 'bb' not in c
+        assert all(k in c for k in ('aa', 'cc', 'dd'))
+        assert c.size() <= c.max_size
+
+    def test_key(self):
+        c = self.cache
+        s = spec.GRSpec(sys_vars={'x'}, sys_prog=['x'])
+        k = c.key(s, 'omega')
+        assert k == c.key(s.copy(), 'omega')
+        assert k != c.key(s, 'gr1py')
+        assert k != c.key(s, 'omega', 'is_realizable')
+        assert k != c.key(s, 'omega', rm_deadends=False)
+        r = s.copy()
+        r.qinit = r'\E \E'
+        assert k != c.key(r, 'omega')
+        # same formula, other domain
+        r = spec.GRSpec(sys_vars={'x': (0, 3)}, sys_prog=['x'])
+        assert k != c.key(r, 'omega')
+
+    def test_arithmetic(self):
+        # gr1c cannot express `+`, omega can
+        c = self.cache
+        s = spec.GRSpec(
+            env_vars={'x': (0, 3)}, sys_vars={'y': (0, 7)},
+            sys_safety=['y = x + 1'])
+        r = synth.is_realizable(s, solver='omega')
+        assert synth.is_realizable(s, solver='omega', cache=c) == r
+        assert synth.is_realizable(s, solver='omega', cache=c) == r
+        assert (c.hits, c.misses) == (1, 1)
+
+    def test_synthesize(self):
+        c = self.cache
+        specs = spec.GRSpec(sys_prog='home', qinit=r'\E \E')
+        sys = cycle_fts()
+        m = synth.synthesize(specs, sys=sys, cache=c)
+        assert (c.hits, c.misses) == (0, 1)
+        m_ = synth.synthesize(specs, sys=sys, cache=c)
+        assert (c.hits, c.misses) == (1, 1)
+        assert len(m) == len(m_), (len(m), len(m_))
+        r = synth.is_realizable(specs, sys=sys, cache=c)
+        assert r
+        assert (c.hits, c.misses) == (1, 2)
+        assert synth.is_realizable(specs, sys=sys, cache=c)
+        assert (c.hits, c.misses) == (2, 2)
+        # unrealizable results are cached too
+        specs.sys_prog = ['False']
+        assert synth.synthesize(specs, sys=sys, cache=c) is None
+        assert synth.synthesize(specs, sys=sys, cache=c) is None
+        assert (c.hits, c.misses) == (3, 3)
+
+    def test_concurrent_writers(self):
+        procs = [mp.Process(target=_put, args=(self.path, 'ff00', i % 2))
+                 for i in range(4)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        assert all(p.exitcode == 0 for p in procs)
+        assert self.cache['ff00'] in (0, 1)
+        assert len(self.cache) == 1
+        # no temporary files left behind
+        (d, ) = os.listdir(self.path)
+        assert os.listdir(os.path.join(self.path, d)) == ['ff00.pickle']
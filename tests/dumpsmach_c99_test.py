@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+"""Tests of the C99 export of tulip.dumpsmach, using a C compiler.
+
+The compiler is C{cc}, or the value of the environment variable C{CC}.
+"""
+from __future__ import print_function
+
+import logging
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+
+from tulip import spec, synth, dumpsmach
+from tulip.transys import machines
+
+
+logging.getLogger('tulip').setLevel('ERROR')
+logging.getLogger('omega').setLevel('ERROR')
+
+
+DRIVER = r'''
+#include <stdio.h>
+#include "{name}.h"
+
+/* Read states and inputs from stdin, print step results. */
+int main(void)
+{{
+    {name}_state_t state;
+    {name}_input_t input;
+    {name}_output_t output;
+    long s;
+    int r;
+    {name}_init(&state);
+    printf("%ld\n", (long)state);
+    while (scanf("%ld", &s) == 1) {{
+        state = ({name}_state_t)s;
+{read}
+        r = {name}_step(&state, &input, &output);
+        if (r != {NAME}_OK) {{
+            printf("invalid %ld\n", (long)state);
+            continue;
+        }}
+        printf("%ld{fmt}\n", (long)state{args});
+    }}
+    return 0;
+}}
+'''
+
+
+def build(M, name, d):
+    """Compile the export of C{M} with a driver, return executable."""
+    base = os.path.join(d, name)
+    rom = dumpsmach.write_c99(base, M, name=name)
+    assert rom['total'] == sum(v for k, v in rom.items() if k != 'total')
+    c = dumpsmach.c99_rom_size(M)
+    assert c == rom, (c, rom)
+    inputs = sorted(M.inputs)
+    outputs = sorted(M.outputs)
+    driver = DRIVER.format(
+        name=name,
+        NAME=name.upper(),
+        read='\n'.join(
+            '        if (scanf("%ld", &s) != 1) return 1;\n'
+            '        input.{v} = (int32_t)s;'.format(v=v) for v in inputs),
+        fmt=' %ld' * len(outputs),
+        args=''.join(', (long)output.{v}'.format(v=v) for v in outputs))
+    with open(base + '_main.c', 'w') as f:
+        f.write(driver)
+    exe = base + '.out'
+    cc = os.environ.get('CC', 'cc')
+    subprocess.check_call([
+        cc, '-std=c99', '-Wall', '-Wextra', '-pedantic', '-Werror',
+        '-o', exe, base + '.c', base + '_main.c'])
+    return exe
+
+
+def encoder(dom):
+    """Return function from values to C integers."""
+    values = [x for x in dom if isinstance(x, str)]
+    if values:
+        index = {x: i for i, x in enumerate(sorted(values))}
+        return index.__getitem__
+    return int
+
+
+def check_differential(M, name, n=30, steps=20, invalid=None, seed=0):
+    """Assert the C export reacts as C{M.reaction} on random runs.
+
+    @param invalid: C{dict} of input values that are not labels of
+        any transition, tried with probability 0.1
+    """
+    d = tempfile.mkdtemp()
+    try:
+        exe = build(M, name, d)
+        states = list(M)
+        ids = {u: i for i, u in enumerate(states)}
+        inputs = sorted(M.inputs)
+        outputs = sorted(M.outputs)
+        enc_in = {k: encoder(M.inputs[k]) for k in inputs}
+        enc_out = {k: encoder(M.outputs[k]) for k in outputs}
+        rng = random.Random(seed)
+        lines = list()
+        expected = list()
+        for _ in range(n):
+            u = 'Sinit'
+            for _ in range(steps):
+                edges = M.edges(u, data=True)
+                if not edges:
+                    break
+                _, _, label = rng.choice(edges)
+                x = {k: label[k] for k in inputs}
+                if invalid and rng.random() < 0.1:
+                    k = rng.choice(sorted(invalid))
+                    x[k] = invalid[k]
+                lines.append(' '.join(
+                    str(s) for s in
+                    [ids[u]] + [enc_in[k](x[k]) for k in inputs]))
+                try:
+                    v, y = M.reaction(u, x)
+                except Exception:
+                    expected.append('invalid {i}'.format(i=ids[u]))
+                    continue
+                expected.append(' '.join(
+                    str(s) for s in
+                    [ids[v]] + [enc_out[k](y[k]) for k in outputs]))
+                u = v
+        p = subprocess.Popen(
+            [exe], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            universal_newlines=True)
+        out, _ = p.communicate('\n'.join(lines) + '\n')
+        assert p.returncode == 0, p.returncode
+        out = out.splitlines()
+        assert out[0] == str(ids['Sinit']), out[0]
+        assert out[1:] == expected, list(
+            zip(lines, out[1:], expected))[:5]
+    finally:
+        shutil.rmtree(d)
+
+
+def synthesized_test():
+    specs = spec.GRSpec(
+        env_vars={'x': (0, 2), 'door': 'boolean'},
+        sys_vars={'y': ['a', 'b'], 'z': (0, 3)},
+        sys_init=['z = 0'],
+        sys_safety=['(x = 0) -> (y = "a")', '(x > 0) -> (y = "b")',
+                    '(z < 3) -> (X z = z + 1)'],
+        sys_prog=['y = "a"', 'z = 3'],
+        env_prog=['x = 0'],
+        moore=False,
+        qinit=r'\A \E')
+    M = synth.synthesize(specs)
+    assert M is not None
+    check_differential(M, 'synthesized', invalid={'x': 5, 'door': 2})
+
+
+def string_inputs_test():
+    specs = spec.GRSpec(
+        env_vars={'mode': ['cruise', 'halt', 'park']},
+        sys_vars={'speed': (0, 2)},
+        sys_init=['speed = 0'],
+        env_safety=['(mode = "park") -> X(mode != "cruise")'],
+        sys_safety=['(mode = "halt") -> (speed = 0)',
+                    '(mode = "park") -> (speed = 0)'],
+        sys_prog=['speed = 2 | mode != "cruise"'],
+        moore=False,
+        qinit=r'\A \E')
+    M = synth.synthesize(specs)
+    assert M is not None
+    check_differential(M, 'modes', invalid={'mode': 'cruise'})
+
+
+def sparse_inputs_test():
+    """Binary search over values with a wide range."""
+    M = machines.MealyMachine()
+    M.add_inputs({'x': {-10**6, 0, 7, 10**6}, 'b': {0, 1}})
+    M.add_outputs({'y': {-3, 500}})
+    M.add_nodes_from(['Sinit', 'p', 'q'])
+    M.states.initial.add('Sinit')
+    for x in (-10**6, 0, 7, 10**6):
+        M.add_edge('Sinit', 'p', x=x, b=0, y=-3)
+        M.add_edge('p', 'q', x=x, b=1, y=500)
+    M.add_edge('q', 'Sinit', x=7, b=0, y=-3)
+    check_differential(M, 'sparse', invalid={'x': 8})
+    h, c = dumpsmach.c99(M, name='sparse')
+    assert 'sparse_search' in c
+    # dead-end
+    M.add_node('r')
+    M.add_edge('q', 'r', x=0, b=0, y=500)
+    check_differential(M, 'dead_end')
+
+
+def no_inputs_test():
+    M = machines.MealyMachine()
+    M.add_outputs({'y': {0, 1}})
+    M.add_nodes_from(['Sinit', 0, 1])
+    M.states.initial.add('Sinit')
+    M.add_edge('Sinit', 0, y=0)
+    M.add_edge(0, 1, y=1)
+    M.add_edge(1, 0, y=0)
+    check_differential(M, 'blink')
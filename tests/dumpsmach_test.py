@@ -3,11 +3,17 @@
 from __future__ import print_function
 
 import logging
+import os
+import random
+import runpy
+import shutil
+import tempfile
 
 import networkx as nx
 from nose.tools import assert_raises
 
 from tulip import spec, synth, dumpsmach
+from tulip.transys import machines
 
 
 logging.getLogger('tulip').setLevel('ERROR')
@@ -52,6 +58,95 @@ class basic_test(object):
                      +'\nM = TulipStrategy(); M.move()',
                      filename="<string>", mode="exec"))
 
+    def test_python_table(self):
+        for M in (self.triv_M, self.dcounter_M, self.enumf_M):
+            check_equivalent(M, dumpsmach.python_table(M))
+
+    def test_python_table_lazy(self):
+        d = tempfile.mkdtemp()
+        try:
+            sidecar = os.path.join(d, 'tables.pickle')
+            code = dumpsmach.python_table(self.triv_M, sidecar=sidecar)
+            assert os.path.isfile(sidecar)
+            check_equivalent(self.triv_M, code)
+            # module that finds its tables next to itself
+            fname = os.path.join(d, 'ctrl.py')
+            dumpsmach.write_python_table(
+                fname, self.dcounter_M, classname='Ctrl', lazy=True)
+            assert os.path.isfile(fname + '.pickle')
+            Ctrl = runpy.run_path(fname)['Ctrl']
+            assert Ctrl._transitions is None
+            m = Ctrl()
+            m.move()
+            assert Ctrl._transitions is not None
+            # machine passed by keyword
+            fname = os.path.join(d, 'ctrl_kw.py')
+            dumpsmach.write_python_table(
+                fname, M=self.dcounter_M, lazy=True)
+            assert os.path.isfile(fname + '.pickle')
+            m = runpy.run_path(fname)['TulipStrategy']()
+            m.move()
+        finally:
+            shutil.rmtree(d)
+
+
+def test_c99():
+    # compiled and run by `dumpsmach_c99_test`
+    M = machines.MealyMachine()
+    M.add_inputs({'tick': {0, 1}})
+    M.add_outputs({'light': {'red', 'green'}})
+    M.add_nodes_from(['Sinit', 'red', 'green'])
+    M.states.initial.add('Sinit')
+    M.add_edge('Sinit', 'red', tick=0, light='red')
+    M.add_edge('red', 'green', tick=1, light='green')
+    M.add_edge('green', 'red', tick=1, light='red')
+    h, c = dumpsmach.c99(M, name='light')
+    assert 'int light_step(' in h
+    assert '#define LIGHT_LIGHT_GREEN 0' in h
+    assert '#include "light.h"' in c
+    rom = dumpsmach.c99_rom_size(M)
+    # one byte for each state and input value
+    assert rom['next'] == rom['output'] == 6, rom
+    assert 'ROM of tables: {t} bytes'.format(t=rom['total']) in c
+    with assert_raises(ValueError):
+        dumpsmach.c99(M, name='not valid')
+    # must be input-deterministic
+    M.add_edge('green', 'green', tick=1, light='green')
+    with assert_raises(ValueError):
+        dumpsmach.c99(M)
+
+
+def check_equivalent(M, code, n=20, steps=30):
+    """Assert C{code} behaves as the output of C{python_case}."""
+    case = dict()
+    exec(dumpsmach.python_case(M), case)
+    table = dict()
+    exec(code, table)
+    inputs = list(M.inputs) if M.inputs else []
+    rng = random.Random(0)
+    for _ in range(n):
+        a = case['TulipStrategy']()
+        b = table['TulipStrategy']()
+        assert b.input_vars == inputs, b.input_vars
+        for _ in range(steps):
+            assert a.state == b.state, (a.state, b.state)
+            edges = M.edges(list(M)[a.state], data=True)
+            if not edges:
+                break
+            # enabled input, or random input
+            if rng.random() < 0.9:
+                _, _, d = rng.choice(edges)
+                values = {k: d[k] for k in inputs}
+            else:
+                values = {k: rng.choice([0, 1]) for k in inputs}
+            try:
+                out = a.move(**values)
+            except ValueError:
+                with assert_raises(ValueError):
+                    b.move(**values)
+                continue
+            assert out == b.move(**values), values
+
 
 def test_nx():
     g = nx.DiGraph()
@@ -80,3 +175,18 @@ def test_nx():
     # dead-end
     with assert_raises(Exception):
         m.move(a=1, b=0)
+    # same for lookup tables
+    exe_globals = dict()
+    exec(dumpsmach.python_table(g, classname='Machine'), exe_globals)
+    m = exe_globals['Machine']()
+    assert m.move(a=0, b=0) == dict(c=0, d=0)
+    assert m.move(a=0, b=1) == dict(c=0, d=1)
+    with assert_raises(ValueError):
+        m.move(a=1, b=1)
+    assert m.move(a=1, b=0) == dict(c=1, d=1)
+    with assert_raises(Exception):
+        m.move(a=1, b=0)
+    # edges must assign all inputs
+    g.add_edge(2, 0, a=0, c=0, d=0)
+    with assert_raises(ValueError):
+        dumpsmach.python_table(g)
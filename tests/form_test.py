@@ -6,7 +6,8 @@ import logging
 logging.basicConfig(level=logging.ERROR)
 logging.getLogger('ltl_parser_log').setLevel(logging.WARNING)
 import nose.tools as nt
-from tulip.spec.form import LTL, GRSpec, replace_dependent_vars
+import numpy as np
+from tulip.spec.form import LTL, GRSpec, Table, replace_dependent_vars
 
 
 class LTL_test(object):
@@ -168,6 +169,56 @@ def test_str_to_int():
     assert s._bool_int[x] == "( ( X a ) = 0 )"
 
 
+def test_sub_values():
+    x = '(a = "hehe") & (y < 2) & b'
+    s = GRSpec(sys_vars={'a': ['hehe', 'haha'], 'y': (0, 3), 'b': 'boolean'},
+               sys_safety=[x])
+    s.parse()
+    a = s.sub_values(dict(a='haha', y=1, b=True))
+    f = a[x].flatten()
+    assert f == '( ( ( "haha" = "hehe" ) & ( 1 < 2 ) ) & True )', f
+    # the cached AST is unchanged
+    assert 'Var' in repr(s.ast(x))
+
+
+def test_shared_clause_cache():
+    s = GRSpec(sys_vars={'a': ['hehe', 'haha'], 'y': (0, 3)},
+               sys_safety=['a = "hehe"', 'y < 2'])
+    # parse lazily, one clause at a time
+    u = s.ast('y < 2')
+    assert set(s._ast) == {'y < 2'}, s._ast
+    s.parse()
+    assert s.ast('y < 2') is u
+    # copies and unions share the cache
+    c = s.copy()
+    assert c._clauses is s._clauses
+    assert c.ast('y < 2') is u
+    g = GRSpec(sys_vars={'z': 'boolean'}, sys_prog=['z'])
+    g.ast('z')
+    h = c | g
+    assert h._clauses is s._clauses
+    assert 'z' in s._ast
+    assert s._clauses.refs == 3, s._clauses.refs
+    del h
+    assert s._clauses.refs == 2, s._clauses.refs
+    # a shared cache is not garbage collected
+    c.sys_safety = ['y < 2']
+    c.parse()
+    assert 'a = "hehe"' in s._ast
+    # int forms depend on the domains of string variables
+    s.str_to_int()
+    assert s._bool_int['a = "hehe"'] == '( a = 0 )'
+    c.sys_vars['a'] = ['haha', 'hehe']
+    c.sys_safety = ['a = "hehe"']
+    c.str_to_int()
+    assert c._clauses is not s._clauses
+    assert c._bool_int['a = "hehe"'] == '( a = 1 )'
+    assert s._bool_int['a = "hehe"'] == '( a = 0 )'
+    # `formula` reflects the current clauses
+    s.sys_prog.append('y = 1')
+    assert '[]<>(y = 1)' in s.formula, s.formula
+
+
 def test_compile_init():
     env_vars = {'x': (0, 0), 'y': (0, 0), 'z': (0, 1)}
     sys_vars = {'w': (0, 0)}
@@ -185,6 +236,64 @@ def test_compile_init():
     assert not eval(code, d)
 
 
+def test_compile_init_vectorized():
+    spc = GRSpec(
+        env_vars={'x': (0, 3), 'p': 'boolean'},
+        sys_vars={'y': ['a', 'b']},
+        env_init=['(x > 1) -> ! p'],
+        sys_init=['(y = "b") <-> (p | (x = 0))'])
+    code = spc.compile_init(no_str=True)
+    vcode = spc.compile_init(no_str=True, vectorized=True)
+    rows = [dict(x=x, p=p, y=y)
+            for x in range(4) for p in (False, True) for y in (0, 1)]
+    columns = {k: np.array([d[k] for d in rows]) for k in ('x', 'p', 'y')}
+    r = eval(vcode, columns)
+    r_ = [eval(code, dict(d)) for d in rows]
+    assert r.tolist() == r_, (r, r_)
+    # no variables
+    spc = GRSpec(env_vars={'x': (0, 3)})
+    vcode = spc.compile_init(no_str=True, vectorized=True)
+    assert eval(vcode, dict(x=np.arange(3))) is True
+
+
+def test_table():
+    t = Table(['x', "y'", 'p'],
+              [('a', 1, None), ('a', 2, True), ('b', None, False)])
+    assert len(t) == 3, len(t)
+    r = [u.flatten() for u in t.to_ast()]
+    r_ = [
+        '( ( x = "a" ) -> ( ( X ( y = 1 ) ) | ( ( X ( y = 2 ) ) & p ) ) )',
+        '( ( x = "b" ) -> ( ! p ) )',
+        '( ( x = "a" ) | ( x = "b" ) )']
+    assert r == r_, r
+    with nt.assert_raises(ValueError):
+        t.add_rows_from([('a', 1)])
+    with nt.assert_raises(ValueError):
+        t.add_rows_from([(None, 1, True)])
+
+
+def test_expand_tables():
+    s = GRSpec(sys_vars={'x': ['a', 'b'], 'y': (0, 2), 'p': 'boolean'},
+               sys_safety=['p -> X p'])
+    t = Table(['x', "y'"], [('a', 1), ('b', 2)])
+    s.tables['sys_safety'].append(t)
+    assert 'x = "a"' in str(s), str(s)
+    r = s | GRSpec(env_vars={'q': 'boolean'})
+    assert r.tables['sys_safety'] == [t], r.tables
+    e = r.expand_tables()
+    assert e.tables == dict(env_safety=[], sys_safety=[]), e.tables
+    assert r.tables['sys_safety'] == [t], r.tables
+    assert len(e.sys_safety) == 4, e.sys_safety
+    # expanded clauses are cached ASTs
+    for x in e.sys_safety[1:]:
+        assert x in e._ast, x
+    e.str_to_int()
+    f = e._bool_int[e.sys_safety[1]]
+    assert f == '( ( x = 0 ) -> ( X ( y = 1 ) ) )', f
+    # nothing to expand
+    assert e.expand_tables() is e
+
+
 def test_replace_dependent_vars():
     sys_vars = {'a': 'boolean', 'locA': (0, 4)}
     sys_safe = ['!a', 'a & (locA = 3)']
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""Tests for gr1c sessions, with a Python stand-in for gr1c."""
+import os
+import shutil
+import stat
+import sys
+import tempfile
+
+from nose.tools import assert_raises
+from tulip.interfaces import gr1c
+
+
+# Answers the interactive commands used by `GR1CSession`.
+# A state that starts with 9 gets a malformed reply to "getindex",
+# and a state that starts with 8 makes the process exit,
+# if a file named "crash" exists in the working directory,
+# which is then removed.
+STAND_IN = r'''
+import os
+import sys
+while True:
+    sys.stdout.write('>>> ')
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        break
+    w = line.split()
+    if w[0] == 'quit':
+        break
+    if w[1:2] == ['8'] and os.path.exists('crash'):
+        os.remove('crash')
+        sys.exit(1)
+    if w[0] == 'winning':
+        print('True' if w[1] == '1' else 'False')
+    elif w[0] == 'numgoals':
+        print(3)
+    elif w[0] == 'getindex':
+        print('oops' if w[1] == '9' else 1)
+    elif w[0] == 'envnext':
+        print('0 %s' % w[2])
+        print('1 %s' % w[2])
+        print('---')
+    sys.stdout.flush()
+'''
+
+
+class StandIn_test(object):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.mkdtemp()
+        os.chdir(self.tmpdir)
+        fname = os.path.join(self.tmpdir, 'gr1c')
+        with open(fname, 'w') as f:
+            f.write('#!' + sys.executable + '\n' + STAND_IN)
+        os.chmod(fname, os.stat(fname).st_mode | stat.S_IEXEC)
+        self.prefix = gr1c.GR1C_BIN_PREFIX
+        gr1c.GR1C_BIN_PREFIX = self.tmpdir + os.sep
+        self.spec_filename = 'spec.spc'
+        self.pool = gr1c.GR1CSessionPool(size=1)
+        self.pool.add(self.spec_filename,
+                      env_vars=['x', 'ze'], sys_vars=['y', 'zs'])
+
+    def tearDown(self):
+        self.pool.close()
+        gr1c.GR1C_BIN_PREFIX = self.prefix
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmpdir)
+
+    def test_session_bad_reply(self):
+        gs = gr1c.GR1CSession(self.spec_filename,
+                              env_vars=['x', 'ze'], sys_vars=['y', 'zs'])
+        bad = dict(x=9, ze=0, y=0, zs=0)
+        state = dict(x=1, ze=0, y=1, zs=0)
+        # enough queries to fill the pipes behind the bad reply
+        queries = ([('getindex', bad, 0)] +
+                   [('env_next', state)] * 10**4)
+        with assert_raises(ValueError):
+            gs.batch(queries)
+        assert not gs.alive()
+        with assert_raises(OSError):
+            gs.iswinning(state)
+        gs.restart()
+        with assert_raises(ValueError):
+            gs.getindex(bad, 0)
+        assert not gs.alive()
+        gs.restart()
+        assert gs.batch([('iswinning', state), ('getindex', state, 0)]) == [
+            True, 1]
+        assert gs.close()
+
+    def test_pool_bad_reply(self):
+        bad = dict(x=9, ze=0, y=0, zs=0)
+        state = dict(x=1, ze=0, y=1, zs=0)
+        queries = [('iswinning', state), ('env_next', state)]
+        with assert_raises(ValueError):
+            self.pool.batch(self.spec_filename,
+                            [('getindex', bad, 0)] + queries * 10**4)
+        assert self.pool.restarts == 1
+        # the restarted session answers in step
+        replies = self.pool.batch(self.spec_filename, queries)
+        assert replies == [True, [dict(x=0, ze=0), dict(x=1, ze=0)]], replies
+        (session,) = self.pool._sessions[self.spec_filename]
+        assert session.alive()
+
+    def test_pool_crash(self):
+        crash = dict(x=8, ze=0, y=0, zs=0)
+        queries = [('iswinning', dict(x=1, ze=0, y=1, zs=0)),
+                   ('iswinning', crash)]
+        open('crash', 'w').close()
+        assert self.pool.batch(self.spec_filename, queries) == [True, False]
+        assert self.pool.restarts == 1
+        assert self.pool.batch(self.spec_filename, queries) == [True, False]
+        assert self.pool.restarts == 1
@@ -8,8 +8,12 @@ import logging
 logging.basicConfig(level=logging.DEBUG)
 logging.getLogger('tulip.spec.lexyacc').setLevel(logging.WARNING)
 import networkx as nx
-from nose.tools import raises
+from nose.tools import assert_raises, raises
 import os
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
 from tulip.spec import GRSpec, translate
 from tulip.interfaces import gr1c
 
@@ -212,6 +216,58 @@ class GR1CSession_test(object):
             {"x": 1, "y": 1, "ze": 0, "zs": 0},
             {"x": 0, "ze": 0}, 0) == [{'y': 0, 'zs': 0}, {'y': 1, 'zs': 0}]
 
+    def test_batch(self):
+        state = {"x": 1, "y": 1, "ze": 0, "zs": 0}
+        env_move = {"x": 0, "ze": 0}
+        queries = [
+            ('iswinning', state),
+            ('getindex', state, 0),
+            ('env_next', state),
+            ('sys_nextfeas', state, env_move, 0),
+            ('sys_nexta', state, env_move),
+            ('numgoals',)]
+        expected = [getattr(self.gs, q[0])(*q[1:]) for q in queries]
+        assert self.gs.batch(queries) == expected
+        assert self.gs.batch(queries * 1000) == expected * 1000
+
+
+class GR1CSessionPool_test(object):
+    def setUp(self):
+        self.spec_filename = "trivial_partwin_pool.spc"
+        with open(self.spec_filename, "w") as f:
+            f.write(REFERENCE_SPECFILE)
+        self.pool = gr1c.GR1CSessionPool(size=2)
+        self.pool.add(self.spec_filename,
+                      env_vars=["x", "ze"], sys_vars=["y", "zs"])
+
+    def tearDown(self):
+        self.pool.close()
+        os.remove(self.spec_filename)
+
+    def test_batch(self):
+        queries = [('iswinning', {"x": 1, "y": 1, "ze": 0, "zs": 0}),
+                   ('iswinning', {"x": 1, "y": 1, "ze": 0, "zs": 1})]
+        assert self.pool.batch(self.spec_filename, queries) == [True, False]
+        # crashed sessions are restarted
+        (session,) = self.pool._sessions[self.spec_filename]
+        session.p.kill()
+        session.p.wait()
+        assert self.pool.batch(self.spec_filename, queries) == [True, False]
+        assert self.pool.restarts == 1
+        with assert_raises(ValueError):
+            self.pool.batch("unknown.spc", queries)
+
+    def test_submit(self):
+        import asyncio
+        queries = [('numgoals',)] * 10
+        loop = asyncio.new_event_loop()
+        futures = [self.pool.submit(self.spec_filename, queries, loop=loop)
+                   for _ in range(4)]
+        replies = loop.run_until_complete(asyncio.gather(*futures, loop=loop))
+        loop.close()
+        assert replies == [[3] * 10] * 4
+        assert len(self.pool._sessions[self.spec_filename]) <= 2
+
 
 def test_aut_xml2mealy():
     g = gr1c.load_aut_xml(REFERENCE_AUTXML)
@@ -249,6 +305,20 @@ def test_load_aut_json():
     assert h_edges == g_edges, (h_edges, g_edges)
 
 
+def test_load_aut_json_stream():
+    g = gr1c.load_aut_json(REFERENCE_AUTJSON_smallbool)
+    f = StringIO(u'' + REFERENCE_AUTJSON_smallbool)
+    h = gr1c.load_aut_json(f)
+    assert h.env_vars == g.env_vars, h.env_vars
+    assert h.sys_vars == g.sys_vars, h.sys_vars
+    assert dict(h.nodes_iter(data=True)) == dict(g.nodes_iter(data=True))
+    assert set(h.edges_iter()) == set(g.edges_iter())
+    with assert_raises(ValueError):
+        gr1c.load_aut_json(StringIO(
+            u'' + REFERENCE_AUTJSON_smallbool.replace(
+                '"version": 1', '"version": 2')))
+
+
 @raises(ValueError)
 def synth_init_illegal_check(init_option):
     spc = GRSpec(moore=False, plus_one=False, qinit=init_option)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""Tests for tulip.interfaces.process, with Python as the solver."""
+import json
+import sys
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from nose.tools import assert_raises
+from tulip.interfaces import process
+
+
+ECHO = 'import sys; sys.stdout.write(sys.stdin.read())'
+
+
+def python(code):
+    return [sys.executable, '-c', code]
+
+
+def run_test():
+    s = 'a line\n' * 10**5
+    r = process.run(python(ECHO), input=s)
+    assert r.returncode == 0, r
+    assert r.stdout == s
+    assert r.stderr == ''
+    assert r.value is None
+    assert r.wall_time > 0, r.wall_time
+    if r.peak_rss is not None:
+        assert r.peak_rss > 0, r.peak_rss
+
+
+def run_stderr_test():
+    code = (
+        'import sys; sys.stderr.write("oops\\n"); '
+        'sys.stdout.write("out\\n"); sys.exit(3)')
+    r = process.run(python(code))
+    assert r.returncode == 3, r.returncode
+    assert r.stdout == 'out\n', r.stdout
+    assert r.stderr == 'oops\n', r.stderr
+    r = process.run(python(code), merge_stderr=True)
+    assert r.returncode == 3, r.returncode
+    assert 'oops' in r.stdout and 'out' in r.stdout, r.stdout
+    assert r.stderr == ''
+
+
+def run_parse_test():
+    d = {'version': 1, 'nodes': {str(i): [i] for i in range(100)}}
+    r = process.run(
+        python(ECHO), input=json.dumps(d),
+        parse=lambda f: dict(
+            (k, v) for _, k, v in process.iter_json(f, chunk_size=7)))
+    assert r.returncode == 0, r
+    assert r.value['version'] == 1
+    assert r.value['99'] == [99], r.value
+    # parse error of successful solver
+    with assert_raises(ValueError):
+        process.run(python(ECHO), input='{"nodes": [}',
+                    parse=lambda f: list(process.iter_json(f)))
+    # parse error of failed solver
+    code = 'import sys; sys.stdout.write("unrealizable"); sys.exit(1)'
+    r = process.run(python(code), parse=lambda f: list(process.iter_json(f)))
+    assert r.returncode == 1, r.returncode
+    assert r.value is None
+    assert r.stdout == 'unrealizable', r.stdout
+
+
+def run_memory_limit_test():
+    if process.resource is None:
+        return
+    code = 'x = bytearray(2 * 10**9)'
+    r = process.run(python(code), memory_limit=2**30)
+    assert r.returncode != 0, r
+    assert 'MemoryError' in r.stderr, r.stderr
+
+
+def iter_json_test():
+    d = {
+        'version': 1,
+        'ENV': [{'x': 'boolean'}],
+        'nodes': {
+            '0x1': {'state': [0, 1], 'trans': ['0x2'], 'rank': 12345},
+            '0x2': {'state': [1, 1], 'trans': [], 's': 'a "}" ,'}},
+        'empty': {},
+        'last': 1.5e-3}
+    s = json.dumps(d, indent=2)
+    for n in (1, 2, 3, 5, 64, 10**6):
+        members = list(process.iter_json(StringIO(s), chunk_size=n))
+        top = {k: v for p, k, v in members if p is None}
+        nodes = {k: v for p, k, v in members if p == 'nodes'}
+        assert top == {k: v for k, v in d.items() if k != 'nodes'}, top
+        assert nodes == d['nodes'], nodes
+    assert list(process.iter_json(StringIO(u'{ }'))) == []
+    # streamed values must be objects
+    with assert_raises(ValueError):
+        list(process.iter_json(StringIO(u'{"nodes": [1]}')))
+    # truncated
+    with assert_raises(ValueError):
+        list(process.iter_json(StringIO(s[:-10]), chunk_size=3))
+    with assert_raises(ValueError):
+        list(process.iter_json(StringIO(u'')))
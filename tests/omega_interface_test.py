@@ -1,5 +1,7 @@
 """Tests for interface to `omega.games.gr1`."""
 import logging
+import os
+import tempfile
 
 import networkx as nx
 
@@ -132,6 +134,12 @@ def test_synthesis_unrealizable():
     assert h is None, h
 
 
+def test_is_realizable_false_sys_action():
+    sp = form.GRSpec(sys_vars={'x'}, sys_safety=['False'], qinit=r'\E \A')
+    assert not omega_int.is_realizable(sp)
+    assert not synth.is_realizable(sp, solver='omega')
+
+
 def test_is_circular_true():
     f = form.GRSpec()
     f.sys_vars['y'] = 'bool'
@@ -150,6 +158,119 @@ def test_is_circular_false():
     assert not triv, triv
 
 
+def test_tables():
+    sp = grspec_table()
+    t = sp.tables['sys_safety'][0]
+    # same BDD as the expanded formulas
+    bdd = omega_int._init_bdd(False)
+    actions = list()
+    for g in (sp, sp.expand_tables()):
+        aut = omega_int._grspec_to_automaton(g)
+        omega_int.sym.fill_blanks(aut)
+        aut.bdd = bdd
+        a = aut.build()
+        omega_int._conjoin_tables(g, a)
+        actions.append(a.action['sys'][0])
+    u, v = actions
+    assert u == v, actions
+    assert u != bdd.false
+    assert omega_int.is_realizable(sp)
+    # from "c", the environment can leave the table
+    sp.sys_prog = ['y = "c"']
+    assert not omega_int.is_realizable(sp)
+    assert not omega_int.is_realizable(sp.expand_tables())
+    # value outside domain
+    t.add_rows_from([('d', 'a', None)])
+    with nt.assert_raises(ValueError):
+        omega_int.is_realizable(sp)
+
+
+def test_session():
+    sp = grspec_4()
+    sp.env_prog = ['x = 0']
+    sp.sys_prog = ['y = "a"']
+    s = omega_int.SynthesisSession(sp, reordering=True)
+    assert 'reorder' in s.times, s.times
+    fixpoint = s.solve()
+    assert s.is_realizable()
+    assert s.transducer() is s.transducer()
+    # the game is solved once
+    assert s.solve() is fixpoint
+    assert s.winning_set() == fixpoint[0]
+    assert s.is_winning(dict(x=0, y='a'))
+    assert s.is_winning(dict(x=2, y='b'))
+    assert not s.is_winning(dict(x=1, y='a'))
+    assert s.is_winning(dict(x=1))
+    assert s.is_winning(dict())
+    with nt.assert_raises(ValueError):
+        s.is_winning(dict(z=0))
+    h = s.enumerated()
+    assert h is not None
+    assert s.solve() is fixpoint
+    assert set(s.times) >= {'build', 'solve', 'transducer'}, s.times
+    m = s.symbolic()
+    assert m.outputs == sp.sys_vars, m.outputs
+    # same answers without sifting
+    sp = grspec_4()
+    sp.env_prog = ['x = 0']
+    sp.sys_prog = ['y = "a"']
+    r = omega_int.SynthesisSession(sp)
+    assert 'reorder' not in r.times, r.times
+    assert r.is_realizable()
+    for x in range(3):
+        for y in ('a', 'b'):
+            state = dict(x=x, y=y)
+            assert r.is_winning(state) == s.is_winning(state), state
+    # unrealizable
+    sp.sys_prog = ['False']
+    s = omega_int.SynthesisSession(sp)
+    assert not s.is_realizable()
+    assert s.transducer() is None
+    assert s.enumerated() is None
+    assert s.symbolic() is None
+
+
+def test_variable_order():
+    sp = grspec_agents()
+    r = omega_int.variable_order(sp, 'interleave')
+    assert r == ['a_c', 'a_r', 'alarm', 'b_c', 'b_r'], r
+    r = omega_int.variable_order(sp, 'group')
+    assert r == ['a_c', 'a_r', 'alarm', 'b_c', 'b_r'], r
+    # `alarm` depends only on `b`, and `b` on `a`
+    r = omega_int.variable_order(sp, 'dependency')
+    assert r == ['a_c', 'a_r', 'b_c', 'b_r', 'alarm'], r
+    with nt.assert_raises(ValueError):
+        omega_int.variable_order(sp, 'unknown')
+
+
+def test_session_order():
+    sp = grspec_agents()
+    r = omega_int.SynthesisSession(sp.copy()).is_realizable()
+    for order in omega_int.ORDERINGS:
+        s = omega_int.SynthesisSession(sp.copy(), order=order)
+        assert s.is_realizable() == r, order
+    s = omega_int.SynthesisSession(sp.copy(), order=['alarm', 'b_r'])
+    levels = s.variable_order()
+    bits = sorted(levels, key=levels.get)
+    assert bits[:4] == ['alarm', "alarm'", 'b_r_1', "b_r_1'"], bits
+    # persist
+    fd, fname = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        omega_int.dump_order(levels, fname)
+        order = omega_int.load_order(fname)
+    finally:
+        os.remove(fname)
+    assert order == levels, (order, levels)
+    s = omega_int.SynthesisSession(sp.copy(), order=order)
+    assert s.variable_order() == levels
+    assert s.is_realizable() == r
+    with nt.assert_raises(ValueError):
+        omega_int.SynthesisSession(sp.copy(), order=['z'])
+    with nt.assert_raises(ValueError):
+        omega_int.SynthesisSession(sp.copy(), order={'z_0': 0})
+
+
 def grspec_0():
     sp = form.GRSpec()
     sp.moore = False
@@ -205,3 +326,40 @@ def grspec_4():
 
 if __name__ == '__main__':
     test_synthesis_bool()
+
+
+def grspec_agents():
+    """Agent `b` avoids agent `a`, `alarm` depends on `b`."""
+    sp = form.GRSpec()
+    sp.moore = False
+    sp.qinit = r'\A \E'
+    sp.env_vars = dict(a_r=(0, 3), a_c=(0, 3))
+    sp.sys_vars = dict(b_r=(0, 3), b_c=(0, 3), alarm='boolean')
+    sp.env_init = ['(a_r = 0) & (a_c = 0)']
+    sp.sys_init = ['(b_r = 3) & (b_c = 3)']
+    sp.env_safety = [
+        "(a_r' - a_r <= 1) & (a_r - a_r' <= 1)",
+        "(a_c' = a_c) | (a_r' = a_r)"]
+    sp.sys_safety = [
+        "(b_r' - b_r <= 1) & (b_r - b_r' <= 1)",
+        "(b_c' = b_c) | (b_r' = b_r)",
+        "!((b_r' = a_r') & (b_c' = a_c'))",
+        "alarm' <-> (b_r = 3)"]
+    sp.env_prog = ['a_r = 3', 'a_r = 0']
+    sp.sys_prog = ['alarm']
+    return sp
+
+
+def grspec_table():
+    sp = form.GRSpec()
+    sp.moore = False
+    sp.qinit = r'\E \E'
+    sp.env_vars = dict(x=(-1, 2))
+    sp.sys_vars = dict(y=['a', 'b', 'c'])
+    sp.sys_prog = ['y = "b"']
+    t = form.Table(
+        ['y', "y'", "x'"],
+        [('a', 'b', None), ('b', 'b', None), ('b', 'a', -1),
+         ('c', 'c', 0)])
+    sp.tables['sys_safety'].append(t)
+    return sp
@@ -3,8 +3,14 @@
 from __future__ import print_function
 
 import logging
+import random
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
 
 import networkx as nx
+import numpy as np
 from tulip.interfaces import slugs
 from tulip.spec import GRSpec
 
@@ -99,3 +105,39 @@ class basic_test(object):
             state = d['state']
             assert(len(state) == 2)
             assert(label_reference[u] == (state['x'], state['y']))
+
+
+def load_json_test():
+    s = (
+        '{"version": 0, "slugs": "0.0.1", '
+        '"variables": ["x", "y@0.0.3", "y@1"], '
+        '"nodes": {"0": {"rank": 0, "state": [0, 1, 1], "trans": [1]}, '
+        '"1": {"rank": 0, "state": [1, 0, 0], "trans": [0, 1]}}}')
+    vrs = {'x': 'boolean', 'y': (0, 3)}
+    h = slugs._load_json(StringIO(u'' + s), vrs)
+    assert h.node[0]['state'] == {'x': 0, 'y': 3}, h.node[0]
+    assert h.node[1]['state'] == {'x': 1, 'y': 0}, h.node[1]
+    assert set(h.edges()) == {(0, 1), (1, 0), (1, 1)}, h.edges()
+    # no variables
+    s = (
+        '{"version": 0, "slugs": "0.0.1", "variables": [], '
+        '"nodes": {"0": {"rank": 0, "state": [], "trans": [0]}, '
+        '"1": {"rank": 0, "state": [], "trans": []}}}')
+    h = slugs._load_json(StringIO(u'' + s), dict())
+    assert sorted(h.nodes(data=True)) == [
+        (0, dict(state=dict())), (1, dict(state=dict()))], h.nodes(data=True)
+    # no strategy
+    assert slugs._load_json(StringIO(u''), vrs) is None
+
+
+def bit_matrix_to_ints_test():
+    vrs = {'x': 'boolean', 'y': (0, 5), 'z': (0, 1000)}
+    dvars = ['z@0.0.1000'] + ['z@{i}'.format(i=i) for i in range(1, 10)]
+    dvars += ['x', 'y@0.0.5', 'y@1', 'y@2']
+    rng = random.Random(0)
+    rows = [[rng.randint(0, 1) for _ in dvars] for _ in range(50)]
+    states = slugs._bit_matrix_to_ints(
+        np.array(rows, dtype=np.uint8), dvars, vrs)
+    assert states == [
+        slugs._bitfields_to_ints(dict(zip(dvars, r)), vrs)
+        for r in rows], states
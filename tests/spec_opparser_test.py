@@ -0,0 +1,132 @@
+"""Differential tests of `tulip.spec.opparser` against `lexyacc`."""
+import logging
+import random
+import warnings
+
+import nose.tools as nt
+
+from tulip.spec import lexyacc, opparser, parser
+
+
+logging.getLogger('ltl_parser_log').setLevel(logging.ERROR)
+logging.getLogger('tulip.ltl_parser_log').setLevel(logging.ERROR)
+TOKENS = [
+    'a', 'b', 'x1', '3', '-', '+', '*', '/', '&', '&&', '|', '||',
+    '^', '->', '<->', '!', '[]', '<>', 'G', 'F', 'X', 'next',
+    'U', 'W', 'V', '=', '!=', '<', '<=', '>', '>=', '(', ')', ',',
+    'ite', "'", '<<>>', '"', 'True', 'false', '#c\n', '\n']
+BINARY = [
+    '&', '&&', '|', '||', '^', '->', '<->', 'U', 'W', 'V',
+    '=', '!=', '<', '<=', '>', '>=', '+', '-', '*', '/']
+
+
+def random_formula(rng, depth):
+    r = rng.random()
+    if depth <= 0 or r < 0.3:
+        return rng.choice([
+            'a', 'b', 'x1', '3', '- 4', 'True', 'FALSE', '"s"', '-7'])
+    r = rng.random()
+    if r < 0.15:
+        op = rng.choice(['!', '[]', '<>', 'G ', 'F ', 'X ', 'next '])
+        return op + random_formula(rng, depth - 1)
+    if r < 0.2:
+        return random_formula(rng, depth - 1) + "'"
+    if r < 0.25:
+        return '{f} <<>> {n}'.format(
+            f=random_formula(rng, depth - 1), n=rng.randint(0, 9))
+    if r < 0.3:
+        return '(ite {x}, {y}, {z})'.format(
+            x=random_formula(rng, depth - 1),
+            y=random_formula(rng, depth - 1),
+            z=random_formula(rng, depth - 1))
+    if r < 0.45:
+        return '(' + random_formula(rng, depth - 1) + ')'
+    return '{x} {op} {y}'.format(
+        x=random_formula(rng, depth - 1),
+        op=rng.choice(BINARY),
+        y=random_formula(rng, depth - 1))
+
+
+def outcome(p, formula):
+    try:
+        return repr(p.parse(formula))
+    except Exception:
+        return 'syntax error'
+
+
+def check_same(ply, opp, formula):
+    r = outcome(ply, formula)
+    r_ = outcome(opp, formula)
+    assert r == r_, (formula, r, r_)
+
+
+def differential_test():
+    ply = lexyacc.Parser()
+    opp = opparser.Parser()
+    rng = random.Random(0)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for _ in range(2000):
+            check_same(ply, opp, random_formula(rng, 6))
+            n = rng.randint(0, 8)
+            s = ' '.join(rng.choice(TOKENS) for _ in range(n))
+            check_same(ply, opp, s)
+
+
+def precedence_test():
+    ply = lexyacc.Parser()
+    opp = opparser.Parser()
+    formulas = [
+        'a + b <<>> 2',
+        'a & b <<>> 2 | c',
+        "X a'",
+        "!a' & b",
+        'G a U b & c',
+        'a -> b -> c',
+        'a <-> b <-> c',
+        '- 1 - -2 * x',
+        'x = 1 = y',
+        '(ite a & b, x + 1, y) < 3',
+        '(x + 1) <<>> 3 >= 2',
+        'a = "b"']
+    for f in formulas:
+        check_same(ply, opp, f)
+    for f in ['', 'a b', '(a', 'a)', 'a <<>> b', '(ite a, b)', 'a,b']:
+        with nt.assert_raises(Exception):
+            opp.parse(f)
+
+
+def lexer_test():
+    lexer = opparser.Lexer()
+    tokens = lexer.tokenize("[]<>(x' >= -2) && next y || !TRUE # c\n")
+    types = [t for t, _ in tokens]
+    assert types == [
+        'ALWAYS', 'EVENTUALLY', 'LPAREN', 'NAME', 'PRIME', 'GT',
+        'MINUS', 'NUMBER', 'RPAREN', 'AND', 'NEXT', 'NAME', 'OR',
+        'NOT', 'TRUE'], types
+    assert tokens[0] == ('ALWAYS', 'G'), tokens
+    assert tokens[9] == ('AND', '&'), tokens
+
+
+def deep_formula_test():
+    n = 10**4
+    opp = opparser.Parser()
+    f = n * '(' + 'a' + n * ')'
+    assert repr(opp.parse(f)) == "Var('a')"
+    f = ' & '.join('x{i}'.format(i=i) for i in range(n))
+    u = opp.parse(f)
+    for i in range(n - 1, 0, -1):
+        assert u.operands[1].value == 'x{i}'.format(i=i)
+        u = u.operands[0]
+    f = n * '!' + 'a'
+    u = opp.parse(f)
+    assert len(u) == n + 1
+
+
+def parse_option_test():
+    f = '[](x = 1 -> X(y < 2)) && <>"s" = z'
+    u = parser.parse(f)
+    v = parser.parse(f, parser='ply')
+    assert repr(u) == repr(v), (u, v)
+    with nt.assert_raises(ValueError):
+        parser.parse(f, parser='unknown')
@@ -83,6 +83,49 @@ def test_ast_nodes():
     assert nodes.Binary.opmap is opmap
 
 
+def test_nary_nodes():
+    nodes = ast.make_fol_nodes()
+    xyz = [nodes.Var(x) for x in 'abcde']
+    u = nodes.NAry('&', *xyz)
+    assert len(u) == 6, len(u)
+    assert str(u) == '(& a b c d e)', str(u)
+    assert repr(u) == (
+        "NAry('&', Var('a'), Var('b'), Var('c'), Var('d'), Var('e'))")
+    # flattened as balanced binary tree
+    s = '( ( ( a & b ) & ( c & d ) ) & e )'
+    assert u.flatten() == s, u.flatten()
+    assert parse(s).flatten() == s
+    assert ast.conj(xyz).flatten() == s
+    assert ast.disj(xyz[:1]) is xyz[0]
+    assert ast.disj([None]).flatten() == 'False'
+    nt.assert_raises(ValueError, nodes.NAry, '&')
+    # operator flattened with operands
+    v = nodes.Unary('!', u)
+    assert v.flatten() == '( ! {s} )'.format(s=s), v.flatten()
+
+
+def balanced_fold_test():
+    f = lambda x, y: (x, y)
+    assert ast.balanced_fold(f, []) is None
+    assert ast.balanced_fold(f, [], empty=0) == 0
+    assert ast.balanced_fold(f, 'a') == 'a'
+    assert ast.balanced_fold(f, 'abcde') == ((('a', 'b'), ('c', 'd')), 'e')
+    assert ast.balanced_fold(lambda x, y: x + y, range(100)) == 4950
+
+
+def test_deep_ast_nodes():
+    nodes = ast.make_fol_nodes()
+    n = 10**4
+    u = nodes.Var('x0')
+    for i in range(1, n):
+        u = nodes.Binary('|', u, nodes.Var('x{i}'.format(i=i)))
+    assert len(u) == 2 * n - 1
+    s = u.flatten()
+    assert s.startswith((n - 1) * '( ') and s.endswith(' | x{i} )'.format(i=n - 1))
+    assert str(u).startswith('(| (| ')
+    assert repr(u).endswith(", Var('x{i}'))".format(i=n - 1))
+
+
 def test_fol_nodes():
     nodes = ast.make_fol_nodes()
     # test Var
@@ -4,13 +4,18 @@ Tests for the tulip.synth module.
 from __future__ import print_function
 
 import logging
+import os
+import subprocess
+import tempfile
 logging.getLogger('tulip').setLevel(logging.ERROR)
 logging.getLogger('tulip.interfaces.omega').setLevel(logging.DEBUG)
 logging.getLogger('omega').setLevel(logging.WARNING)
 from nose.tools import assert_raises
+import networkx as nx
 import numpy as np
 from scipy import sparse as sp
 from tulip import spec, synth, transys
+from tulip.spec import parser
 
 
 def sys_fts_2_states():
@@ -303,6 +308,62 @@ def _check_ofts_int_actions(spec):
             'sys_actionsnone'})
 
 
+def test_fts_spec_ast_cache():
+    """Clauses from FTS are cached as ASTs, equal to parsed ones."""
+    sys = env_ofts_int_actions()
+    sys.owner = 'sys'
+    sys.sys_actions_must = 'mutex'
+    s = synth.sys_to_spec(sys, ignore_initial=False, statevar='loc')
+    env = env_ofts_bool_actions()
+    env.env_actions_must = 'mutex'
+    e = synth.env_to_spec(
+        env, ignore_initial=False, statevar='eloc', bool_actions=True)
+    for g in (s, e, s | e, e.copy()):
+        for p in g._parts:
+            for x in getattr(g, p):
+                assert x in g._ast, x
+                assert parser.parse(x).flatten() == x, x
+        g.check_syntax()
+        spec.translate(g, 'gr1c')
+    # the Boolean actions are mutually exclusive
+    (x, ) = [x for x in e.env_init if 'park' in x]
+    f = spec.translation.translate_ast(e.ast(x), 'python').flatten()
+    values = [eval(f, dict(park=a, go=b))
+              for a in (False, True) for b in (False, True)]
+    assert values == [True, True, True, False], values
+
+
+def test_sys_fts_table():
+    """Transitions of sys FTS as table, same as formulas."""
+    sys = env_ofts_int_actions()
+    sys.owner = 'sys'
+    sys.sys_actions_must = 'xor'
+    sys.env_actions_must = 'xor'
+    sys.transitions.add('e2', 'e0', env_actions='stop',
+                        sys_actions='hover')
+    s = synth.sys_to_spec(
+        sys, ignore_initial=False, statevar='loc', tables=True)
+    (t, ) = s.tables['sys_safety']
+    columns = ('loc', "loc'", "sys_actions'", "env_actions'")
+    assert t.columns == columns, t.columns
+    assert len(t) == sys.transitions.graph.number_of_edges(), len(t)
+    f = synth.sys_to_spec(sys, ignore_initial=False, statevar='loc')
+    assert len(s.sys_safety) < len(f.sys_safety), s.sys_safety
+    assert s.expand_tables().sys_vars == f.sys_vars
+    spec.translate(s, 'gr1c')
+    goals = [('loc = "e2"', True),
+             ('(loc = "e2") & (sys_actions = "up")', False)]
+    for goal, expected in goals:
+        r = list()
+        for g in (s, f):
+            g = g | spec.GRSpec(sys_prog=goal)
+            g.moore = False
+            g.plus_one = False
+            g.qinit = r'\A \E'
+            r.append(synth.is_realizable(g, solver='omega'))
+        assert r == [expected, expected], (goal, r)
+
+
 def test_only_mode_control():
     """Unrealizable due to non-determinism.
 
@@ -626,6 +687,38 @@ def test_determinize_machine_init():
         assert d['b'] == 1
 
 
+def test_strategy2mealy():
+    specs = spec.GRSpec(
+        env_vars={'x': (0, 2)},
+        sys_vars={'y': ['a', 'b']},
+        env_init=['x < 2'],
+        sys_init=['(x = 0) -> (y = "a")'])
+    A = nx.DiGraph()
+    states = [
+        dict(x=0, y=0), dict(x=0, y=1), dict(x=1, y=1),
+        dict(x=1, y=1), dict(x=2, y=0)]
+    for i, d in enumerate(states):
+        A.add_node(i, state=d)
+    A.add_edges_from([(0, 1), (1, 2), (2, 3), (3, 4), (4, 0), (2, 0)])
+    mach = synth.strategy2mealy(A, specs)
+    assert len(mach) == len(A) + 1, mach
+    # node 1 violates `sys_init`, node 3 repeats the valuation of 2,
+    # node 4 violates `env_init`, so it can be anything
+    init = set(mach.successors('Sinit'))
+    assert init == {0, 2, 4}, init
+    assert mach[0][1][0] == dict(x=0, y='b'), mach[0][1][0]
+    assert mach[1][2][0] == mach['Sinit'][2][0] == dict(x=1, y='b')
+    assert mach['Sinit'][4][0] == dict(x=2, y='a')
+    assert mach.number_of_edges() == A.number_of_edges() + 3
+    # no initial states
+    specs.sys_init = ['y = "b"', 'x > 1']
+    specs.env_init = list()
+    with assert_raises(Exception):
+        synth.strategy2mealy(A, specs)
+    # empty strategy
+    assert synth._initial_nodes(nx.DiGraph(), specs) == list()
+
+
 class synthesize_test(object):
     def setUp(self):
         self.f_triv = spec.GRSpec(
@@ -649,6 +742,45 @@ class synthesize_test(object):
         assert synth.synthesize(
             self.trivial_unreachable, solver='omega') is None
 
+    def test_batch(self):
+        specs = [self.f_triv, self.trivial_unreachable, self.f_triv]
+        r = list(synth.synthesize_batch(specs, workers=2))
+        assert sorted(i for i, _, _ in r) == [0, 1, 2], r
+        for i, ctrl, stats in r:
+            assert stats['status'] == 'done', stats
+            assert (ctrl is None) == (i == 1), (i, ctrl)
+        with assert_raises(ValueError):
+            list(synth.synthesize_batch(specs, workers=0))
+
+    def test_batch_limits(self):
+        # the jobs are forked, so they call the replaced solver
+        call_solver = synth._call_solver
+        tmp = tempfile.gettempdir()
+        before = set(os.listdir(tmp))
+
+        def hang(specs, solver):
+            tempfile.mkstemp()
+            subprocess.call(['sleep', '30'])
+
+        def hog(specs, solver):
+            bytearray(2**34)
+
+        try:
+            synth._call_solver = hang
+            (r, ) = synth.synthesize_batch([self.f_triv], timeout=0.5)
+            assert r[2]['status'] == 'timeout', r
+            assert r[2]['time'] < 10, r
+            synth._call_solver = hog
+            (r, ) = synth.synthesize_batch(
+                [self.f_triv], max_memory=2**31)
+            assert r[2]['status'] == 'memory', r
+        finally:
+            synth._call_solver = call_solver
+        # the temporary files of the jobs are removed
+        after = set(os.listdir(tmp))
+        assert not any(x.startswith('tulip_batch_')
+                       for x in after - before), after - before
+
 
 if __name__ == '__main__':
     multiple_env_actions_test()
@@ -3,7 +3,7 @@ from __future__ import print_function
 import logging
 logging.basicConfig(level=logging.DEBUG)
 logging.getLogger('tulip.ltl_parser_log').setLevel(logging.ERROR)
-# import nose.tools as nt
+import nose.tools as nt
 from tulip.spec.ast import nodes
 from tulip.spec.parser import parse
 from tulip.spec import transformation as tx
@@ -112,3 +112,80 @@ def test_str_to_int():
     print(s)
     assert s == ('( ( loc = 1 ) -> '
                  '( X ( ( env_alice = 0 ) & ( env_bob = 1 ) ) ) )')
+
+
+def array_tree_test():
+    f = '(loc = "s2") -> X((x + 1 < y) & (ite b, x, y) = 2)'
+    r = parse(f)
+    g = tx.ArrayTree.from_recursive_ast(r)
+    assert len(g) == len(r)
+    assert g.parent[0] == -1
+    # one symbol per distinct operator or terminal
+    assert len(g.symbols) == len(r) - 3, g.symbols
+    assert {u.value for u in g.variables} == {'loc', 'x', 'y', 'b'}
+    # nothing rewritten, so nothing copied
+    assert g.to_recursive_ast() is r
+    # a tree not built from an AST creates new nodes
+    h = tx.ArrayTree(g.table)
+    for name in ('kind', 'parent', 'first', 'arity', 'children'):
+        setattr(h, name, getattr(g, name))
+    u = h.to_recursive_ast()
+    assert repr(u) == repr(r)
+    u_nodes = list(_ast_nodes(u))
+    assert len({id(x) for x in u_nodes}) == len(r)
+    assert not {id(x) for x in u_nodes}.intersection(
+        id(x) for x in _ast_nodes(r))
+    # pair string constant with variable
+    (i,) = g.nodes_of_type('str')
+    v, c = g.pair_node_to_var(i)
+    assert g.node(v).value == 'loc'
+    assert g.node(c).operator == '='
+    assert g.successors(c) == [v, i]
+
+
+def array_tree_shared_table_test():
+    table = tx.SymbolTable()
+    g = tx.ArrayTree.from_recursive_ast(parse('x = 1'), table)
+    h = tx.ArrayTree.from_recursive_ast(parse('1 = y'), table)
+    assert len(table) == 4, table.symbols
+    assert g.kind[2] == h.kind[1]
+
+
+def array_tree_rewrite_test():
+    x = '(loc = "s2") -> X((((env_alice = "left") && (env_bob = "bright"))))'
+    var_str2int = {
+        'loc': ['s0', 's2'],
+        'env_alice': ['left', 'right'],
+        'env_bob': ['bleft', 'bright']}
+    g = tx.ArrayTree.from_recursive_ast(parse(x))
+    tx.sub_constants(g, var_str2int)
+    s = g.to_recursive_ast().flatten()
+    assert s == ('( ( loc = 1 ) -> '
+                 '( X ( ( env_alice = 0 ) & ( env_bob = 1 ) ) ) )'), s
+    # subtrees without rewritten terminals are shared
+    r = parse('(x = "a") & (y + 1 < 2)')
+    g = tx.ArrayTree.from_recursive_ast(r)
+    tx.sub_constants(g, dict(x=['b', 'a']))
+    u = g.to_recursive_ast()
+    assert u.flatten() == '( ( x = 1 ) & ( ( y + 1 ) < 2 ) )', u.flatten()
+    assert u is not r
+    assert u.operands[0] is not r.operands[0]
+    assert u.operands[0].operands[0] is r.operands[0].operands[0]
+    assert u.operands[1] is r.operands[1]
+    g = tx.ArrayTree.from_recursive_ast(parse('x + 1 < y & b'))
+    tx.sub_values(g, dict(x=2, y=3, b=False))
+    s = g.to_recursive_ast().flatten()
+    assert s == '( ( ( 2 + 1 ) < 3 ) & False )', s
+    domains = dict(x=(0, 3), y=(0, 3))
+    tx.check_for_undefined_identifiers(g, domains)
+    g = tx.ArrayTree.from_recursive_ast(parse('x + 1 < z'))
+    with nt.assert_raises(ValueError):
+        tx.check_for_undefined_identifiers(g, domains)
+
+
+def _ast_nodes(u):
+    stack = [u]
+    while stack:
+        u = stack.pop()
+        yield u
+        stack.extend(getattr(u, 'operands', ()))
@@ -28,6 +28,24 @@ def test_translate_ast_to_gr1c():
                            "( ( env_alice' = 0 ) & ( env_bob' = 1 ) ) )")
 
 
+def test_translate_deep_formula():
+    # left-deep tree deeper than the recursion limit
+    n = 5000
+    f = ' | '.join('(x = {i})'.format(i=i % 3) for i in range(n))
+    s = spec.GRSpec(env_vars={'x': (0, 2)},
+                    sys_vars={'y': ['a', 'b']},
+                    sys_init=[f], sys_safety=[f + ' | X(y = "b")'])
+    r = ts.translate(s, 'gr1c')
+    assert r.count('( x = 1 )') == 2 * len(range(1, n, 3))
+    assert "( y' = 1 )" in r, r
+    # python is balanced, to compile it
+    r = ts.translate_ast(s.ast(f), 'python').flatten()
+    assert r.startswith(13 * '( ' + '( x == 0 ) or ( x == 1 ) )'), r[:80]
+    code = s.compile_init(no_str=True)
+    assert eval(code, dict(x=1, y=0))
+    assert not eval(code, dict(x=3, y=0))
+
+
 @raises(TypeError)
 def check_translate_unrecognized_types(spc):
     ts.translate(spc, 'gr1c')
@@ -41,3 +41,16 @@ def rabin_test():
     assert(dra.states.accepting._pairs[1][0]._list == [] )
     assert(dra.states.accepting._pairs[1][1]._set == set() )
     assert(dra.states.accepting._pairs[1][1]._list == [] )
+
+
+def remove_deadends_test():
+    ba = trs.BA()
+    ba.states.add_from(['q0', 'q1', 'q2'])
+    ba.states.initial.add_from(['q0', 'q1'])
+    ba.states.accepting.add_from(['q0', 'q2'])
+    ba.transitions.add('q0', 'q0')
+    ba.transitions.add('q0', 'q2')
+    assert ba.remove_deadends() == 2
+    assert set(ba.states) == {'q0'}
+    assert set(ba.states.initial) == {'q0'}
+    assert set(ba.states.accepting) == {'q0'}
@@ -0,0 +1,114 @@
+"""Tests for transys.export.stream (part of transys subpackage)"""
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from nose.tools import assert_raises
+
+from tulip import transys as trs
+from tulip.transys.export import graph2promela, save_d3, stream
+
+
+def small_fts():
+    ts = trs.FTS()
+    ts.name = 'small'
+    ts.states.add_from(['s0', 's1', 's2'])
+    ts.states.initial.add('s0')
+    ts.atomic_propositions.add_from({'home', 'lot'})
+    ts.states.add('s0', ap={'home'})
+    ts.states.add('s2', ap={'lot'})
+    ts.sys_actions.add_from({'go', 'stay'})
+    ts.transitions.add('s0', 's1', sys_actions='go')
+    ts.transitions.add('s1', 's2', sys_actions='go')
+    ts.transitions.add('s2', 's0', sys_actions='go')
+    ts.transitions.add('s1', 's1', sys_actions='stay')
+    return ts
+
+
+class Stream_test(object):
+    def setUp(self):
+        self.ts = small_fts()
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_dot(self):
+        f = StringIO()
+        stream.write_dot(self.ts, f)
+        s = f.getvalue()
+        assert s.startswith('digraph "small" {')
+        assert s.rstrip().endswith('}')
+        assert s.count(' -> ') == 4 + 1, s
+        assert 'phantominit0 -> 0;' in s
+        assert '"s0\\n{home}"' in s, s
+        assert '"sys:go"' in s, s
+
+    def test_truncation(self):
+        f = StringIO()
+        stream.write_dot(self.ts, f, max_label=4)
+        s = f.getvalue()
+        assert '"s..."' in s, s
+        assert 'home' not in s
+        assert stream._truncate('abcdef', 6) == 'abcdef'
+        assert stream._truncate('abcdef', 5) == 'ab...'
+        assert stream._truncate('abcdef', 2) == 'ab'
+        assert stream._truncate('abcdef', None) == 'abcdef'
+
+    def test_d3_json(self):
+        f = StringIO()
+        stream.write_d3_json(self.ts, f)
+        data = json.loads(f.getvalue())
+        assert data['directed'] and data['multigraph']
+        ids = [d['id'] for d in data['nodes']]
+        assert set(ids) == {'s0', 's1', 's2'}
+        edges = {(ids[d['source']], ids[d['target']], d['sys_actions'])
+                 for d in data['links']}
+        assert edges == {('s0', 's1', 'go'), ('s1', 's2', 'go'),
+                         ('s2', 's0', 'go'), ('s1', 's1', 'stay')}, edges
+        node = data['nodes'][ids.index('s2')]
+        assert node['ap'] == '{lot}', node
+
+    def test_gzip(self):
+        fname = os.path.join(self.tmpdir, 'small.json.gz')
+        self.ts.write(fname)
+        with gzip.open(fname, 'rb') as f:
+            data = json.loads(f.read().decode('utf-8'))
+        assert len(data['nodes']) == 3
+        fname = os.path.join(self.tmpdir, 'small.dot')
+        self.ts.write(fname, compress=True)
+        with gzip.open(fname, 'rb') as f:
+            assert f.read().decode('utf-8').startswith('digraph')
+
+    def test_promela(self):
+        s = graph2promela.fts2promela(self.ts)
+        assert 'active proctype small(){' in s
+        assert 'bool home;' in s and 'bool lot;' in s
+        assert s.count('goto') == 4 + 1, s
+        assert s.count('\t\t lot = 1;') == 1, s
+        fname = os.path.join(self.tmpdir, 'small.pml')
+        self.ts.save(fname)
+        with open(fname) as f:
+            assert f.read().split('*/')[1] == s.split('*/')[1]
+
+    def test_html(self):
+        fname = os.path.join(self.tmpdir, 'small.html')
+        save_d3.labeled_digraph2d3(self.ts, fname)
+        with io.open(fname, encoding='utf-8') as f:
+            s = f.read()
+        assert '"id": "s1"' in s
+        assert 'd3.layout.force' in s
+
+    def test_unknown_format(self):
+        fname = os.path.join(self.tmpdir, 'small.xyz')
+        with assert_raises(ValueError):
+            self.ts.write(fname)
+        with assert_raises(ValueError):
+            self.ts.write(StringIO())
@@ -274,6 +274,30 @@ class LabeledDiGraph_test(object):
     def test_add_edge_illegal_value(self):
         self.G.add_edge(1, 2, month='haha')
 
+    def test_add_new_edges_from(self):
+        G = self.G
+        G.states.add_from({3, 4})
+        label = dict(month='Feb', day='Tue')
+        G.transitions.add_new_from([(1, 3, label), (2, 3, label),
+                                    (3, 4, dict(month='Jan'))])
+        assert G[1][3][0] == label, G[1][3][0]
+        assert G[2][3][0] == label
+        assert G[1][3][0] is not G[2][3][0]
+        assert G[3][4][0] == {'month': 'Jan'}
+        assert G.pred[3][1] is G.succ[1][3]
+        # labels are still typed
+        with assert_raises(ValueError):
+            G[1][3][0]['day'] = 'abc'
+        with assert_raises(ValueError):
+            G.add_new_edges_from([(4, 1, dict(month='haha'))])
+        with assert_raises(AttributeError):
+            G.add_new_edges_from([(4, 1, dict(mo='Jan'))])
+        # existing edge or node missing
+        with assert_raises(ValueError):
+            G.add_new_edges_from([(1, 2, label)])
+        with assert_raises(ValueError):
+            G.add_new_edges_from([(1, 5, label)])
+
     @raises(ValueError)
     def test_node_subscript_assign_illegal_value(self):
         self.G.node[1]['month'] = 'abc'
@@ -328,5 +352,32 @@ def test_remove_deadends():
     g.remove_edge(4, 0)
     g.add_edge(0, 0)
 
-    g.remove_deadends()
+    r = g.remove_deadends()
     assert(len(g) == 1)
+    assert(r == n - 1)
+
+
+def test_remove_deadends_worklist():
+    g = labeled_graphs.LabeledDiGraph()
+    # long chain into a cycle, with dead branches hanging off it
+    n = 1000
+    g.add_nodes_from(range(-2 * n, n))
+    g.add_edges_from((i, i + 1) for i in range(n - 1))
+    g.add_edge(n - 1, n - 2)
+    g.add_edges_from((i, -i) for i in range(1, n))
+    g.add_edges_from((-i, -i - n) for i in range(1, n))
+    g.states.initial.add_from([0, -1, -1 - n])
+    # a tree that dies out
+    g.add_nodes_from(['a', 'b', 'c'])
+    g.add_edge(0, 'a')
+    g.add_edge('a', 'b')
+    g.add_edge('a', 'c')
+    m = len(g)
+    r = g.remove_deadends()
+    assert(r == m - n)
+    assert(len(g) == n)
+    assert(set(g) == set(range(n)))
+    assert(set(g.states.initial) == {0})
+    assert(g.number_of_edges() == n)
+    assert(not g.has_deadends())
+    assert(g.remove_deadends() == 0)
@@ -6,6 +6,10 @@ import logging
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 
+import networkx as nx
+import nose.tools as nt
+import numpy as np
+
 from tulip.transys import machines
 
 def test_strip_ports():
@@ -42,3 +46,200 @@ def test_strip_ports():
         assert(u == x)
         assert(v == y)
         assert(d == b)
+
+
+def traffic_light():
+    mealy = machines.MealyMachine()
+    mealy.add_inputs({'tick': {0, 1}})
+    mealy.add_outputs({'go': {0, 1}})
+    mealy.add_nodes_from(['red', 'green', 'yellow', 'off'])
+    mealy.states.initial.add('red')
+    mealy.add_edge('red', 'green', tick=1, go=1)
+    mealy.add_edge('red', 'red', tick=0, go=0)
+    mealy.add_edge('green', 'yellow', tick=1, go=0)
+    mealy.add_edge('green', 'green', tick=0, go=1)
+    mealy.add_edge('yellow', 'red', tick=1, go=0)
+    mealy.add_edge('yellow', 'off', tick=0, go=0)
+    return mealy
+
+
+def test_compile():
+    mealy = traffic_light()
+    c = mealy.compile()
+    assert len(c) == 6
+    assert c.input_ports == ('tick',)
+    assert c.output_ports == ('go',)
+    for u, _, d in mealy.edges_iter(data=True):
+        inputs = {'tick': d['tick']}
+        v, outputs = mealy.reaction(u, inputs)
+        i, y = c.step(c.state_ids[u], c.encode_inputs(inputs))
+        assert c.states[i] == v
+        assert c.decode_outputs(y) == outputs
+    ids, ys = c.step_batch(c.initial[0], [(1,), (0,), (1,), (1,)])
+    assert [c.states[i] for i in ids] == ['green', 'green', 'yellow', 'red']
+    assert ys == [(1,), (1,), (0,), (0,)]
+    inputs = dict(tick=[0, 1, 1, 0])
+    r = machines.guided_run(mealy, input_sequences=inputs)
+    assert r == (['red', 'green', 'yellow', 'off'],
+                 dict(go=[0, 1, 0, 0])), r
+    assert machines.guided_run(c, input_sequences=inputs) == r
+    assert c.run('green', dict(tick=[1])) == (['yellow'], dict(go=[0]))
+
+
+def test_compile_errors():
+    mealy = traffic_light()
+    c = mealy.compile()
+    with nt.assert_raises(ValueError):
+        c.step(c.state_ids['red'], (2,))
+    with nt.assert_raises(ValueError):
+        c.step_batch(c.state_ids['yellow'], [(0,), (0,)])
+    # changes after compiling are not reflected
+    mealy.add_edge('yellow', 'green', tick=0, go=1)
+    assert c.step(c.state_ids['yellow'], (0,)) == (
+        c.state_ids['off'], (0,))
+    # not input-deterministic
+    with nt.assert_raises(ValueError):
+        mealy.compile()
+
+
+def test_batch_guided_run():
+    mealy = traffic_light()
+    c = mealy.compile()
+    ticks = [[0, 1, 1, 0], [1, 1, 1, 1], [1, 0, 0, 1]]
+    inputs = np.array(ticks)[:, :, np.newaxis]
+    states, outputs = machines.batch_guided_run(mealy, inputs)
+    assert states.shape == (3, 4)
+    assert outputs.shape == (3, 4, 1)
+    for k, tick in enumerate(ticks):
+        r, y = machines.guided_run(mealy, input_sequences=dict(tick=tick))
+        assert [c.states[i] for i in states[k]] == r
+        assert outputs[k, :, 0].tolist() == y['go']
+    # start runs from different states
+    states, _ = machines.batch_guided_run(
+        c, inputs[:, :1], from_states=[c.state_ids[u] for u in
+                                       ['red', 'green', 'yellow']])
+    assert [c.states[i] for i in states[:, 0]] == ['red', 'yellow', 'red']
+    # "off" is a dead-end, and 2 is not a valid input
+    inputs = np.array([[1, 1, 0, 1], [1, 2, 1, 1]])[:, :, np.newaxis]
+    with nt.assert_raises(ValueError):
+        machines.batch_guided_run(c, inputs)
+    states, _ = machines.batch_guided_run(
+        c, inputs, stop_at_dead_ends=True)
+    off = c.state_ids['off']
+    assert states[0].tolist() == [
+        c.state_ids['green'], c.state_ids['yellow'], off, -1], states
+    assert states[1].tolist() == [c.state_ids['green'], -1, -1, -1]
+
+
+def test_batch_random_run():
+    mealy = traffic_light()
+    c = mealy.compile()
+    states, inputs, outputs = machines.batch_random_run(
+        c, 50, 10, seed=0)
+    assert states.shape == (50, 10)
+    assert inputs.shape == (50, 10, 1)
+    assert outputs.shape == (50, 10, 1)
+    # each step is a transition
+    for k in range(50):
+        u = c.initial[0]
+        for t in range(10):
+            if u == c.state_ids['off']:
+                assert states[k, t] == -1
+                break
+            v, y = c.step(u, tuple(inputs[k, t]))
+            assert states[k, t] == v
+            assert tuple(outputs[k, t]) == y
+            u = v
+    # some runs reach the dead-end
+    assert (states == -1).any()
+
+
+def random_mealy(n, seed=0, n_outputs=2, classes=5):
+    """Return input-deterministic machine with `n` states.
+
+    Successors and outputs depend on the state modulo `classes`,
+    so the machine has many equivalent states.
+    """
+    rng = np.random.RandomState(seed)
+    nxt = rng.randint(classes, size=(classes, 2))
+    out = rng.randint(n_outputs, size=(classes, 2))
+    mealy = machines.MealyMachine()
+    mealy.add_inputs({'x': {0, 1}})
+    mealy.add_outputs({'y': set(range(n_outputs))})
+    mealy.add_nodes_from(range(n))
+    mealy.states.initial.add(0)
+    for u in range(n):
+        c = u % classes
+        for x in (0, 1):
+            # any state of the successor class
+            v = nxt[c, x] + classes * rng.randint(n // classes)
+            mealy.add_edge(u, v, x=x, y=out[c, x])
+    return mealy
+
+
+def naive_blocks(mealy):
+    """Return number of classes of reachable states,
+    by refinement to a fixpoint."""
+    (u0,) = mealy.states.initial
+    reached = nx.descendants(mealy, u0) | {u0}
+    mealy = mealy.subgraph(reached)
+    block = {u: 0 for u in mealy}
+    while True:
+        sig = {
+            u: (block[u], frozenset(
+                (d['x'], d['y'], block[v])
+                for _, v, d in mealy.edges_iter(u, data=True)))
+            for u in mealy}
+        index = dict()
+        new = {u: index.setdefault(s, len(index)) for u, s in sig.items()}
+        if len(index) == len(set(block.values())):
+            return len(index)
+        block = new
+
+
+def test_minimize():
+    mealy = traffic_light()
+    # 'off' is unreachable after adding no edge to it
+    mealy.remove_edge('yellow', 'off')
+    mealy.add_edge('off', 'red', tick=0, go=0)
+    m = machines.minimize(mealy)
+    assert set(m) == {'red', 'green', 'yellow'}, set(m)
+    assert set(m.states.initial) == {'red'}
+    # equivalent states
+    mealy = machines.MealyMachine()
+    mealy.add_inputs({'tick': {0, 1}})
+    mealy.add_outputs({'go': {0, 1}})
+    mealy.add_nodes_from(['Sinit', 0, 1, 2, 3])
+    mealy.states.initial.add('Sinit')
+    mealy.add_edge('Sinit', 0, tick=0, go=0)
+    mealy.add_edge('Sinit', 1, tick=1, go=0)
+    for u in range(4):
+        mealy.add_edge(u, (u + 1) % 4, tick=0, go=u % 2)
+    m = machines.minimize(mealy)
+    assert len(m) == 3, m.states()
+    assert 'Sinit' in m
+    inputs = dict(tick=[0, 0, 0, 0, 0])
+    assert m.run('Sinit', inputs)[1] == mealy.run('Sinit', inputs)[1]
+    # nondeterministic for the same input and output
+    mealy.add_edge(0, 2, tick=0, go=0)
+    with nt.assert_raises(ValueError):
+        machines.minimize(mealy)
+
+
+def test_minimize_random():
+    for seed in range(5):
+        mealy = random_mealy(200, seed=seed)
+        m = machines.minimize(mealy)
+        assert len(m) == naive_blocks(mealy), (len(m), naive_blocks(mealy))
+        assert len(m) <= 5
+        inputs = np.random.RandomState(seed).randint(2, size=(20, 30))
+        _, outputs = machines.batch_guided_run(
+            mealy, inputs[:, :, None])
+        _, outputs_ = machines.batch_guided_run(
+            m.compile(), inputs[:, :, None])
+        assert (outputs == outputs_).all()
+    # few equivalent states
+    for seed in range(10):
+        mealy = random_mealy(30, seed=seed, n_outputs=1, classes=30)
+        m = machines.minimize(mealy)
+        assert len(m) == naive_blocks(mealy), (len(m), naive_blocks(mealy))
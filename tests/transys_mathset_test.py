@@ -4,7 +4,7 @@ Tests for transys.mathset (part of transys subpackage)
 """
 from __future__ import print_function
 
-from nose.tools import raises
+from nose.tools import raises, assert_raises
 from collections import Iterable
 
 from tulip.transys.mathset import MathSet, SubSet, PowerSet, TypedDict
@@ -195,6 +195,56 @@ def powerset_test():
 
     return s
 
+def hashable_mathset_test():
+    s = MathSet([1, 2], hashable=True)
+    s |= [2, 3]
+    s.add('a')
+    assert s._set == {1, 2, 3, 'a'}
+    assert s._list == list()
+    assert 3 in s
+    assert [1, 2] not in s
+    t = s | [4]
+    assert t._hashable
+    assert t._set == {1, 2, 3, 4, 'a'}
+    with assert_raises(TypeError):
+        s.add([1, 2])
+    with assert_raises(TypeError):
+        s.add_from([5, {6}])
+
+
+def mathset_add_from_generator_test():
+    s = MathSet()
+    s.add_from(x for x in [1, [2], 1, [2], (3,)])
+    assert s._set == {1, (3,)}
+    assert s._list == [[2]]
+    # order of unhashables preserved
+    s.add_from([[4], [2], {5}])
+    assert s._list == [[2], [4], {5}]
+
+
+def subset_add_from_test():
+    superset = MathSet(range(10))
+    s = SubSet(superset, hashable=True)
+    s.add_from(x for x in range(3))
+    assert s._set == {0, 1, 2}
+    with assert_raises(Exception):
+        s.add_from([1, 11])
+    assert s._set == {0, 1, 2}
+    with assert_raises(TypeError):
+        s.add_from('ab')
+
+
+def powerset_contains_test():
+    p = PowerSet({'a', 'b', 'c'})
+    assert {'a', 'c'} in p
+    assert ['a'] in p
+    assert {'d'} not in p
+    assert [[1]] not in p
+    q = PowerSet([[1, 2], 'a'])
+    assert [[1, 2]] in q
+    assert [[1]] not in q
+
+
 class PowerSet_operations_test(object):
     def setUp(self):
         self.p = PowerSet({1, 2, 3})
@@ -246,3 +296,4 @@ class TypedDict_test(object):
 
         d['human'] = 'Bob'
         assert(d['human'] == 'Bob')
+
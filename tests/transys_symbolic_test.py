@@ -0,0 +1,175 @@
+"""Tests for transys.symbolic (part of transys subpackage)"""
+import logging
+import os
+import tempfile
+
+from nose.tools import assert_raises
+from omega.games import gr1
+
+from tulip import spec, synth
+from tulip import transys as trs
+from tulip.transys.symbolic import (
+    SymbolicFTS, SymbolicMealyMachine, sys_to_automaton, env_to_automaton)
+
+
+logging.getLogger('tulip').setLevel('ERROR')
+logging.getLogger('omega').setLevel('ERROR')
+
+
+def cycle_fts():
+    ts = trs.FTS()
+    ts.states.add_from(['s0', 's1', 's2', 's3'])
+    ts.states.initial.add('s0')
+    ts.atomic_propositions.add_from({'home', 'lot'})
+    ts.states.add('s0', ap={'home'})
+    ts.states.add('s2', ap={'lot'})
+    ts.transitions.add_from([
+        ('s0', 's1'), ('s1', 's2'), ('s2', 's3'),
+        ('s3', 's0'), ('s1', 's1')])
+    return ts
+
+
+def post_pre_test():
+    ts = SymbolicFTS.from_fts(cycle_fts())
+    u = ts.state_set(['s1'])
+    assert ts.states_of(ts.post(u)) == {'s1', 's2'}
+    assert ts.states_of(ts.pre(u)) == {'s0', 's1'}
+    assert ts.states_of(ts.post(ts.init)) == {'s1'}
+    assert ts.states_of(ts.reachable()) == {'s0', 's1', 's2', 's3'}
+    assert ts.states_of(ts.bdd.false) == set()
+
+
+def labels_test():
+    ts = SymbolicFTS.from_fts(cycle_fts())
+    bdd = ts.bdd
+    home = bdd.apply('and', ts.labels, bdd.var('home'))
+    home = bdd.exist(ts.aps, home)
+    assert ts.states_of(home) == {'s0'}
+    ts.label('s0', set())
+    ts.label('s3', {'home', 'lot'})
+    home = bdd.apply('and', ts.labels, bdd.var('home'))
+    home = bdd.exist(ts.aps, home)
+    assert ts.states_of(home) == {'s3'}
+    with assert_raises(ValueError):
+        ts.label('s0', {'unknown'})
+    with assert_raises(ValueError):
+        ts.state_set(['unknown'])
+
+
+def actions_test():
+    ts = SymbolicFTS(
+        ['a', 'b'],
+        actions={'sys_actions': ['go', 'stay']})
+    ts.add_transition('a', 'b', sys_actions='go')
+    ts.add_transition('a', 'a', sys_actions='stay')
+    u = ts.state_set(['a'])
+    assert ts.states_of(ts.post(u)) == {'a', 'b'}
+    with assert_raises(ValueError):
+        SymbolicFTS(['a'], actions={'act': ['go']})
+    with assert_raises(ValueError):
+        SymbolicFTS([])
+
+
+def products_test():
+    ts = SymbolicFTS(range(3), statevar='x')
+    ts.add_initial_from([0])
+    ts.add_transitions_from([(0, 1), (1, 2), (2, 0)])
+    other = SymbolicFTS(['p', 'q'], statevar='y', bdd=ts.bdd)
+    other.add_initial_from(['p'])
+    other.add_transitions_from([('p', 'q'), ('q', 'q')])
+    sync = ts.sync_prod(other)
+    assert len(list(sync.states)) == 6
+    assert sync.states_of(sync.init) == {(0, 'p')}
+    reached = sync.states_of(sync.reachable())
+    assert reached == {(0, 'p'), (1, 'q'), (2, 'q'), (0, 'q')}, reached
+    interleaved = ts.async_prod(other)
+    post = interleaved.states_of(interleaved.post(interleaved.init))
+    assert post == {(1, 'p'), (0, 'q')}, post
+    # products need a shared BDD and distinct state variables
+    with assert_raises(ValueError):
+        ts.sync_prod(SymbolicFTS(range(2), statevar='z'))
+    with assert_raises(ValueError):
+        ts.sync_prod(SymbolicFTS(range(2), statevar='x', bdd=ts.bdd))
+
+
+def sys_to_automaton_test():
+    """Compare realizability with explicit `sys_to_spec`."""
+    fts = cycle_fts()
+    for goal, expected in [('home', True), ('home && lot', False)]:
+        ts = SymbolicFTS.from_fts(fts)
+        a = sys_to_automaton(ts)
+        a.qinit = r'\E \E'
+        a.win['[]<>'] = [a.add_expr(goal)]
+        z, _, _ = gr1.solve_streett_game(a)
+        r = gr1.is_realizable(z, a)
+        specs = spec.GRSpec(sys_prog=goal, qinit=r'\E \E')
+        r_ = synth.is_realizable(specs, sys=fts, solver='omega')
+        assert r == r_ == expected, (goal, r, r_)
+
+
+def env_to_automaton_test():
+    ts = SymbolicFTS(range(2), aps=['door'], owner='env')
+    ts.add_initial_from([0])
+    ts.label(1, {'door'})
+    ts.add_transitions_from([(0, 0), (0, 1), (1, 0)])
+    a = env_to_automaton(ts)
+    assert 'loc' in a.vars
+    assert a.vars['loc']['owner'] == 'env'
+    assert a.vars['door']['owner'] == 'env'
+    (u,) = a.init['env']
+    assert u != ts.bdd.false
+    with assert_raises(ValueError):
+        sys_to_automaton(ts)
+
+
+def mealy_spec():
+    specs = spec.GRSpec(
+        env_vars={'x': (0, 2), 'door': 'boolean'},
+        sys_vars={'y': ['a', 'b']},
+        env_init=['x = 0'],
+        sys_safety=['(x = 0) -> (y = "a")', '(x > 0) -> (y = "b")'],
+        sys_prog=['y = "a"'],
+        env_prog=['x = 0'],
+        moore=False,
+        qinit=r'\A \E')
+    return specs
+
+
+def symbolic_mealy_test():
+    specs = mealy_spec()
+    m = synth.synthesize(specs, symbolic=True)
+    assert isinstance(m, SymbolicMealyMachine), m
+    assert m.inputs == specs.env_vars, m.inputs
+    assert m.outputs == specs.sys_vars, m.outputs
+    inputs = dict(x=[0, 2, 1, 0], door=[True, False, True, True])
+    states, outputs = m.run(input_sequences=inputs)
+    assert outputs == dict(y=['a', 'b', 'b', 'a']), outputs
+    assert states[-1]['door'] is True, states
+    # same outputs as the enumerated machine
+    mealy = synth.synthesize(specs)
+    _, outputs_ = mealy.run('Sinit', inputs)
+    assert outputs == outputs_, (outputs, outputs_)
+    # inputs that violate the assumption
+    with assert_raises(ValueError):
+        m.reaction('Sinit', dict(x=1, door=False))
+    with assert_raises(ValueError):
+        m.reaction('Sinit', dict(x=0))
+    # unrealizable
+    specs.sys_prog = ['False']
+    assert synth.synthesize(specs, symbolic=True) is None
+    with assert_raises(ValueError):
+        synth.synthesize(specs, symbolic=True, solver='gr1py')
+
+
+def symbolic_mealy_dump_test():
+    m = synth.synthesize(mealy_spec(), symbolic=True)
+    fd, fname = tempfile.mkstemp(suffix='.p')
+    os.close(fd)
+    try:
+        m.dump(fname)
+        m_ = SymbolicMealyMachine.load(fname)
+    finally:
+        os.remove(fname)
+    assert m_.vars == m.vars
+    inputs = dict(x=[0, 1, 2, 0, 0], door=[False] * 5)
+    assert m.run(input_sequences=inputs) == m_.run(input_sequences=inputs)
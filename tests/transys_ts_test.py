@@ -126,3 +126,102 @@ def on_the_fly_test():
     prodba.add_all_states()
     check_prodba(prodba)
     prodba.save('prodba_full.pdf')
+
+
+def find_accepting_run_test():
+    ts = trs.FTS()
+    ts.atomic_propositions.add('p')
+    ts.states.add_from(['s0', 's1', 's2', 's3'])
+    ts.states.initial.add('s0')
+    ts.states.add('s0', ap={'p'})
+    ts.transitions.add_from([
+        ('s0', 's1'), ('s1', 's2'), ('s2', 's3'),
+        ('s3', 's0'), ('s2', 's2')])
+    # GF p
+    ba = trs.BA()
+    ba.atomic_propositions.add('p')
+    ba.states.add_from({'q0', 'q1'})
+    ba.states.initial.add('q0')
+    ba.states.accepting.add('q1')
+    ba.transitions.add('q0', 'q1', letter={'p'})
+    ba.transitions.add('q1', 'q1', letter={'p'})
+    ba.transitions.add('q1', 'q0', letter=set())
+    ba.transitions.add('q0', 'q0', letter=set())
+    r = trs.products.find_accepting_run(ts, ba)
+    assert r is not None
+    prefix, cycle = r
+    check_lasso(ts, ba, prefix, cycle)
+    # FG !p: accepting only while s2 loops
+    ba = trs.BA()
+    ba.atomic_propositions.add_from({'p', True})
+    ba.states.add_from({'q0', 'q1'})
+    ba.states.initial.add('q0')
+    ba.states.accepting.add('q1')
+    ba.transitions.add('q0', 'q0', letter={True})
+    ba.transitions.add('q0', 'q1', letter=set())
+    ba.transitions.add('q1', 'q1', letter=set())
+    prefix, cycle = trs.products.find_accepting_run(ts, ba)
+    check_lasso(ts, ba, prefix, cycle)
+    assert {s for s, q in cycle} == {'s2'}, cycle
+    # G p: no accepting run
+    ba = trs.BA()
+    ba.atomic_propositions.add('p')
+    ba.states.add('q0')
+    ba.states.initial.add('q0')
+    ba.states.accepting.add('q0')
+    ba.transitions.add('q0', 'q0', letter={'p'})
+    assert trs.products.find_accepting_run(ts, ba) is None
+
+
+def check_lasso(ts, ba, prefix, cycle):
+    assert cycle
+    run = prefix + cycle + cycle[:1]
+    s0, q0 = run[0]
+    assert s0 in ts.states.initial
+    assert any(q in ba.states.accepting for s, q in cycle)
+    for (s, q), (t, r) in zip(run, run[1:]):
+        assert ts.transitions.find([s], [t]), (s, t)
+        letter = ts.states[t]['ap']
+        assert (ba.transitions.find([q], [r], letter=letter) or
+                ba.transitions.find([q], [r], letter={True})), (q, r)
+
+
+def find_accepting_run_vs_product_test():
+    """Compare with SCCs of the explicit product."""
+    import random
+    import networkx as nx
+    random.seed(0)
+    ba = trs.BA()
+    ba.atomic_propositions.add_from({'p', 'q', True})
+    ba.states.add_from({0, 1, 2})
+    ba.states.initial.add(0)
+    ba.states.accepting.add(2)
+    ba.transitions.add(0, 0, letter={True})
+    ba.transitions.add(0, 1, letter={'p'})
+    ba.transitions.add(1, 2, letter={'q'})
+    ba.transitions.add(1, 1, letter={'p', 'q'})
+    ba.transitions.add(2, 0, letter=set())
+    ba.transitions.add(2, 2, letter={'q'})
+    for _ in range(30):
+        ts = trs.FTS()
+        ts.atomic_propositions.add_from({'p', 'q'})
+        n = 8
+        ts.states.add_from(range(n))
+        ts.states.initial.add(0)
+        for s in range(n):
+            ap = {x for x in ('p', 'q') if random.random() < 0.5}
+            ts.states.add(s, ap=ap)
+        for s in range(n):
+            for t in random.sample(range(n), 2):
+                ts.transitions.add(s, t)
+        prod, accepting = trs.products.ts_ba_sync_prod(ts, ba)
+        g = nx.DiGraph(prod)
+        expected = False
+        for c in nx.strongly_connected_components(g):
+            cyclic = len(c) > 1 or any(g.has_edge(u, u) for u in c)
+            if cyclic and c & accepting:
+                expected = True
+        r = trs.products.find_accepting_run(ts, ba)
+        assert (r is not None) == expected, (r, expected)
+        if r is not None:
+            check_lasso(ts, ba, *r)
@@ -0,0 +1,260 @@
+# Copyright (c) 2017 by California Institute of Technology
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the California Institute of Technology nor
+#    the names of its contributors may be used to endorse or promote
+#    products derived from this software without specific prior
+#    written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL CALTECH
+# OR THE CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF
+# USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+# OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+"""Persistent cache of synthesis results.
+
+Results are keyed by a hash of the specification, in TuLiP LTL syntax
+(as by C{GRSpec.to_canon}) with the variable domains, together with
+the solver name and version, the options of L{GRSpec} that the
+formula omits (C{moore}, C{plus_one}, C{qinit}), and the kind of query.
+The key does not depend on the solver's input language, so any
+specification that the solver accepts can be cached.
+So repeated calls on identical specifications return the stored
+strategy graph, or realizability bit, without calling the solver.
+
+Each entry is a file in a directory, written to a temporary file and
+renamed, so concurrent processes never read partial entries.
+The total size is bounded by evicting the least recently used
+entries, as ordered by file modification time, which a hit updates.
+
+Example::
+
+  from tulip import cache, synth
+  c = cache.SynthesisCache('/tmp/tulip_cache')
+  ctrl = synth.synthesize(specs, sys=ts, cache=c)
+  print(c.hits, c.misses)
+"""
+from __future__ import absolute_import
+import errno
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+
+
+logger = logging.getLogger(__name__)
+DEFAULT_MAX_SIZE = 256 * 2**20
+_SUFFIX = '.pickle'
+_versions = dict()
+
+
+class SynthesisCache(object):
+    """On-disk store of synthesis results, with LRU eviction.
+
+    Supports C{cache[key]}, C{cache[key] = value},
+    C{key in cache}, C{len(cache)} and L{clear}.
+    Keys are computed by L{key}.
+
+    The attributes C{hits} and C{misses} count
+    lookups made by this instance.
+    """
+
+    def __init__(self, path=None, max_size=DEFAULT_MAX_SIZE):
+        """Open or create the cache in directory C{path}.
+
+        @param path: directory of the cache.
+            If C{None}, then use the environment variable
+            C{TULIP_CACHE_DIR}, or C{~/.cache/tulip/synth}.
+        @type path: C{str}
+        @param max_size: bound on total size of entries, in bytes
+        @type max_size: C{int}
+        """
+        if path is None:
+            path = os.environ.get(
+                'TULIP_CACHE_DIR',
+                os.path.join('~', '.cache', 'tulip', 'synth'))
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        _makedirs(self.path)
+
+    def __repr__(self):
+        return 'SynthesisCache({p!r}, max_size={m})'.format(
+            p=self.path, m=self.max_size)
+
+    def key(self, spec, solver, query='synthesize', **options):
+        """Return content hash of query C{spec} for C{solver}.
+
+        @type spec: L{GRSpec}
+        @type solver: C{str}
+        @param query: C{'synthesize'} or C{'is_realizable'}
+        @param options: other arguments that affect the result,
+            converted with C{repr}
+        @rtype: C{str}
+        """
+        text = spec.to_canon()
+        h = hashlib.sha256()
+        for x in (solver, solver_version(solver), query,
+                  spec.moore, spec.plus_one, spec.qinit,
+                  sorted(spec.env_vars.items()),
+                  sorted(spec.sys_vars.items()),
+                  sorted(options.items())):
+            h.update(repr(x).encode('utf-8'))
+            h.update(b'\0')
+        h.update(text.encode('utf-8'))
+        return h.hexdigest()
+
+    def __getitem__(self, key):
+        fname = self._fname(key)
+        try:
+            with open(fname, 'rb') as f:
+                value = pickle.load(f)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            # missing, or removed by another process while reading
+            self.misses += 1
+            raise KeyError(key)
+        self.hits += 1
+        _touch(fname)
+        return value
+
+    def __setitem__(self, key, value):
+        fname = self._fname(key)
+        d = os.path.dirname(fname)
+        _makedirs(d)
+        fd, tmp = tempfile.mkstemp(dir=d, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            # atomic on POSIX, and replaces on Windows
+            _replace(tmp, fname)
+        except BaseException:
+            _remove(tmp)
+            raise
+        self._evict()
+
+    def __contains__(self, key):
+        return os.path.isfile(self._fname(key))
+
+    def __len__(self):
+        return sum(1 for _ in self._entries())
+
+    def clear(self):
+        """Remove all entries."""
+        for fname, _, _ in self._entries():
+            _remove(fname)
+
+    def size(self):
+        """Return total size of entries, in bytes."""
+        return sum(size for _, _, size in self._entries())
+
+    def _fname(self, key):
+        return os.path.join(self.path, key[:2], key + _SUFFIX)
+
+    def _entries(self):
+        """Yield C{(fname, mtime, size)} of each entry."""
+        for d in os.listdir(self.path):
+            d = os.path.join(self.path, d)
+            if not os.path.isdir(d):
+                continue
+            for name in os.listdir(d):
+                if not name.endswith(_SUFFIX):
+                    continue
+                fname = os.path.join(d, name)
+                try:
+                    st = os.stat(fname)
+                except OSError:
+                    continue
+                yield fname, st.st_mtime, st.st_size
+
+    def _evict(self):
+        """Remove least recently used entries, until within C{max_size}."""
+        entries = list(self._entries())
+        total = sum(size for _, _, size in entries)
+        if total <= self.max_size:
+            return
+        entries.sort(key=lambda x: x[1])
+        for fname, _, size in entries:
+            if total <= self.max_size:
+                break
+            _remove(fname)
+            total -= size
+            logger.debug('evicted: {f}'.format(f=fname))
+
+
+def solver_version(solver):
+    """Return version of C{solver}, or C{None} if unknown.
+
+    Versions are detected once per process.
+    """
+    if solver in _versions:
+        return _versions[solver]
+    v = None
+    try:
+        if solver == 'omega':
+            import omega
+            import dd
+            v = (omega.__version__, dd.__version__)
+        elif solver == 'gr1py':
+            import gr1py
+            v = gr1py.__version__
+        elif solver == 'gr1c':
+            from tulip.interfaces import gr1c
+            v = gr1c.get_version()
+    except (ImportError, AttributeError, OSError, ValueError):
+        logger.debug('version of {s} unknown'.format(s=solver))
+    _versions[solver] = v
+    return v
+
+
+def _makedirs(path):
+    try:
+        os.makedirs(path)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+
+def _remove(fname):
+    """Remove file, if another process has not already."""
+    try:
+        os.remove(fname)
+    except OSError as e:
+        if e.errno != errno.ENOENT:
+            raise
+
+
+def _touch(fname):
+    """Mark entry as recently used."""
+    try:
+        os.utime(fname, None)
+    except OSError as e:
+        if e.errno != errno.ENOENT:
+            raise
+
+
+def _replace(src, dst):
+    try:
+        os.replace(src, dst)
+    except AttributeError:  # Python 2
+        os.rename(src, dst)
@@ -36,6 +36,9 @@ concern multiple aspects of solutions created by TuLiP and accordingly
 should not be placed under a specific subpackage, like tulip.transys.
 """
 from itertools import chain, repeat
+import os
+import pickle
+import re
 import time
 
 
@@ -175,3 +178,633 @@ def python_case(M, classname="TulipStrategy", start='Sinit'):
                 args=','.join('\n{t}{v}={v}'.format(v=v, t=4*tab)
                               for v in M.inputs))
     return code
+
+
+def write_python_table(filename, M, classname="TulipStrategy",
+                       start='Sinit', lazy=False):
+    """Convenience wrapper for writing output of python_table to file.
+
+    @type  filename: str
+    @param filename: Name of file in which to place the code generated
+        by L{python_table}.
+    @param M, classname, start: as for L{python_table}
+    @param lazy: if C{True}, then store the tables in the file
+        C{filename + '.pickle'}, loaded on first call of C{move}.
+    """
+    if lazy:
+        sidecar = filename + '.pickle'
+        _dump_tables(M, sidecar)
+        # the module finds its tables next to itself
+        code = _python_table(
+            M, classname, start, sidecar=os.path.basename(sidecar))
+    else:
+        code = python_table(M, classname, start)
+    with open(filename, 'w') as f:
+        f.write(code)
+
+
+def python_table(M, classname="TulipStrategy", start='Sinit', sidecar=None):
+    """Export MealyMachine as Python class based on lookup tables.
+
+    Behaves as the class generated by L{python_case},
+    but C{move} takes constant time, and the size of the code
+    is proportional to the number of edges, instead of
+    the edges being nested in branches for each state.
+
+    The transitions of each state are a C{dict} that maps
+    tuples of input values (in the order of C{input_vars})
+    to pairs of next state and index of output valuation.
+    As in L{python_case}, if several edges of a state are
+    enabled by the same input, then the first one is taken.
+
+    @type M: L{MealyMachine}
+    @type classname: C{str}
+    @param start: initial node in C{M}
+    @param sidecar: if a C{str}, then pickle the tables to
+        the file with this name, instead of including them
+        in the code. The file is loaded on first call of C{move}.
+        A relative path is relative to the directory of the
+        generated module (or the current directory, if the
+        code is passed to C{exec}).
+
+    @rtype: str
+    @return: The returned string is valid Python code.
+    """
+    if sidecar is not None:
+        _dump_tables(M, sidecar)
+    return _python_table(M, classname, start, sidecar)
+
+
+def _python_table(M, classname="TulipStrategy", start='Sinit', sidecar=None):
+    """Return code of L{python_table}, without writing C{sidecar}."""
+    node_to_int = dict([(s, i) for i, s in enumerate(M)])
+    input_vars = list(M.inputs) if M.inputs else []
+    input_args = ', '.join(input_vars)
+    if len(input_vars) == 1:
+        key = '({a},)'.format(a=input_args)
+    else:
+        key = '({a})'.format(a=input_args)
+    if sidecar is None:
+        transitions, outputs = _tables(M)
+        tables = (
+            '    _transitions = (\n{transitions}    )\n'
+            '    _outputs = (\n{outputs}    )\n').format(
+                transitions=''.join(
+                    '        {d!r},\n'.format(d=d) for d in transitions),
+                outputs=''.join(
+                    '        {d!r},\n'.format(d=d) for d in outputs))
+        load = ''
+    else:
+        tables = (
+            '    _transitions = None\n'
+            '    _outputs = None\n'
+            '    _sidecar = {sidecar!r}\n').format(sidecar=sidecar)
+        load = (
+            '        if self._transitions is None:\n'
+            '            self._load()\n')
+    code = (
+        'class {classname}(object):\n'
+        '    """Mealy transducer.\n'
+        '\n'
+        '    Internal states are integers, the current state\n'
+        '    is stored in the attribute "state".\n'
+        '    To take a transition, call method "move".\n'
+        '\n'
+        '    The names of input variables are stored in the\n'
+        '    attribute "input_vars".\n'
+        '\n'
+        '    Automatically generated by tulip.dumpsmach on {date}\n'
+        '    To learn more about TuLiP, visit http://tulip-control.org\n'
+        '    """\n'
+        '{tables}'
+        '\n'
+        '    def __init__(self):\n'
+        '        self.state = {sinit}\n'
+        '        self.input_vars = {input_vars!r}\n'
+        '\n'
+        '    def move(self, {input_args}):\n'
+        '        """Given inputs, take move and return outputs.\n'
+        '\n'
+        '        @rtype: dict\n'
+        '        @return: dictionary with keys of the output variable names:\n'
+        '            {outputs}\n'
+        '        """\n'
+        '{load}'
+        '        if not 0 <= self.state < len(self._transitions):\n'
+        '            raise Exception("Unrecognized internal state: " + '
+        'str(self.state))\n'
+        '        edges = self._transitions[self.state]\n'
+        '        try:\n'
+        '            self.state, j = edges[{key}]\n'
+        '        except KeyError:\n'
+        '            if not edges:\n'
+        '                raise Exception("Reached dead-end state !")\n'
+        '            self._error({input_args})\n'
+        '        return dict(self._outputs[j])\n'
+        '\n'
+        '    def _error(self, {input_args}):\n'
+        '        raise ValueError("Unrecognized input: " + ('
+        '{inputs}).format({args}))\n').format(
+            classname=classname,
+            date=time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
+            tables=tables,
+            load=load,
+            sinit=node_to_int[start],
+            input_vars=input_vars,
+            input_args=input_args,
+            key=key,
+            outputs=[str(v) for v in M.outputs],
+            inputs=''.join(
+                '\n            "{v} = {{{v}}}; "'.format(v=v)
+                for v in input_vars),
+            args=','.join('\n                {v}={v}'.format(v=v)
+                          for v in input_vars))
+    if sidecar is not None:
+        code += (
+            '\n'
+            '    @classmethod\n'
+            '    def _load(cls):\n'
+            '        import os\n'
+            '        import pickle\n'
+            '        path = cls._sidecar\n'
+            '        if "__file__" in globals():\n'
+            '            path = os.path.join(\n'
+            '                os.path.dirname(os.path.abspath(__file__)), path)\n'
+            '        with open(path, "rb") as f:\n'
+            '            cls._transitions, cls._outputs = pickle.load(f)\n')
+    return code
+
+
+def _dump_tables(M, filename):
+    """Pickle the tables of C{M} to file C{filename}."""
+    tables = _tables(M)
+    # protocol 2 is readable by both Python 2 and 3
+    with open(filename, 'wb') as f:
+        pickle.dump(tables, f, protocol=2)
+
+
+def _tables(M):
+    """Return transition and output tables of C{M}.
+
+    States are numbered in the order of iteration over C{M},
+    as by L{python_case}.
+
+    @return: C{(transitions, outputs)}, where C{transitions[i]}
+        is a C{dict} from tuples of input values to
+        C{(next state, output index)}, and C{outputs} is a
+        C{tuple} of C{dict}s of output values.
+    @rtype: C{tuple}
+    """
+    node_to_int = dict([(s, i) for i, s in enumerate(M)])
+    input_vars = list(M.inputs) if M.inputs else []
+    output_vars = list(M.outputs) if M.outputs else []
+    outputs = list()
+    output_index = dict()
+    transitions = list()
+    for u in M:
+        edges = dict()
+        for _, w, d in M.edges_iter(u, data=True):
+            missing = [k for k in input_vars if k not in d]
+            if missing:
+                raise ValueError((
+                    'edge ({u}, {w}) has no values for inputs {m}, '
+                    'so it cannot be tabulated').format(
+                        u=u, w=w, m=missing))
+            key = tuple(d[k] for k in input_vars)
+            if key in edges:
+                continue
+            out = tuple((k, d[k]) for k in output_vars if k in d)
+            j = output_index.get(out)
+            if j is None:
+                j = len(outputs)
+                output_index[out] = j
+                outputs.append(dict(out))
+            edges[key] = (node_to_int[w], j)
+        transitions.append(edges)
+    return tuple(transitions), tuple(outputs)
+
+
+def write_c99(filename, M, name='tulip_strategy', start='Sinit'):
+    """Write the output of L{c99} to C{filename + '.h'} and C{'.c'}.
+
+    @param filename: path without extension
+    @return: sizes of tables, as returned by L{c99_rom_size}
+    @rtype: C{dict}
+    """
+    tables = _c99_tables(M, name, start)
+    header = os.path.basename(filename) + '.h'
+    h, c = _c99_code(tables, header)
+    with open(filename + '.h', 'w') as f:
+        f.write(h)
+    with open(filename + '.c', 'w') as f:
+        f.write(c)
+    return _c99_rom(tables)
+
+
+def c99(M, name='tulip_strategy', start='Sinit', header=None):
+    """Export MealyMachine as C99 header and source.
+
+    The generated code is self-contained (includes only
+    C{stdint.h}), allocates no memory, and C{step} takes
+    constant time, except for a binary search over the values
+    of integer inputs whose range is much wider than
+    their number of values.
+
+    The header declares, with C{name} as prefix:
+
+      - C{name_state_t}: unsigned integer type of states
+      - C{name_input_t}, C{name_output_t}: C{struct}s with
+        an C{int32_t} field for each input and output
+      - C{void name_init(name_state_t *state)}
+      - C{int32_t name_encode_input(const name_input_t *input)}:
+        return index of C{input} in the transition table,
+        or C{-1} if no transition is labeled with C{input}
+      - C{int name_step(name_state_t *state,
+        const name_input_t *input, name_output_t *output)}:
+        take the transition, and return C{NAME_OK},
+        or return C{NAME_INVALID_INPUT} and leave C{state}
+        unchanged, if no transition from C{state}
+        is labeled with C{input}.
+
+    Boolean values are represented by 0 and 1.
+    String values are represented by their index in the
+    sorted domain of the variable, also defined as constants
+    C{NAME_VAR_VALUE} in the header.
+
+    The tables are stored in the smallest unsigned integer types
+    that fit them. Use L{c99_rom_size} for their size.
+
+    @type M: L{MealyMachine}
+    @param name: prefix of identifiers, and name of files
+    @type name: C{str}
+    @param start: initial state in C{M}
+    @param header: name of header to include in the source,
+        default C{name + '.h'}
+    @return: C{(header, source)}
+    @rtype: C{tuple} of C{str}
+    """
+    tables = _c99_tables(M, name, start)
+    if header is None:
+        header = name + '.h'
+    return _c99_code(tables, header)
+
+
+def c99_rom_size(M, start='Sinit'):
+    """Return bytes of constant tables in output of L{c99}.
+
+    @return: C{dict} that maps table names to bytes,
+        with the sum under key C{'total'}
+    @rtype: C{dict}
+    """
+    return _c99_rom(_c99_tables(M, 'tulip_strategy', start))
+
+
+def _c99_tables(M, name, start):
+    """Return the transition tables of C{M} for L{c99}.
+
+    Transitions are indexed by C{state * n_codes + code},
+    where C{code} encodes the input values in mixed radix,
+    with one digit for each input port, in sorted order:
+    the index of the value among those that label transitions.
+    """
+    if not _C_NAME.match(name):
+        raise ValueError(
+            '"{n}" is not a valid C identifier'.format(n=name))
+    c = M.compile()
+    n_states = len(c.states)
+    inputs = [
+        _c_port(M.inputs[k], {x[j] for t in c._table for x in t}, k)
+        for j, k in enumerate(c.input_ports)]
+    size = 1
+    for p in reversed(inputs):
+        p['weight'] = size
+        size *= len(p['seen'])
+    outputs = [
+        _c_port(M.outputs[k], {y[j] for t in c._table for _, y in t.values()},
+                k)
+        for j, k in enumerate(c.output_ports)]
+    rows = dict()
+    nxt = [n_states] * (n_states * size)
+    out = [0] * (n_states * size)
+    for u, t in enumerate(c._table):
+        for x, (v, y) in t.items():
+            code = sum(
+                p['seen'].index(a) * p['weight']
+                for p, a in zip(inputs, x))
+            nxt[u * size + code] = v
+            out[u * size + code] = rows.setdefault(y, len(rows))
+    rows = sorted(rows, key=rows.get)
+    for j, p in enumerate(outputs):
+        p['values'] = [p['encode'](y[j]) for y in rows]
+    return dict(
+        name=name,
+        initial=c.state_ids[start],
+        n_states=n_states,
+        n_codes=size,
+        inputs=inputs,
+        outputs=outputs,
+        next=nxt,
+        output=out,
+        n_rows=len(rows))
+
+
+_C_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+_C_UINT = [(2**8, 'uint8_t', 1), (2**16, 'uint16_t', 2),
+           (2**32, 'uint32_t', 4)]
+_C_INT = [(2**7, 'int8_t', 1), (2**15, 'int16_t', 2),
+          (2**31, 'int32_t', 4)]
+
+
+def _c_port(dom, seen, name):
+    """Return C{dict} that describes port C{name} for L{c99}.
+
+    @param dom: domain of port, as in C{MealyMachine.inputs}
+    @param seen: values that label transitions
+    """
+    if not _C_NAME.match(name):
+        raise ValueError(
+            '"{n}" is not a valid C identifier'.format(n=name))
+    strings = [x for x in seen if isinstance(x, str)]
+    if strings and len(strings) < len(seen):
+        raise ValueError(
+            'port "{n}" has both string and other values'.format(n=name))
+    if strings:
+        enum = set(seen)
+        if isinstance(dom, (set, frozenset, list, tuple)):
+            enum.update(x for x in dom if isinstance(x, str))
+        enum = sorted(enum)
+        index = {x: i for i, x in enumerate(enum)}
+        seen = sorted(seen, key=index.get)
+        return dict(name=name, enum=enum, seen=seen,
+                    digits=enum, encode=index.get)
+    seen = sorted(int(x) for x in seen)
+    for x in seen:
+        if not -2**31 <= x < 2**31:
+            raise ValueError(
+                'value {x} of port "{n}" does not fit in int32_t'.format(
+                    x=x, n=name))
+    # digits indexed by offset from smallest value,
+    # if the range is not much wider than the values
+    if seen and seen[-1] - seen[0] < 4 * len(seen) + 64:
+        digits = list(range(seen[0], seen[-1] + 1))
+    else:
+        digits = None
+    return dict(name=name, enum=None, seen=seen, digits=digits, encode=int)
+
+
+def _c_type(n, types=_C_UINT):
+    """Return C{(name, bytes)} of smallest type that fits C{n}."""
+    for bound, t, b in types:
+        if n < bound:
+            return t, b
+    raise ValueError('{n} does not fit in 32 bits'.format(n=n))
+
+
+def _c99_rom(tables):
+    """Return bytes of each constant table, and their sum."""
+    rom = dict()
+    _, b = _c_type(tables['n_states'])
+    rom['next'] = b * len(tables['next'])
+    _, b = _c_type(tables['n_rows'])
+    rom['output'] = b * len(tables['output'])
+    for p in tables['inputs']:
+        if p['digits'] is not None:
+            _, b = _c_type(len(p['seen']) + 1)
+            size = b * len(p['digits'])
+        else:
+            size = 4 * len(p['seen'])
+        rom['input_' + p['name']] = size
+    for p in tables['outputs']:
+        _, b = _c_int_type(p['values'])
+        rom['output_' + p['name']] = b * len(p['values'])
+    rom['total'] = sum(rom.values())
+    return rom
+
+
+def _c_int_type(values):
+    """Return C{(name, bytes)} of smallest type for C{values}."""
+    if not values:
+        return 'uint8_t', 1
+    lo = min(values)
+    hi = max(values)
+    if lo >= 0:
+        return _c_type(hi)
+    return _c_type(max(-lo, hi + 1), _C_INT)
+
+
+def _c_array(t, name, values):
+    """Return C definition of constant array."""
+    lines = list()
+    for i in range(0, len(values), 16):
+        lines.append('    ' + ', '.join(
+            str(v) for v in values[i:i + 16]) + ',')
+    if not lines:
+        # ISO C forbids empty arrays
+        lines.append('    0')
+    return 'static const {t} {name}[{n}] = {{\n{body}\n}};\n'.format(
+        t=t, name=name, n=max(len(values), 1), body='\n'.join(lines))
+
+
+def _c99_code(tables, header):
+    """Return C{(header, source)} for C{tables} of L{_c99_tables}."""
+    name = tables['name']
+    NAME = name.upper()
+    n_states = tables['n_states']
+    state_t, _ = _c_type(n_states)
+    row_t, _ = _c_type(tables['n_rows'])
+    rom = _c99_rom(tables)
+    date = time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())
+    # header
+    enums = list()
+    for p in tables['inputs'] + tables['outputs']:
+        if p['enum'] is None:
+            continue
+        enums.append('/* values of "{v}" */\n'.format(v=p['name']))
+        for i, x in enumerate(p['enum']):
+            s = re.sub(r'\W', '_', x)
+            enums.append('#define {N}_{v}_{s} {i}\n'.format(
+                N=NAME, v=p['name'].upper(), s=s.upper(), i=i))
+    fields = lambda ports: ''.join(
+        '    int32_t {v};\n'.format(v=p['name']) for p in ports) or (
+            '    int32_t unused;\n')
+    h = (
+        '/* Mealy transducer.\n'
+        ' *\n'
+        ' * Automatically generated by tulip.dumpsmach on {date}\n'
+        ' * To learn more about TuLiP, visit http://tulip-control.org\n'
+        ' */\n'
+        '#ifndef {N}_H\n'
+        '#define {N}_H\n'
+        '\n'
+        '#include <stdint.h>\n'
+        '\n'
+        '#define {N}_NUM_STATES {n_states}\n'
+        '#define {N}_INITIAL {initial}\n'
+        '#define {N}_OK 0\n'
+        '#define {N}_INVALID_INPUT (-1)\n'
+        '\n'
+        '{enums}'
+        '\n'
+        'typedef {state_t} {name}_state_t;\n'
+        '\n'
+        'typedef struct {{\n'
+        '{inputs}'
+        '}} {name}_input_t;\n'
+        '\n'
+        'typedef struct {{\n'
+        '{outputs}'
+        '}} {name}_output_t;\n'
+        '\n'
+        'void {name}_init({name}_state_t *state);\n'
+        'int32_t {name}_encode_input(const {name}_input_t *input);\n'
+        'int {name}_step({name}_state_t *state,\n'
+        '    const {name}_input_t *input, {name}_output_t *output);\n'
+        '\n'
+        '#endif\n').format(
+            N=NAME,
+            name=name,
+            date=date,
+            n_states=n_states,
+            initial=tables['initial'],
+            enums=''.join(enums),
+            state_t=state_t,
+            inputs=fields(tables['inputs']),
+            outputs=fields(tables['outputs']))
+    # tables
+    defs = list()
+    encode = list()
+    for p in tables['inputs']:
+        v = p['name']
+        arr = '{name}_input_{v}'.format(name=name, v=v)
+        if p['enum'] is not None:
+            # digit of each enum value, or -1
+            index = {x: i for i, x in enumerate(p['seen'])}
+            digits = [index.get(x, len(p['seen'])) for x in p['enum']]
+            t, _ = _c_type(len(p['seen']) + 1)
+            defs.append(_c_array(t, arr, digits))
+            encode.append((
+                '    if (input->{v} < 0 || input->{v} >= {n})\n'
+                '        return -1;\n'
+                '    d = {arr}[input->{v}];\n').format(
+                    v=v, n=len(digits), arr=arr))
+        elif p['digits'] is not None:
+            index = {x: i for i, x in enumerate(p['seen'])}
+            digits = [index.get(x, len(p['seen'])) for x in p['digits']]
+            t, _ = _c_type(len(p['seen']) + 1)
+            defs.append(_c_array(t, arr, digits))
+            encode.append((
+                '    if (input->{v} < {lo} || input->{v} > {hi})\n'
+                '        return -1;\n'
+                '    d = {arr}[input->{v} - ({lo})];\n').format(
+                    v=v, lo=p['digits'][0], hi=p['digits'][-1], arr=arr))
+        else:
+            defs.append(_c_array('int32_t', arr, p['seen']))
+            encode.append((
+                '    d = {name}_search({arr}, {n}, input->{v});\n').format(
+                    name=name, v=v, n=len(p['seen']), arr=arr))
+        encode.append((
+            '    if (d >= {n})\n'
+            '        return -1;\n'
+            '    code += d * {w};\n').format(
+                n=len(p['seen']), w=p['weight']))
+    assign = list()
+    for p in tables['outputs']:
+        arr = '{name}_output_{v}'.format(name=name, v=p['name'])
+        t, _ = _c_int_type(p['values'])
+        defs.append(_c_array(t, arr, p['values']))
+        assign.append('    output->{v} = {arr}[row];\n'.format(
+            v=p['name'], arr=arr))
+    search = ''
+    if any(p['enum'] is None and p['digits'] is None
+           for p in tables['inputs']):
+        search = (
+            '/* Return index of x in sorted a[0..n), or n. */\n'
+            'static int32_t {name}_search(\n'
+            '    const int32_t *a, int32_t n, int32_t x)\n'
+            '{{\n'
+            '    int32_t lo = 0, hi = n;\n'
+            '    while (lo < hi) {{\n'
+            '        int32_t mid = lo + (hi - lo) / 2;\n'
+            '        if (a[mid] < x)\n'
+            '            lo = mid + 1;\n'
+            '        else\n'
+            '            hi = mid;\n'
+            '    }}\n'
+            '    return (lo < n && a[lo] == x) ? lo : n;\n'
+            '}}\n'
+            '\n').format(name=name)
+    c = (
+        '/* Mealy transducer, see {header}.\n'
+        ' *\n'
+        ' * Automatically generated by tulip.dumpsmach on {date}\n'
+        ' *\n'
+        ' * ROM of tables: {total} bytes\n'
+        '{rom}'
+        ' */\n'
+        '#include "{header}"\n'
+        '\n'
+        '#define NUM_CODES {n_codes}\n'
+        '\n'
+        '/* next state, or {N}_NUM_STATES if no transition,\n'
+        ' * indexed by state * NUM_CODES + input code */\n'
+        '{next}'
+        '\n'
+        '/* index of output values, indexed as above */\n'
+        '{output}'
+        '\n'
+        '{defs}'
+        '\n'
+        '{search}'
+        'void {name}_init({name}_state_t *state)\n'
+        '{{\n'
+        '    *state = {N}_INITIAL;\n'
+        '}}\n'
+        '\n'
+        'int32_t {name}_encode_input(const {name}_input_t *input)\n'
+        '{{\n'
+        '    int32_t code = 0;\n'
+        '    int32_t d;\n'
+        '{encode}'
+        '    (void)input;\n'
+        '    (void)d;\n'
+        '    return code;\n'
+        '}}\n'
+        '\n'
+        'int {name}_step({name}_state_t *state,\n'
+        '    const {name}_input_t *input, {name}_output_t *output)\n'
+        '{{\n'
+        '    int32_t code;\n'
+        '    uint32_t i;\n'
+        '    {row_t} row;\n'
+        '    if (*state >= {N}_NUM_STATES)\n'
+        '        return {N}_INVALID_INPUT;\n'
+        '    code = {name}_encode_input(input);\n'
+        '    if (code < 0)\n'
+        '        return {N}_INVALID_INPUT;\n'
+        '    i = (uint32_t)*state * NUM_CODES + (uint32_t)code;\n'
+        '    if ({name}_next[i] == {N}_NUM_STATES)\n'
+        '        return {N}_INVALID_INPUT;\n'
+        '    row = {name}_output[i];\n'
+        '{assign}'
+        '    (void)row;\n'
+        '    (void)output;\n'
+        '    *state = {name}_next[i];\n'
+        '    return {N}_OK;\n'
+        '}}\n').format(
+            N=NAME,
+            name=name,
+            header=header,
+            date=date,
+            total=rom['total'],
+            rom=''.join(
+                ' *   {k}: {b}\n'.format(k=k, b=rom[k])
+                for k in sorted(rom) if k != 'total'),
+            n_codes=tables['n_codes'],
+            next=_c_array(state_t, name + '_next', tables['next']),
+            output=_c_array(row_t, name + '_output', tables['output']),
+            defs='\n'.join(defs),
+            search=search,
+            encode=''.join(encode),
+            row_t=row_t,
+            assign=''.join(assign))
+    return h, c
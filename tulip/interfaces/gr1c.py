@@ -44,15 +44,22 @@ Use the logging module to throttle verbosity.
 from __future__ import print_function
 
 from pkg_resources import parse_version
+from itertools import chain
 import logging
 import copy
+import errno
 import os
 import subprocess
-import tempfile
+import threading
 import json
 import xml.etree.ElementTree as ET
 import networkx as nx
 from tulip.spec import GRSpec, translate
+from tulip.interfaces import process
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
 
 
 GR1C_MIN_VERSION = '0.9.0'
@@ -340,60 +347,61 @@ def _parse_vars(variables, vardict):
 def load_aut_json(x):
     """Return strategy constructed from output of gr1c
 
+    A file-like object is parsed node by node,
+    as it is read, see L{process.iter_json}.
+
     @param x: string or file-like object
 
     @return: strategy as C{networkx.DiGraph}, like the return value of
         L{load_aut_xml}
     """
-    try:
+    if hasattr(x, 'read'):
+        members = process.iter_json(x)
+    else:
         autjs = json.loads(x)
-    except TypeError:
-        autjs = json.load(x)
-    if autjs['version'] != 1:
+        nodes = autjs.pop('nodes')
+        members = chain(
+            ((None, k, v) for k, v in autjs.items()),
+            (('nodes', k, v) for k, v in nodes.items()))
+    top = dict()
+    nodes = list()
+    for parent, node_ID, d in members:
+        if parent is None:
+            top[node_ID] = d
+        else:
+            nodes.append((node_ID, d))
+    if top.get('version') != 1:
         raise ValueError('Only gr1c JSON format version 1 is supported.')
-    # convert to nx
+    # convert to nx, reusing the parsed node labels
+    symtab = [list(v.keys())[0] for v in top['ENV'] + top['SYS']]
+    edges = list()
+    for node_ID, d in nodes:
+        d['state'] = dict(zip(symtab, d['state']))
+        edges.extend((node_ID, to_node) for to_node in d.pop('trans'))
     A = nx.DiGraph()
-    symtab = autjs['ENV'] + autjs['SYS']
-    A.env_vars = dict([list(v.items())[0] for v in autjs['ENV']])
-    A.sys_vars = dict([list(v.items())[0] for v in autjs['SYS']])
-    omit = {'state', 'trans'}
-    for node_ID, d in autjs['nodes'].items():
-        node_label = {k: d[k] for k in d if k not in omit}
-        node_label['state'] = dict([(list(symtab[i].keys())[0],
-                                     autjs['nodes'][node_ID]['state'][i])
-                                    for i in range(len(symtab))])
-        A.add_node(node_ID, node_label)
-    for node_ID, d in autjs['nodes'].items():
-        for to_node in d['trans']:
-            A.add_edge(node_ID, to_node)
+    A.add_nodes_from(nodes)
+    A.env_vars = dict([list(v.items())[0] for v in top['ENV']])
+    A.sys_vars = dict([list(v.items())[0] for v in top['SYS']])
+    A.add_edges_from(edges)
     return A
 
+
 def check_syntax(spec_str):
     """Check whether given string has correct gr1c specification syntax.
 
     Return True if syntax check passed, False on error.
     """
     _assert_gr1c()
-    f = tempfile.TemporaryFile()
-    try:
-        f.write(bytes(spec_str, 'utf-8'))
-    except TypeError:  # Try to be compatible with Python 2.7
-        f.write(bytes(spec_str))
-    f.seek(0)
+    r = process.run([GR1C_BIN_PREFIX+"gr1c", "-s"],
+                    input=spec_str, merge_stderr=True)
 
-    p = subprocess.Popen([GR1C_BIN_PREFIX+"gr1c", "-s"],
-                         stdin=f,
-                         stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                         universal_newlines=True)
-    p.wait()
+    logger.debug('gr1c returncode: ' + str(r.returncode) )
+    logger.debug('gr1c stdout: ' + r.stdout )
 
-    logger.debug('gr1c returncode: ' + str(p.returncode) )
-    logger.debug('gr1c stdout: ' + p.stdout.read() )
-
-    if p.returncode == 0:
+    if r.returncode == 0:
         return True
     else:
-        logger.info(p.stdout.read() )
+        logger.info(r.stdout)
         return False
 
 def check_realizable(spec):
@@ -407,25 +415,16 @@ def check_realizable(spec):
     _assert_gr1c()
     init_option = select_options(spec)
     s = translate(spec, 'gr1c')
-    f = tempfile.TemporaryFile()
-    try:
-        f.write(bytes(s, 'utf-8'))
-    except TypeError:  # Try to be compatible with Python 2.7
-        f.write(bytes(s))
-    f.seek(0)
     logger.info('starting realizability check')
-    p = subprocess.Popen([GR1C_BIN_PREFIX+"gr1c", "-n", init_option, "-r"],
-                         stdin=f,
-                         stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                         universal_newlines=True)
-    p.wait()
+    r = process.run([GR1C_BIN_PREFIX+"gr1c", "-n", init_option, "-r"],
+                    input=s, merge_stderr=True)
 
     logger.info('gr1c input:\n' + s +_hl)
 
-    if p.returncode == 0:
+    if r.returncode == 0:
         return True
     else:
-        logger.info(p.stdout.read() )
+        logger.info(r.stdout)
         return False
 
 def synthesize(spec):
@@ -438,26 +437,15 @@ def synthesize(spec):
     <https://tulip-control.github.io/gr1c/md_spc_format.html#initconditions>}
     for a detailed description.
 
+    The strategy is parsed as gr1c writes it.
+    The graph attributes C{'wall_time'} and C{'peak_rss'}
+    of the strategy are those of L{process.Result}.
+
     @return: strategy as C{networkx.DiGraph},
         or None if unrealizable or error occurs.
     """
     _assert_gr1c()
     init_option = select_options(spec)
-    try:
-        p = subprocess.Popen(
-            [GR1C_BIN_PREFIX + "gr1c",
-             "-n", init_option,
-             "-t", "json"],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-            universal_newlines=True
-        )
-    except OSError as e:
-        if e.errno == os.errno.ENOENT:
-            raise Exception('gr1c not found in path.')
-        else:
-            raise
-
     s = translate(spec, 'gr1c')
     logger.info('\n{hl}\n gr1c input:\n {s}\n{hl}'.format(s=s, hl=_hl))
 
@@ -471,18 +459,30 @@ def synthesize(spec):
     except:
         logger.error('failed to write auxiliary file: "{f}"'.format(f=fname))
 
-    (stdoutdata, stderrdata) = p.communicate(s)
+    try:
+        r = process.run(
+            [GR1C_BIN_PREFIX + "gr1c",
+             "-n", init_option,
+             "-t", "json"],
+            input=s, parse=load_aut_json)
+    except OSError as e:
+        if e.errno == errno.ENOENT:
+            raise Exception('gr1c not found in path.')
+        else:
+            raise
 
     msg = (
         ('{spaces} gr1c return code: {c}\n\n'
          '{spaces} gr1c stdout, stderr:\n {out}\n\n').format(
-             c=p.returncode, out=stdoutdata, spaces=30 * ' '
+             c=r.returncode, out=r.stdout + r.stderr, spaces=30 * ' '
         )
     )
 
-    if p.returncode == 0:
+    if r.returncode == 0:
         logger.debug(msg)
-        strategy = load_aut_json(stdoutdata)
+        strategy = r.value
+        strategy.graph['wall_time'] = r.wall_time
+        strategy.graph['peak_rss'] = r.peak_rss
         return strategy
     else:
         print(msg)
@@ -571,23 +571,33 @@ class GR1CSession(object):
 
     Unless otherwise indicated, command methods return True on
     success, False if error.
+
+    Several queries can be pipelined with the method L{batch},
+    which writes all commands before reading the replies.
+    If the gr1c process exits, then queries raise C{OSError}.
+    If a reply cannot be read, then the gr1c process is killed,
+    because its remaining replies would answer later queries.
     """
     def __init__(self, spec_filename, sys_vars, env_vars=[], prompt=">>> "):
         self.spec_filename = spec_filename
         self.sys_vars = sys_vars[:]
         self.env_vars = env_vars[:]
         self.prompt = prompt
+        self._numgoals = None
         if self.spec_filename is not None:
-            self.p = subprocess.Popen([GR1C_BIN_PREFIX+"gr1c",
-                                       "-i", self.spec_filename],
-                                      stdin=subprocess.PIPE,
-                                      stdout=subprocess.PIPE,
-                                      stderr=subprocess.STDOUT,
-                                      bufsize=0,
-                                      universal_newlines=True)
+            self.p = self._spawn()
         else:
             self.p = None
 
+    def _spawn(self):
+        return subprocess.Popen([GR1C_BIN_PREFIX+"gr1c",
+                                 "-i", self.spec_filename],
+                                stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT,
+                                bufsize=0,
+                                universal_newlines=True)
+
     def iswinning(self, state):
         """Return True if given state is in winning set, False otherwise.
 
@@ -595,65 +605,17 @@ class GR1CSession(object):
         (strings) and values of the value taken by that variable in
         this state, e.g., as in nodes of the Automaton class.
         """
-        state_vector = list(range(len(state)))
-        for ind in range(len(self.env_vars)):
-            state_vector[ind] = state[self.env_vars[ind]]
-        for ind in range(len(self.sys_vars)):
-            state_vector[ind+len(self.env_vars)] = state[self.sys_vars[ind]]
-        self.p.stdin.write(
-            "winning " +
-            " ".join([str(i) for i in state_vector])+"\n"
-        )
-        if "True\n" in self.p.stdout.readline():
-            return True
-        else:
-            return False
+        return self._query(('iswinning', state))
 
     def getindex(self, state, goal_mode):
-        if goal_mode < 0 or goal_mode > self.numgoals()-1:
-            raise ValueError("Invalid goal mode requested: "+str(goal_mode))
-        state_vector = list(range(len(state)))
-        for ind in range(len(self.env_vars)):
-            state_vector[ind] = state[self.env_vars[ind]]
-        for ind in range(len(self.sys_vars)):
-            state_vector[ind+len(self.env_vars)] = state[self.sys_vars[ind]]
-        self.p.stdin.write("getindex "+" ".join(
-            [str(i) for i in state_vector]) +" " +
-            str(goal_mode) +"\n"
-        )
-        line = self.p.stdout.readline()
-        if len(self.prompt) > 0:
-                loc = line.find(self.prompt)
-                if loc >= 0:
-                    line = line[len(self.prompt):]
-        return int(line[:-1])
+        return self._query(('getindex', state, goal_mode))
 
     def env_next(self, state):
         """Return list of possible next environment moves, given current state.
 
         Format of given state is same as for iswinning method.
         """
-        state_vector = list(range(len(state)))
-        for ind in range(len(self.env_vars)):
-            state_vector[ind] = state[self.env_vars[ind]]
-        for ind in range(len(self.sys_vars)):
-            state_vector[ind+len(self.env_vars)] = state[self.sys_vars[ind]]
-        self.p.stdin.write(
-            "envnext " +" ".join([str(i) for i in state_vector]) +"\n"
-        )
-        env_moves = []
-        line = self.p.stdout.readline()
-        while "---\n" not in line:
-            if len(self.prompt) > 0:
-                loc = line.find(self.prompt)
-                if loc >= 0:
-                    line = line[len(self.prompt):]
-            env_moves.append(dict([
-                (k, int(s)) for (k,s) in
-                zip(self.env_vars, line.split())
-            ]))
-            line = self.p.stdout.readline()
-        return env_moves
+        return self._query(('env_next', state))
 
     def sys_nextfeas(self, state, env_move, goal_mode):
         """Return list of next system moves consistent with some strategy.
@@ -661,34 +623,7 @@ class GR1CSession(object):
         Format of given state and env_move is same as for iswinning
         method.
         """
-        if goal_mode < 0 or goal_mode > self.numgoals()-1:
-            raise ValueError("Invalid goal mode requested: "+str(goal_mode))
-        state_vector = list(range(len(state)))
-        for ind in range(len(self.env_vars)):
-            state_vector[ind] = state[self.env_vars[ind]]
-        for ind in range(len(self.sys_vars)):
-            state_vector[ind+len(self.env_vars)] = state[self.sys_vars[ind]]
-        emove_vector = list(range(len(env_move)))
-        for ind in range(len(self.env_vars)):
-            emove_vector[ind] = env_move[self.env_vars[ind]]
-        self.p.stdin.write("sysnext "+" ".join(
-            [str(i) for i in state_vector]
-        )+" "+" ".join(
-            [str(i) for i in emove_vector]
-        )+" "+str(goal_mode)+"\n")
-        sys_moves = []
-        line = self.p.stdout.readline()
-        while "---\n" not in line:
-            if len(self.prompt) > 0:
-                loc = line.find(self.prompt)
-                if loc >= 0:
-                    line = line[len(self.prompt):]
-            sys_moves.append(dict([
-                (k, int(s)) for (k,s)
-                in zip(self.sys_vars, line.split())
-            ]))
-            line = self.p.stdout.readline()
-        return sys_moves
+        return self._query(('sys_nextfeas', state, env_move, goal_mode))
 
     def sys_nexta(self, state, env_move):
         """Return list of possible next system moves, whether or not winning.
@@ -696,60 +631,175 @@ class GR1CSession(object):
         Format of given state and env_move is same as for iswinning
         method.
         """
-        state_vector = list(range(len(state)))
-        for ind in range(len(self.env_vars)):
-            state_vector[ind] = state[self.env_vars[ind]]
-        for ind in range(len(self.sys_vars)):
-            state_vector[ind+len(self.env_vars)] = state[self.sys_vars[ind]]
-        emove_vector = list(range(len(env_move)))
-        for ind in range(len(self.env_vars)):
-            emove_vector[ind] = env_move[self.env_vars[ind]]
-        self.p.stdin.write("sysnexta "+" ".join(
-            [str(i) for i in state_vector]
-        )+" "+" ".join(
-            [str(i) for i in emove_vector])+"\n"
-        )
-        sys_moves = []
-        line = self.p.stdout.readline()
-        while "---\n" not in line:
-            if len(self.prompt) > 0:
-                loc = line.find(self.prompt)
-                if loc >= 0:
-                    line = line[len(self.prompt):]
-            sys_moves.append(dict([
-                (k, int(s)) for (k,s) in
-                zip(self.sys_vars, line.split())
-            ]))
-            line = self.p.stdout.readline()
-        return sys_moves
+        return self._query(('sys_nexta', state, env_move))
 
     def getvars(self):
         """Return string of environment and system variable names in order.
 
         Indices are indicated in parens.
         """
-        self.p.stdin.write("var\n")
-        line = self.p.stdout.readline()
-        if len(self.prompt) > 0:
-                loc = line.find(self.prompt)
-                if loc >= 0:
-                    line = line[len(self.prompt):]
-        return line[:-1]
+        return self._query(('getvars',))
 
     def numgoals(self):
-        self.p.stdin.write("numgoals\n")
+        return self._query(('numgoals',))
+
+    def batch(self, queries):
+        """Return replies to C{queries}, sent all together to gr1c.
+
+        Each query is a C{tuple} of the name of a query method
+        and its arguments, for example:
+
+          >>> gs.batch([('iswinning', state), ('env_next', state)])
+          [True, [{'x': 0, 'ze': 0}, {'x': 1, 'ze': 0}]]
+
+        The commands are written by another thread, while the
+        replies are read, so large batches do not fill the pipes.
+        If reading fails, then gr1c is killed, which also
+        stops the writer.
+
+        @type queries: C{list} of C{tuple}
+        @rtype: C{list}
+        """
+        queries = list(queries)
+        commands = ''.join(self._command(q) for q in queries)
+        writer = threading.Thread(target=self._write, args=(commands,))
+        writer.daemon = True
+        writer.start()
+        try:
+            replies = [self._read(q[0]) for q in queries]
+        except Exception:
+            self._kill()
+            raise
+        finally:
+            writer.join()
+        return replies
+
+    def _query(self, query):
+        command = self._command(query)
+        try:
+            self.p.stdin.write(command)
+            return self._read(query[0])
+        except Exception:
+            self._kill()
+            raise
+
+    def _kill(self):
+        """Kill gr1c, leaving unread replies behind."""
+        if self.alive():
+            self.p.kill()
+        self.p.wait()
+
+    def _write(self, commands):
+        try:
+            self.p.stdin.write(commands)
+        except (IOError, OSError):
+            # gr1c exited, detected when reading
+            pass
+
+    def _command(self, query):
+        """Return command line for C{query}, see L{batch}."""
+        name = query[0]
+        args = query[1:]
+        if name in ('getindex', 'sys_nextfeas'):
+            goal_mode = args[-1]
+            if goal_mode < 0 or goal_mode > self._cached_numgoals()-1:
+                raise ValueError(
+                    "Invalid goal mode requested: "+str(goal_mode))
+        if name == 'iswinning':
+            (state,) = args
+            words = ["winning", self._state_vector(state)]
+        elif name == 'getindex':
+            state, goal_mode = args
+            words = ["getindex", self._state_vector(state), str(goal_mode)]
+        elif name == 'env_next':
+            (state,) = args
+            words = ["envnext", self._state_vector(state)]
+        elif name == 'sys_nextfeas':
+            state, env_move, goal_mode = args
+            words = ["sysnext", self._state_vector(state),
+                     self._env_vector(env_move), str(goal_mode)]
+        elif name == 'sys_nexta':
+            state, env_move = args
+            words = ["sysnexta", self._state_vector(state),
+                     self._env_vector(env_move)]
+        elif name == 'getvars':
+            words = ["var"]
+        elif name == 'numgoals':
+            words = ["numgoals"]
+        else:
+            raise ValueError('unknown query "{q}"'.format(q=name))
+        return " ".join(w for w in words if w) + "\n"
+
+    def _state_vector(self, state):
+        return " ".join(
+            str(state[k]) for k in self.env_vars + self.sys_vars)
+
+    def _env_vector(self, env_move):
+        return " ".join(str(env_move[k]) for k in self.env_vars)
+
+    def _cached_numgoals(self):
+        if self._numgoals is None:
+            self._numgoals = self.numgoals()
+        return self._numgoals
+
+    def _read(self, name):
+        """Return reply to query C{name}, parsed."""
+        if name == 'env_next':
+            return self._read_moves(self.env_vars)
+        if name in ('sys_nextfeas', 'sys_nexta'):
+            return self._read_moves(self.sys_vars)
+        line = self._readline()
+        if name == 'iswinning':
+            return "True\n" in line
+        line = self._strip_prompt(line)
+        if name == 'getvars':
+            return line[:-1]
+        return int(line[:-1])
+
+    def _read_moves(self, names):
+        moves = []
+        line = self._readline()
+        while "---\n" not in line:
+            line = self._strip_prompt(line)
+            moves.append(dict([
+                (k, int(s)) for (k,s) in
+                zip(names, line.split())
+            ]))
+            line = self._readline()
+        return moves
+
+    def _readline(self):
         line = self.p.stdout.readline()
+        # a prompt without reply means that gr1c exited
+        if not line.endswith('\n'):
+            raise OSError(
+                'gr1c exited with return code {r}'.format(
+                    r=self.p.poll()))
+        return line
+
+    def _strip_prompt(self, line):
         if len(self.prompt) > 0:
-                loc = line.find(self.prompt)
-                if loc >= 0:
-                    line = line[len(self.prompt):]
-        return int(line[:-1])
+            loc = line.find(self.prompt)
+            if loc >= 0:
+                line = line[len(self.prompt):]
+        return line
+
+    def alive(self):
+        """Return True if the gr1c process is running."""
+        return self.p is not None and self.p.poll() is None
+
+    def restart(self):
+        """Kill the gr1c process, if running, and start anew."""
+        if self.p is not None:
+            self._kill()
+        self.p = self._spawn()
 
     def reset(self, spec_filename=None):
         """Quit and start anew, reading spec from file with given name.
 
         If no filename given, then use previous one.
         """
+        self._numgoals = None
         if self.p is not None:
             self.p.stdin.write("quit\n")
             returncode = self.p.wait()
@@ -760,15 +810,7 @@ class GR1CSession(object):
         if spec_filename is not None:
             self.spec_filename = spec_filename
         if self.spec_filename is not None:
-            self.p = subprocess.Popen(
-                [GR1C_BIN_PREFIX+"gr1c",
-                "-i", self.spec_filename],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                bufsize=0,
-                universal_newlines=True
-            )
+            self.p = self._spawn()
         else:
             self.p = None
         return True
@@ -783,3 +825,140 @@ class GR1CSession(object):
             return False
         else:
             return True
+
+
+class GR1CSessionPool(object):
+    """Warm gr1c sessions for several spec files.
+
+    Up to C{size} sessions are started for each spec file,
+    when queries arrive, and kept for later queries.
+    Queries to the same spec file are answered by
+    different sessions in parallel, if called from
+    different threads, or with L{submit}.
+    A session whose gr1c process has exited is restarted,
+    and its batch of queries is sent again, once.
+    A session that fails otherwise (e.g., with an unexpected
+    reply) is restarted before the error is raised, so later
+    batches are not answered by stale replies.
+
+    Example:
+
+      >>> pool = GR1CSessionPool(size=2)
+      >>> pool.add('spec.spc', sys_vars=['y'], env_vars=['x'])
+      >>> pool.batch('spec.spc', [('iswinning', dict(x=0, y=1))])
+      [True]
+      >>> pool.close()
+
+    With C{asyncio}:
+
+      >>> replies = await pool.submit('spec.spc', queries)
+
+    @param size: maximal number of sessions for each spec file
+    @param prompt: as in L{GR1CSession}
+    """
+
+    def __init__(self, size=1, prompt=">>> "):
+        self.size = size
+        self.prompt = prompt
+        self.restarts = 0
+        self._specs = dict()
+        self._idle = dict()
+        self._sessions = dict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def add(self, spec_filename, sys_vars, env_vars=[]):
+        """Declare the variables of a spec file.
+
+        Sessions for it are started when first queried.
+        """
+        with self._lock:
+            self._specs[spec_filename] = (sys_vars[:], env_vars[:])
+            self._idle.setdefault(spec_filename, Queue())
+            self._sessions.setdefault(spec_filename, list())
+
+    def batch(self, spec_filename, queries):
+        """Return replies to C{queries} about C{spec_filename}.
+
+        @param queries: as in L{GR1CSession.batch}
+        @rtype: C{list}
+        """
+        queries = list(queries)
+        session = self._acquire(spec_filename)
+        try:
+            if not session.alive():
+                self._restart(session)
+            try:
+                return session.batch(queries)
+            except (IOError, OSError):
+                logger.warning('gr1c session failed, retrying')
+            except Exception:
+                self._restart(session)
+                raise
+            self._restart(session)
+            try:
+                return session.batch(queries)
+            except Exception:
+                self._restart(session)
+                raise
+        finally:
+            self._idle[spec_filename].put(session)
+
+    def submit(self, spec_filename, queries, loop=None):
+        """Return C{asyncio} future of L{batch}.
+
+        The batch runs in a thread, so the event loop
+        is not blocked while waiting for gr1c.
+        """
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        with self._lock:
+            if self._executor is None:
+                n = max(1, self.size * max(1, len(self._specs)))
+                self._executor = ThreadPoolExecutor(n)
+        return loop.run_in_executor(
+            self._executor, self.batch, spec_filename, queries)
+
+    def close(self):
+        """Quit all sessions."""
+        with self._lock:
+            sessions = [s for v in self._sessions.values() for s in v]
+            self._sessions = {k: list() for k in self._sessions}
+            self._idle = {k: Queue() for k in self._idle}
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown()
+        for session in sessions:
+            if session.alive():
+                session.close()
+
+    def _acquire(self, spec_filename):
+        """Return idle session, starting one if fewer than C{size}."""
+        if spec_filename not in self._specs:
+            raise ValueError(
+                'unknown spec file "{f}", call `add` first'.format(
+                    f=spec_filename))
+        idle = self._idle[spec_filename]
+        try:
+            return idle.get_nowait()
+        except Empty:
+            pass
+        with self._lock:
+            sessions = self._sessions[spec_filename]
+            if len(sessions) < self.size:
+                sys_vars, env_vars = self._specs[spec_filename]
+                session = GR1CSession(
+                    spec_filename, sys_vars, env_vars, self.prompt)
+                sessions.append(session)
+                return session
+        return idle.get()
+
+    def _restart(self, session):
+        logger.warning(
+            'restarting gr1c session for "{f}"'.format(
+                f=session.spec_filename))
+        self.restarts += 1
+        session.restart()
@@ -13,6 +13,7 @@ U{https://pypi.python.org/pypi/omega}
 from __future__ import absolute_import
 from __future__ import print_function
 
+import json
 import logging
 import time
 
@@ -34,8 +35,383 @@ except ImportError:
     omega = None
 import networkx as nx
 
+from tulip.spec.ast import balanced_fold
+from tulip.transys.symbolic import SymbolicMealyMachine
+
 
 log = logging.getLogger(__name__)
+# heuristics of `variable_order`
+ORDERINGS = ('interleave', 'group', 'dependency')
+# default `order` of `SynthesisSession`, `None` keeps the order of `omega`
+VARIABLE_ORDER = None
+
+
+class SynthesisSession(object):
+    """Game of a specification, solved once and queried many times.
+
+    The automaton is built, and the game solved, at most once.
+    The winning set C{z} and the fixpoint iterates C{yij, xijk}
+    are cached, and shared by realizability, winning-set and
+    strategy queries. So checking realizability, then
+    synthesizing, solves the game only once:
+
+    >>> s = SynthesisSession(spec)
+    >>> if s.is_realizable():
+    ...     g = s.enumerated()
+
+    Attributes:
+
+      - C{spec}: the L{GRSpec} (its strings are replaced by integers)
+      - C{automaton}: built C{omega.symbolic.symbolic.Automaton}
+      - C{bdd}: its BDD manager
+      - C{times}: C{dict} of seconds spent in each stage
+
+    The order of variables in C{bdd} can be saved
+    with L{dump_order}, and reused with L{load_order}:
+
+    >>> dump_order(s.variable_order(), 'order.json')
+    >>> s = SynthesisSession(spec, order=load_order('order.json'))
+    """
+
+    def __init__(self, spec, use_cudd=False, reordering=None, order=None):
+        """Build the automaton of C{spec}.
+
+        @type spec: `tulip.spec.form.GRSpec`
+        @param use_cudd: efficient BDD computations with `dd.cudd`
+        @param reordering: dynamic variable reordering of C{dd.cudd}
+            is enabled, unless C{False}. C{dd.bdd} has no dynamic
+            reordering, so if C{True}, then its variables are
+            sifted once, before solving.
+        @param order: initial order of BDD variables (default:
+            C{VARIABLE_ORDER}), one of:
+              - heuristic in C{ORDERINGS}, see L{variable_order}
+              - C{list} of variables of C{spec}, whose bits are
+                interleaved as by L{variable_order}
+              - C{dict} that maps bits to levels,
+                as returned by L{SynthesisSession.variable_order}
+              - C{None}: the order of C{omega}
+        """
+        self.spec = spec
+        self.times = dict()
+        t0 = time.time()
+        aut = _grspec_to_automaton(spec)
+        sym.fill_blanks(aut)
+        bdd = _init_bdd(use_cudd)
+        if hasattr(bdd, 'configure'):
+            bdd.configure(reordering=reordering is not False)
+        if order is None:
+            order = VARIABLE_ORDER
+        if order is not None:
+            # bits declared before building keep their levels
+            for bit in _order_bits(spec, aut, order):
+                bdd.add_var(bit)
+        aut.bdd = bdd
+        a = aut.build()
+        _conjoin_tables(spec, a)
+        self.times['build'] = time.time() - t0
+        if reordering and not hasattr(bdd, 'configure'):
+            t0 = time.time()
+            _sift(a)
+            self.times['reorder'] = time.time() - t0
+        self.automaton = a
+        self.bdd = bdd
+        self._fixpoint = None
+        self._realizable = None
+        self._transducer = None
+
+    def variable_order(self):
+        """Return current order of BDD variables.
+
+        @return: C{dict} that maps bits to levels
+        """
+        return {var: self.bdd.level_of_var(var) for var in self.bdd.vars}
+
+    def solve(self):
+        """Return winning set, fixpoint iterates, as C{gr1.solve_streett_game}.
+
+        @return: C{(z, yij, xijk)}
+        """
+        if self._fixpoint is None:
+            t0 = time.time()
+            self._fixpoint = gr1.solve_streett_game(self.automaton)
+            self.times['solve'] = time.time() - t0
+            log.info('Winning set computed in {win} sec.'.format(
+                win=self.times['solve']))
+        return self._fixpoint
+
+    def winning_set(self):
+        """Return BDD of the states from which the system wins."""
+        z, _, _ = self.solve()
+        return z
+
+    def is_winning(self, state):
+        """Return C{True} if some winning state agrees with C{state}.
+
+        @param state: assignment of values to (some) variables,
+            with strings for variables of string type
+        @type state: C{dict}
+        """
+        z = self.winning_set()
+        if not state:
+            return z != self.bdd.false
+        u = self.automaton.add_expr(self._state_to_expr(state))
+        u = self.bdd.apply('and', u, z)
+        return u != self.bdd.false
+
+    def is_realizable(self):
+        """Return C{True} if, and only if, C{spec} is realizable."""
+        if self._realizable is None:
+            z = self.winning_set()
+            self._realizable = gr1.is_realizable(z, self.automaton)
+        return self._realizable
+
+    def transducer(self):
+        """Return symbolic transducer, or C{None} if unrealizable.
+
+        @rtype: C{omega.symbolic.symbolic.Automaton}
+        """
+        assert self.automaton.action['sys'][0] != self.bdd.false
+        if not self.is_realizable():
+            return None
+        if self._transducer is None:
+            z, yij, xijk = self.solve()
+            t0 = time.time()
+            t = gr1.make_streett_transducer(z, yij, xijk, self.automaton)
+            self.times['transducer'] = time.time() - t0
+            (u,) = t.action['sys']
+            assert u != self.bdd.false
+            log.info('Symbolic strategy computed in {sym} sec.'.format(
+                sym=self.times['transducer']))
+            self._transducer = t
+        return self._transducer
+
+    def enumerated(self):
+        """Return strategy enumerated as a graph, or C{None}.
+
+        Same as L{synthesize_enumerated_streett}.
+
+        @rtype: `networkx.DiGraph`
+        """
+        t = self.transducer()
+        if t is None:
+            return None
+        t0 = time.time()
+        g = enum.action_to_steps(t, qinit=self.spec.qinit)
+        h = _strategy_to_state_annotated(g, self.automaton)
+        t1 = time.time()
+        log.info('Strategy enumerated in {enu} sec.'.format(enu=t1 - t0))
+        return h
+
+    def symbolic(self):
+        """Return symbolic Mealy machine, or C{None}.
+
+        Same as L{synthesize_symbolic}.
+
+        @rtype: `tulip.transys.symbolic.SymbolicMealyMachine`
+        """
+        if self.spec.moore:
+            raise ValueError(
+                'Symbolic Mealy machines require `spec.moore = False`.')
+        t = self.transducer()
+        if t is None:
+            return None
+        return SymbolicMealyMachine(
+            t, inputs=self.spec.env_vars, outputs=self.spec.sys_vars)
+
+    def _state_to_expr(self, state):
+        doms = dict(self.spec.env_vars)
+        doms.update(self.spec.sys_vars)
+        c = list()
+        for var, value in state.items():
+            if var not in doms:
+                raise ValueError(
+                    'unknown variable "{v}"'.format(v=var))
+            dom = doms[var]
+            if dom in ('boolean', 'bool'):
+                c.append(var if value else '!{v}'.format(v=var))
+                continue
+            if isinstance(dom, list):
+                value = dom.index(value)
+            c.append('({v} = {x})'.format(v=var, x=value))
+        return ' & '.join(c)
+
+
+def variable_order(spec, heuristic='dependency'):
+    """Return variables of C{spec}, ordered by C{heuristic}.
+
+    In the BDD, the bits of each variable follow this order,
+    most significant bit first, and each bit is followed by
+    its primed copy. The heuristics are:
+
+      - C{'interleave'}: variables sorted by name
+      - C{'group'}: variables that change together are adjacent.
+        Two variables are in the same group if both occur
+        primed and unprimed in a clause, as the variables of
+        a transition system do in its transition relation.
+        Groups are sorted by their first variable.
+      - C{'dependency'}: groups that occur in the same clauses
+        are near each other, in the Cuthill-McKee order of
+        the graph of groups.
+
+    @type spec: `tulip.spec.form.GRSpec`
+    @param heuristic: in C{ORDERINGS}
+    @rtype: C{list} of C{str}
+    """
+    if heuristic not in ORDERINGS:
+        raise ValueError(
+            'unknown ordering "{h}", available: {o}'.format(
+                h=heuristic, o=ORDERINGS))
+    variables = set(spec.env_vars)
+    variables.update(spec.sys_vars)
+    if heuristic == 'interleave':
+        return sorted(variables)
+    groups, deps = _variable_graphs(spec, variables)
+    blocks = [tuple(sorted(c)) for c in nx.connected_components(groups)]
+    if heuristic == 'group':
+        blocks.sort()
+    else:
+        block_of = {var: b for b in blocks for var in b}
+        g = nx.Graph()
+        g.add_nodes_from(blocks)
+        g.add_edges_from(
+            (block_of[u], block_of[v]) for u, v in deps.edges_iter()
+            if block_of[u] != block_of[v])
+        blocks = _cuthill_mckee(g)
+    return [var for b in blocks for var in b]
+
+
+def dump_order(order, filename):
+    """Write order of BDD variables to JSON file.
+
+    @param order: C{dict} that maps bits to levels,
+        as returned by L{SynthesisSession.variable_order},
+        or C{list} of variables
+    """
+    with open(filename, 'w') as f:
+        json.dump(order, f, indent=4, sort_keys=True)
+
+
+def load_order(filename):
+    """Return order of BDD variables written by L{dump_order}."""
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+
+def _variable_graphs(spec, variables):
+    """Return graphs of variables that occur in the same clauses.
+
+    @return: C{(groups, deps)}, where C{groups} has an edge
+        between variables that both occur primed and unprimed
+        in a clause, and C{deps} between any variables that
+        occur in a clause
+    """
+    groups = nx.Graph()
+    groups.add_nodes_from(variables)
+    deps = nx.Graph()
+    deps.add_nodes_from(variables)
+    clauses = list()
+    for part in spec._parts:
+        for clause in getattr(spec, part):
+            clauses.append(_clause_vars(spec.ast(clause)))
+    for table in (t for tables in spec.tables.values() for t in tables):
+        unprimed = {c for c in table.columns if not c.endswith("'")}
+        primed = {c[:-1] for c in table.columns if c.endswith("'")}
+        clauses.append((unprimed, primed))
+    for unprimed, primed in clauses:
+        both = sorted(unprimed & primed & variables)
+        groups.add_edges_from(zip(both, both[1:]))
+        occur = sorted((unprimed | primed) & variables)
+        deps.add_edges_from(
+            (u, v) for i, u in enumerate(occur) for v in occur[i + 1:])
+    return groups, deps
+
+
+def _clause_vars(tree):
+    """Return variables that occur in C{tree}, unprimed and primed.
+
+    @type tree: recursive AST
+    @return: C{(unprimed, primed)}, each a C{set}
+    """
+    unprimed = set()
+    primed = set()
+    # (node, in the scope of next operator)
+    stack = [(tree, False)]
+    while stack:
+        u, c = stack.pop()
+        if u.type == 'var':
+            (primed if c else unprimed).add(u.value)
+        c = c or getattr(u, 'operator', None) == 'X'
+        stack.extend((v, c) for v in getattr(u, 'operands', ()))
+    return unprimed, primed
+
+
+def _cuthill_mckee(g):
+    """Return nodes of C{g} in Cuthill-McKee order.
+
+    Each component is traversed breadth-first, from a node of
+    minimal degree, visiting neighbors by increasing degree.
+    Ties are broken by the nodes, so the order is deterministic.
+    """
+    key = lambda u: (g.degree(u), u)
+    order = list()
+    visited = set()
+    for start in sorted(g, key=key):
+        if start in visited:
+            continue
+        visited.add(start)
+        queue = [start]
+        for u in queue:
+            succ = sorted((v for v in g[u] if v not in visited), key=key)
+            visited.update(succ)
+            queue.extend(succ)
+        order.extend(queue)
+    return order
+
+
+def _order_bits(spec, aut, order):
+    """Return bits of C{aut}, primed included, in C{order}.
+
+    Bits of variables missing from C{order} follow, in the order
+    of the heuristic C{'interleave'}.
+
+    @param order: as for L{SynthesisSession}
+    @type aut: `omega.symbolic.symbolic.Automaton`, not built
+    @rtype: C{list}
+    """
+    table = bv.bitblast_table(aut.vars)
+    if isinstance(order, dict):
+        bits = sorted(order, key=order.get)
+        known = set(_interleaved_bits(table, sorted(table)))
+        unknown = [b for b in bits if b not in known]
+        if unknown:
+            raise ValueError(
+                'unknown bits in variable order: {u}'.format(u=unknown))
+        return bits
+    if isinstance(order, str):
+        order = variable_order(spec, order)
+    unknown = [var for var in order if var not in table]
+    if unknown:
+        raise ValueError(
+            'unknown variables in variable order: {u}'.format(u=unknown))
+    rest = sorted(set(table).difference(order))
+    return _interleaved_bits(table, list(order) + rest)
+
+
+def _interleaved_bits(table, variables):
+    """Return bits of C{variables}, each followed by its primed copy.
+
+    The bits of each integer are most significant first.
+    """
+    bits = list()
+    for var in variables:
+        d = table[var]
+        if d['type'] == 'bool':
+            names = [var]
+        else:
+            names = reversed(d['bitnames'])
+        for b in names:
+            bits.extend([b, b + "'"])
+    return bits
 
 
 def is_realizable(spec, use_cudd=False):
@@ -43,15 +419,7 @@ def is_realizable(spec, use_cudd=False):
 
     See `synthesize_enumerated_streett` for more details.
     """
-    aut = _grspec_to_automaton(spec)
-    sym.fill_blanks(aut)
-    bdd = _init_bdd(use_cudd)
-    aut.bdd = bdd
-    a = aut.build()
-    t0 = time.time()
-    z, _, _ = gr1.solve_streett_game(a)
-    t1 = time.time()
-    return gr1.is_realizable(z, a)
+    return SynthesisSession(spec, use_cudd).is_realizable()
 
 
 def synthesize_enumerated_streett(spec, use_cudd=False):
@@ -61,35 +429,29 @@ def synthesize_enumerated_streett(spec, use_cudd=False):
     @param use_cudd: efficient BDD computations with `dd.cudd`
     @rtype: `networkx.DiGraph`
     """
-    aut = _grspec_to_automaton(spec)
-    sym.fill_blanks(aut)
-    bdd = _init_bdd(use_cudd)
-    aut.bdd = bdd
-    a = aut.build()
-    assert a.action['sys'][0] != bdd.false
-    t0 = time.time()
-    z, yij, xijk = gr1.solve_streett_game(a)
-    t1 = time.time()
-    # unrealizable ?
-    if not gr1.is_realizable(z, a):
+    return _session(spec, use_cudd).enumerated()
+
+
+def synthesize_symbolic(spec, use_cudd=False):
+    """Return symbolic transducer, without enumerating it.
+
+    @type spec: `tulip.spec.form.GRSpec`
+    @param use_cudd: efficient BDD computations with `dd.cudd`
+    @return: `None` if unrealizable
+    @rtype: `tulip.transys.symbolic.SymbolicMealyMachine`
+    """
+    if spec.moore:
+        raise ValueError(
+            'Symbolic Mealy machines require `spec.moore = False`.')
+    return _session(spec, use_cudd).symbolic()
+
+
+def _session(spec, use_cudd):
+    """Return L{SynthesisSession}, warn if unrealizable."""
+    s = SynthesisSession(spec, use_cudd)
+    if not s.is_realizable():
         print('WARNING: unrealizable')
-        return None
-    t = gr1.make_streett_transducer(z, yij, xijk, a)
-    t2 = time.time()
-    (u,) = t.action['sys']
-    assert u != bdd.false
-    g = enum.action_to_steps(t, qinit=spec.qinit)
-    h = _strategy_to_state_annotated(g, a)
-    del u, yij, xijk
-    t3 = time.time()
-    log.info((
-        'Winning set computed in {win} sec.\n'
-        'Symbolic strategy computed in {sym} sec.\n'
-        'Strategy enumerated in {enu} sec.').format(
-            win=t1 - t0,
-            sym=t2 - t1,
-            enu=t3 - t2))
-    return h
+    return s
 
 
 def is_circular(spec, use_cudd=False):
@@ -99,6 +461,8 @@ def is_circular(spec, use_cudd=False):
     @param use_cudd: efficient BDD computations with `dd.cudd`
     @rtype: `bool`
     """
+    # `trivial_winning_set` builds the automaton itself
+    spec = spec.expand_tables()
     aut = _grspec_to_automaton(spec)
     sym.fill_blanks(aut)
     bdd = _init_bdd(use_cudd)
@@ -121,6 +485,39 @@ def _init_bdd(use_cudd):
     return cudd.BDD()
 
 
+def _sift(aut):
+    """Reorder the variables of C{aut.bdd} by sifting.
+
+    Each primed variable is then moved next to its unprimed
+    variable, so that renaming them is efficient.
+    Reordering collects garbage, so the nodes of C{aut}
+    are referenced while reordering.
+
+    @type aut: built `omega.symbolic.symbolic.Automaton`
+    """
+    bdd = aut.bdd
+    roots = [
+        u for d in (aut.init, aut.action, aut.win)
+        for nodes in d.values() for u in nodes]
+    for u in roots:
+        bdd.incref(u)
+    n = len(bdd)
+    _bdd.reorder(bdd)
+    levels = bdd.vars
+    order = list()
+    for var in sorted(levels, key=levels.get):
+        if var in aut.unprime:
+            continue
+        order.append(var)
+        if var in aut.prime:
+            order.append(aut.prime[var])
+    _bdd.reorder(bdd, {var: i for i, var in enumerate(order)})
+    for u in roots:
+        bdd.decref(u)
+    log.info('Reordered BDD from {n} to {m} nodes.'.format(
+        n=n, m=len(bdd)))
+
+
 def _int_bounds(aut):
     """Create care set for enumeration.
 
@@ -145,6 +542,98 @@ def _int_bounds(aut):
     return u
 
 
+def _conjoin_tables(spec, aut):
+    """Conjoin the tables of C{spec} to the actions of C{aut}.
+
+    Each table is built directly as a BDD (L{_table_to_bdd}),
+    instead of expanding it to formulas that are parsed and bitblasted.
+
+    @type spec: `tulip.spec.form.GRSpec`
+    @param aut: built automaton
+    @type aut: `omega.symbolic.symbolic.Automaton`
+    """
+    bdd = aut.bdd
+    for part, owner in (('env_safety', 'env'), ('sys_safety', 'sys')):
+        tables = spec.tables[part]
+        if not tables:
+            continue
+        t0 = time.time()
+        (u,) = aut.action[owner]
+        for table in tables:
+            v = _table_to_bdd(table, spec, aut)
+            u = bdd.apply('and', u, v)
+        aut.action[owner] = [u]
+        log.info('{n} tables of {p} built in {t} sec'.format(
+            n=len(tables), p=part, t=time.time() - t0))
+
+
+def _table_to_bdd(table, spec, aut):
+    """Return BDD of relation C{table}.
+
+    Each row is a cube over the bits of the variables.
+    The rows are combined by a balanced disjunction.
+
+    @type table: `tulip.spec.form.Table`
+    @type spec: `tulip.spec.form.GRSpec`
+    @type aut: `omega.symbolic.symbolic.Automaton`
+    @return: node in C{aut.bdd}
+    """
+    doms = dict(spec.env_vars)
+    doms.update(spec.sys_vars)
+    encoders = [_column_encoder(c, doms, aut) for c in table.columns]
+    cubes = list()
+    for row in table.rows:
+        bits = dict()
+        for encode, value in zip(encoders, row):
+            if value is not None:
+                bits.update(encode(value))
+        cubes.append(aut.bdd.cube(bits))
+    bdd = aut.bdd
+    return balanced_fold(
+        lambda u, v: bdd.apply('or', u, v), cubes, bdd.false)
+
+
+def _column_encoder(column, doms, aut):
+    """Return function that maps values to bit assignments.
+
+    Integers are in two's complement, least significant bit first,
+    as C{omega.logic.bitvector} bitblasts them.
+    Strings are replaced by their index in the variable's domain,
+    as by L{tulip.spec.form.GRSpec.str_to_int}.
+    """
+    primed = column.endswith("'")
+    var = column[:-1] if primed else column
+    if var not in aut.vars:
+        raise ValueError(
+            'table column "{c}" is not a declared variable'.format(
+                c=column))
+    d = aut.vars[var]
+    rename = aut.prime if primed else dict()
+    if d['type'] == 'bool':
+        bit = rename.get(var, var)
+        return lambda value: {bit: bool(value)}
+    bits = [rename.get(b, b) for b in d['bitnames']]
+    dom = doms[var]
+    index = (
+        {x: i for i, x in enumerate(dom)}
+        if isinstance(dom, list) else None)
+    low, high = d['dom']
+
+    def encode(value):
+        if index is not None:
+            if value not in index:
+                raise ValueError(
+                    'value {v} of column "{c}" not in {d}'.format(
+                        v=value, c=column, d=dom))
+            value = index[value]
+        if not low <= value <= high:
+            raise ValueError(
+                'value {v} of column "{c}" not in {d}'.format(
+                    v=value, c=column, d=d['dom']))
+        return {b: bool((value >> i) & 1) for i, b in enumerate(bits)}
+    return encode
+
+
 def _strategy_to_state_annotated(g, aut):
     """Move annotation to `dict` as value of `'state'` key.
 
@@ -0,0 +1,339 @@
+# Copyright (c) 2017 by California Institute of Technology
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the California Institute of Technology nor
+#    the names of its contributors may be used to endorse or promote
+#    products derived from this software without specific prior
+#    written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL CALTECH
+# OR THE CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF
+# USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+# OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+"""Running solver processes over pipes.
+
+The input is written to the standard input of the solver,
+and its output is parsed as it is read, so no temporary files
+are created, and the output need not be kept in memory.
+Strategies in JSON are parsed node by node by L{iter_json}.
+
+The wall time and peak resident set size of each solver
+are recorded in the returned L{Result}, and logged.
+Set C{MEMORY_LIMIT} (bytes) to limit the address space
+of solvers (on POSIX systems).
+"""
+from __future__ import absolute_import
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+MEMORY_LIMIT = None
+CHUNK_SIZE = 2**16
+_NUMBER = set('0123456789.eE+-')
+logger = logging.getLogger(__name__)
+
+
+class Result(object):
+    """Outcome of a solver process.
+
+    Attributes:
+
+      - C{args}: command line
+      - C{returncode}
+      - C{value}: returned by the parser of C{stdout},
+        or C{None} if no parser was given or the solver failed
+      - C{stdout}: output not consumed by the parser
+      - C{stderr}: C{''} if merged with C{stdout}
+      - C{wall_time}: seconds from start to exit of solver
+      - C{peak_rss}: maximal resident set size of solver,
+        in bytes, or C{None} if unavailable on this platform
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.returncode = None
+        self.value = None
+        self.stdout = ''
+        self.stderr = ''
+        self.wall_time = None
+        self.peak_rss = None
+
+    def __repr__(self):
+        return (
+            'Result({a}, returncode={r}, wall_time={t}, '
+            'peak_rss={m})').format(
+                a=self.args, r=self.returncode,
+                t=self.wall_time, m=self.peak_rss)
+
+
+def run(args, input=None, parse=None, merge_stderr=False,
+        memory_limit=None):
+    """Run solver with command line C{args}, return L{Result}.
+
+    The C{input} is written from another thread, and C{stderr}
+    is read from another thread, so the pipes never fill up
+    while C{stdout} is being parsed.
+
+    If the parser raises an exception and the solver exits
+    with zero return code, then the exception is raised.
+    If the solver fails, then C{stdout} is stored in
+    C{Result.stdout}, for error messages (at most
+    C{CHUNK_SIZE} characters of the part read by the parser).
+
+    @param args: as for C{subprocess.Popen}
+    @param input: text for C{stdin} of solver
+    @type input: C{str} or C{None}
+    @param parse: function that reads from a text file
+        (C{stdout} of solver) and returns a value
+    @param merge_stderr: if C{True}, then redirect
+        C{stderr} to C{stdout}
+    @param memory_limit: maximal address space of solver,
+        in bytes (default: C{MEMORY_LIMIT})
+    @rtype: L{Result}
+    """
+    if memory_limit is None:
+        memory_limit = MEMORY_LIMIT
+    result = Result(args)
+    stderr = subprocess.STDOUT if merge_stderr else subprocess.PIPE
+    preexec_fn = None
+    if memory_limit is not None and resource is not None:
+        preexec_fn = lambda: resource.setrlimit(
+            resource.RLIMIT_AS, (memory_limit, memory_limit))
+    logger.debug('Calling: ' + ' '.join(args))
+    t0 = time.time()
+    p = subprocess.Popen(
+        args,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=stderr,
+        universal_newlines=True,
+        preexec_fn=preexec_fn)
+    threads = list()
+    threads.append(_start(_write, p.stdin, input))
+    errors = list()
+    if not merge_stderr:
+        threads.append(_start(_read, p.stderr, errors))
+    error = None
+    head = _Head(p.stdout)
+    try:
+        if parse is not None:
+            result.value = parse(head)
+        result.stdout = p.stdout.read()
+    except Exception as e:
+        error = e
+        result.value = None
+        result.stdout = head.head + p.stdout.read()
+    p.stdout.close()
+    for t in threads:
+        t.join()
+    result.stderr = ''.join(errors)
+    result.returncode, result.peak_rss = _wait(p)
+    result.wall_time = time.time() - t0
+    logger.info(
+        '{a} exited with code {r} after {t:1.3} sec, '
+        'peak RSS {m} bytes'.format(
+            a=args[0], r=result.returncode,
+            t=result.wall_time, m=result.peak_rss))
+    if error is not None:
+        if result.returncode == 0:
+            raise error
+        result.value = None
+    return result
+
+
+def _start(target, *args):
+    t = threading.Thread(target=target, args=args)
+    t.daemon = True
+    t.start()
+    return t
+
+
+def _write(f, s):
+    try:
+        if s:
+            f.write(s)
+        f.close()
+    except (IOError, OSError):
+        # solver exited without reading all input
+        pass
+
+
+def _read(f, out):
+    out.append(f.read())
+    f.close()
+
+
+class _Head(object):
+    """File that keeps the first C{CHUNK_SIZE} characters read."""
+
+    def __init__(self, f):
+        self.f = f
+        self.head = ''
+
+    def read(self, *args):
+        s = self.f.read(*args)
+        n = CHUNK_SIZE - len(self.head)
+        if n > 0:
+            self.head += s[:n]
+        return s
+
+    def readline(self, *args):
+        s = self.f.readline(*args)
+        n = CHUNK_SIZE - len(self.head)
+        if n > 0:
+            self.head += s[:n]
+        return s
+
+    def __iter__(self):
+        return iter(self.readline, '')
+
+
+def _wait(p):
+    """Wait for C{p} to exit, return code and peak RSS in bytes."""
+    if resource is None or not hasattr(os, 'wait4'):
+        return p.wait(), None
+    _, status, usage = os.wait4(p.pid, 0)
+    if os.WIFSIGNALED(status):
+        p.returncode = -os.WTERMSIG(status)
+    else:
+        p.returncode = os.WEXITSTATUS(status)
+    # kilobytes on Linux, bytes on macOS
+    rss = usage.ru_maxrss
+    if sys.platform != 'darwin':
+        rss *= 1024
+    return p.returncode, rss
+
+
+def iter_json(f, stream=('nodes',), chunk_size=None):
+    """Yield members of JSON object read from file C{f}.
+
+    The members of the top-level object are yielded as
+    C{(None, key, value)}. If C{key} is in C{stream},
+    then its value must be an object, and each of its members
+    is yielded as C{(key, name, value)}, as soon as it is read.
+    So only one member is held in memory at a time.
+
+    @param f: file-like object with method C{read}
+    @param stream: keys of objects to stream
+    @param chunk_size: number of characters to read at a time
+    """
+    if chunk_size is None:
+        chunk_size = CHUNK_SIZE
+    s = _Scanner(f, chunk_size)
+    s.expect('{')
+    if s.peek() == '}':
+        s.expect('}')
+        return
+    while True:
+        key = s.value()
+        s.expect(':')
+        if key in stream:
+            s.expect('{')
+            if s.peek() == '}':
+                s.expect('}')
+            else:
+                while True:
+                    name = s.value()
+                    s.expect(':')
+                    yield (key, name, s.value())
+                    if s.expect(',}') == '}':
+                        break
+        else:
+            yield (None, key, s.value())
+        if s.expect(',}') == '}':
+            break
+
+
+class _Scanner(object):
+    """Read JSON values from a file, one buffer at a time."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.i = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Read more, return C{False} at end of file."""
+        if self.eof:
+            return False
+        # read more for long values, to avoid decoding them
+        # many times
+        n = max(self.chunk_size, len(self.buf) - self.i)
+        chunk = self.f.read(n)
+        if not chunk:
+            self.eof = True
+            return False
+        # drop consumed part
+        self.buf = self.buf[self.i:] + chunk
+        self.i = 0
+        return True
+
+    def peek(self):
+        """Return next character that is not white space."""
+        while True:
+            n = len(self.buf)
+            while self.i < n and self.buf[self.i] in ' \t\n\r':
+                self.i += 1
+            if self.i < n:
+                return self.buf[self.i]
+            if not self._fill():
+                raise ValueError('unexpected end of JSON input')
+
+    def expect(self, chars):
+        """Consume next character, which must be in C{chars}."""
+        c = self.peek()
+        if c not in chars:
+            raise ValueError(
+                'expected one of "{e}" at "{s}"'.format(
+                    e=chars, s=self.buf[self.i:self.i + 20]))
+        self.i += 1
+        return c
+
+    def value(self):
+        """Consume and return next JSON value."""
+        self.peek()
+        while True:
+            try:
+                x, end = self.decoder.raw_decode(self.buf, self.i)
+            except ValueError:
+                if self._fill():
+                    continue
+                raise
+            # a number may continue in the next chunk
+            if (all(c in _NUMBER for c in self.buf[end:]) and
+                    self._fill()):
+                continue
+            self.i = end
+            return x
@@ -35,13 +35,14 @@ Relevant links:
   - U{slugs<https://github.com/LTLMoP/slugs>}
 """
 from __future__ import absolute_import
+import errno
 import logging
-import json
 import os
 import subprocess
-import tempfile
 import networkx as nx
+import numpy as np
 from tulip.spec import GRSpec, translate
+from tulip.interfaces import process
 
 
 # If this path begins with '/', then it is considered to be absolute.
@@ -49,6 +50,8 @@ from tulip.spec import GRSpec, translate
 SLUGS_COMPILER_PATH = '../tools/StructuredSlugsParser/compiler.py'
 
 BDD_FILE = 'strategy_bdd.txt'
+# both the compiler and `slugs` read their input from this file
+STDIN = '/dev/stdin'
 logger = logging.getLogger(__name__)
 
 
@@ -65,19 +68,18 @@ def check_realizable(spec):
         struct = translate(spec, 'slugs')
     else:
         struct = spec
-    with tempfile.NamedTemporaryFile(delete=False) as fin:
-        try:
-            fin.write(bytes(struct, 'utf-8'))
-        except TypeError:  # Try to be compatible with Python 2.7
-            fin.write(bytes(struct))
-        
-    realizable, out = _call_slugs(fin.name, synth=False)
+    realizable, _ = _call_slugs(struct, synth=False)
     return realizable
 
 
 def synthesize(spec, symbolic=False):
     """Return strategy satisfying the specification C{spec}.
 
+    The strategy is parsed node by node, as C{slugs} writes it.
+    The graph attributes C{'wall_time'} and C{'peak_rss'}
+    of the strategy are those of L{process.Result}
+    for the call to C{slugs}.
+
     @type spec: L{GRSpec} or C{str} in structured slugs syntax.
     @return: If realizable return synthesized strategy, otherwise C{None}.
     @rtype: C{networkx.DiGraph}
@@ -88,34 +90,20 @@ def synthesize(spec, symbolic=False):
         struct = translate(spec, 'slugs')
     else:
         struct = spec
-    with tempfile.NamedTemporaryFile(delete=False) as fin:
-        try:
-            fin.write(bytes(struct, 'utf-8'))
-        except TypeError:  # Try to be compatible with Python 2.7
-            fin.write(bytes(struct))
-    realizable, out = _call_slugs(fin.name, synth=True, symbolic=symbolic)
-    if not realizable:
-        return None
-    os.unlink(fin.name)
     # collect int vars
     vrs = dict(spec.sys_vars)
     vrs.update(spec.env_vars)
-    dout = json.loads(out)
-    g = nx.DiGraph()
-    dvars = dout['variables']
-    for stru, d in dout['nodes'].items():
-        u = int(stru)
-        state = dict(zip(dvars, d['state']))
-        g.add_node(u, state=state)
-        for v in d['trans']:
-            g.add_edge(u, v)
-    h = nx.DiGraph()
-    for u, d in g.nodes_iter(data=True):
-        bit_state = d['state']
-        int_state = _bitfields_to_ints(bit_state, vrs)
-        h.add_node(u, state=int_state)
-    for u, v in g.edges_iter():
-        h.add_edge(u, v)
+    realizable, r = _call_slugs(
+        struct, synth=True, symbolic=symbolic,
+        parse=lambda f: _load_json(f, vrs))
+    if not realizable:
+        return None
+    h = r.value
+    if h is None:
+        raise ValueError(
+            'cannot parse output of slugs:\n{out}'.format(out=r.stdout))
+    h.graph['wall_time'] = r.wall_time
+    h.graph['peak_rss'] = r.peak_rss
     logger.debug(
         ('loaded strategy with vertices:\n  {v}\n'
          'and edges:\n {e}\n').format(
@@ -127,33 +115,117 @@ def synthesize(spec, symbolic=False):
 def _bitfields_to_ints(bit_state, vrs):
     """Convert bitfield representation to integers.
 
-    @type line: C{str}
+    @type bit_state: C{dict} from bit names to C{0, 1}
     @type vrs: C{dict}
     """
     int_state = dict()
+    for var, bitnames in _bitnames(vrs):
+        # little-endian
+        int_state[var] = sum(
+            int(bit_state[b]) << i for i, b in enumerate(bitnames))
+    return int_state
+
+
+def _bitnames(vrs):
+    """Return C{list} of variables in C{vrs} and their bit names.
+
+    A Boolean variable is a bit with its own name.
+    The bits of an integer variable are little-endian.
+    """
+    bits = list()
     for var, dom in vrs.items():
         if dom == 'boolean':
-            int_state[var] = bit_state[var]
+            bits.append((var, [var]))
             continue
         bitnames = ['{var}@{i}'.format(var=var, i=i)
                     for i in range(dom[1].bit_length())]
         bitnames[0] = '{var}@0.{min}.{max}'.format(
             var=var, min=dom[0], max=dom[1])
-        bitvalues = [bit_state[b] for b in bitnames]
-        # little-endian
-        val = int(''.join(str(b) for b in reversed(bitvalues)), 2)
-        int_state[var] = val
-    return int_state
+        bits.append((var, bitnames))
+    return bits
+
+
+def _bit_matrix_to_ints(bits, dvars, vrs):
+    """Return integer states of rows of bit matrix C{bits}.
 
+    All rows are decoded at once, by multiplying the columns
+    of each variable with the weights of its bits.
 
-def _call_slugs(filename, synth=True, symbolic=True, slugs_compiler_path=None):
+    @param bits: C{numpy.ndarray} with a row for each node,
+        and a column for each bit in C{dvars}
+    @param dvars: bit names, as in the JSON output of C{slugs}
+    @type vrs: C{dict}
+    @rtype: C{list} of C{dict}
+    """
+    col = {b: i for i, b in enumerate(dvars)}
+    names = list()
+    columns = list()
+    for var, bitnames in _bitnames(vrs):
+        idx = [col[b] for b in bitnames]
+        weights = np.left_shift(1, np.arange(len(idx), dtype=np.int64))
+        names.append(var)
+        columns.append(bits[:, idx].dot(weights).tolist())
+    if not columns:
+        return [dict() for _ in range(len(bits))]
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+
+def _load_json(f, vrs):
+    """Return strategy read from JSON output of C{slugs}.
+
+    The states are collected in a bit matrix as they are read,
+    and decoded at the end, see L{_bit_matrix_to_ints}.
+    Return C{None} if C{f} does not contain a strategy
+    (e.g., the specification is unrealizable).
+
+    @param f: file-like object
+    @param vrs: C{dict} of variables and their domains
+    """
+    top = dict()
+    nodes = list()
+    rows = list()
+    edges = list()
+    try:
+        for parent, name, d in process.iter_json(f):
+            if parent is None:
+                top[name] = d
+                continue
+            u = int(name)
+            nodes.append(u)
+            rows.append(d['state'])
+            edges.extend((u, v) for v in d['trans'])
+    except ValueError:
+        return None
+    if 'variables' not in top:
+        return None
+    dvars = top['variables']
+    bits = np.array(rows, dtype=np.uint8).reshape(len(rows), len(dvars))
+    states = _bit_matrix_to_ints(bits, dvars, vrs)
+    h = nx.DiGraph()
+    h.add_nodes_from(
+        (u, dict(state=state)) for u, state in zip(nodes, states))
+    h.add_edges_from(edges)
+    return h
+
+
+def _call_slugs(struct, synth=True, symbolic=True, slugs_compiler_path=None,
+                parse=None):
     """Call `slugs` and return results.
 
+    The specification is passed to the compiler, and its output to
+    C{slugs}, over pipes, so no temporary files are created.
+
     slugs_compiler_path is the path to the slugsin converter format.
     If None (default), then use the path as in the module-level
     identifier SLUGS_COMPILER_PATH.  If this path begins with '/',
     then it is considered to be absolute.  Otherwise, it is relative
     to the path of the `slugs` executable.
+
+    @param struct: specification in structured slugs syntax
+    @type struct: C{str}
+    @param parse: passed to L{process.run}, to read the strategy
+    @return: C{(realizable, result)}, where C{result} is
+        the L{process.Result} of C{slugs}
     """
     if slugs_compiler_path is None:
         slugs_compiler_path = SLUGS_COMPILER_PATH
@@ -175,13 +247,13 @@ def _call_slugs(filename, synth=True, symbolic=True, slugs_compiler_path=None):
     if not os.path.exists(slugs_compiler_path):
         raise Exception('slugs/compiler.py not found.')
 
-    with tempfile.NamedTemporaryFile(delete=False) as slugs_infile:
-        subprocess.check_call([slugs_compiler_path, filename],
-                              stdout=slugs_infile,
-                              stderr=subprocess.STDOUT,
-                              universal_newlines=True)
+    r = process.run([slugs_compiler_path, STDIN], input=struct)
+    if r.returncode != 0:
+        raise subprocess.CalledProcessError(
+            r.returncode, r.args, r.stdout + r.stderr)
+    slugsin = r.stdout
 
-    options = [slugs_path, slugs_infile.name]
+    options = [slugs_path, STDIN]
     if synth:
         if symbolic:
             options.extend(['--symbolicStrategy', BDD_FILE])
@@ -196,30 +268,23 @@ def _call_slugs(filename, synth=True, symbolic=True, slugs_compiler_path=None):
         # provide `--onlyRealizability` leads to error message from
         # `slugs`: "Error: Parameter '--onlyRealizability' is unknown."
         pass
-    logger.debug('Calling: ' + ' '.join(options))
     try:
-        p = subprocess.Popen(
-            options,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True)
+        r = process.run(options, input=slugsin, parse=parse)
     except OSError as e:
-        if e.errno == os.errno.ENOENT:
+        if e.errno == errno.ENOENT:
             raise Exception('slugs not found in path.')
         else:
             raise
-    out, err = p.communicate()
     msg = (
-        '\n slugs return code: {c}\n\n'.format(c=p.returncode) +
-        '\n slugs stderr: {c}\n\n'.format(c=err) +
-        '\n slugs stdout:\n\n {out}\n\n'.format(out=out))
+        '\n slugs return code: {c}\n\n'.format(c=r.returncode) +
+        '\n slugs stderr: {c}\n\n'.format(c=r.stderr) +
+        '\n slugs stdout:\n\n {out}\n\n'.format(out=r.stdout))
     logger.debug(msg)
     # error ?
-    if p.returncode != 0:
+    if r.returncode != 0:
         raise Exception(msg)
-    realizable = 'Specification is realizable' in err
+    realizable = 'Specification is realizable' in r.stderr
     # check sanity
     if not realizable:
-        assert 'Specification is unrealizable' in err
-    return realizable, out
+        assert 'Specification is unrealizable' in r.stderr
+    return realizable, r
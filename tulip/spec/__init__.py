@@ -31,5 +31,5 @@
 # SUCH DAMAGE.
 """Specification subpackage of TuLiP"""
 from __future__ import absolute_import
-from .form import LTL, GRSpec
+from .form import LTL, GRSpec, Table
 from .translation import translate
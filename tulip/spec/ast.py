@@ -75,6 +75,11 @@ def make_nodes(opmap=None):
     The tree is defined recursively,
     not with a graph data structure.
     L{Tree} is a graph data structure for that purpose.
+
+    Flattening, C{repr}, C{str} and C{len} traverse
+    the tree with an explicit stack, so deep trees
+    (for example left-deep disjunctions from the parser)
+    do not exceed the recursion limit.
     """
     if opmap is None:
         opmap = OPMAP
@@ -170,19 +175,15 @@ def make_nodes(opmap=None):
             self.operator = operator
             self.operands = list(operands)
 
-        # ''.join would be faster, but __repr__ is for debugging,
-        # not for flattening, so readability takes precedence
         def __repr__(self):
-            return '{t}({op}, {xyz})'.format(
-                t=type(self).__name__,
-                op=repr(self.operator),
-                xyz=', '.join(repr(x) for x in self.operands))
+            return ''.join(_unfold(self, _repr_items, repr))
 
-        # more readable recursive counterpart of __repr__
+        # more readable counterpart of __repr__
         # depth allows limiting recursion to see a shallower view
         def __str__(self, depth=None):
-            if depth is not None:
-                depth = depth - 1
+            if depth is None:
+                return ''.join(_unfold(self, _str_items, str))
+            depth = depth - 1
             if depth == 0:
                 return '...'
             return '({op} {xyz})'.format(
@@ -191,31 +192,69 @@ def make_nodes(opmap=None):
                              for x in self.operands))
 
         def __len__(self):
-            return 1 + sum(len(x) for x in self.operands)
+            n = 0
+            stack = [self]
+            while stack:
+                u = stack.pop()
+                n += 1
+                stack.extend(getattr(u, 'operands', ()))
+            return n
 
         def flatten(self, *arg, **kw):
-            return ' '.join([
-                '(',
-                self.opmap[self.operator],
-                ', '.join(x.flatten(*arg, **kw) for x in self.operands),
-                ')'])
+            """Return formula as C{str}.
+
+            Operators that do not override C{flatten}
+            are expanded with L{_flatten_items},
+            the others (and terminals) are flattened by
+            calling their C{flatten}.
+            """
+            def items(u):
+                if u is self or _func(type(u).flatten) is _flatten:
+                    return u._flatten_items()
+                return None
+            return ''.join(_unfold(
+                self, items, lambda u: u.flatten(*arg, **kw)))
+
+        def _flatten_items(self):
+            """Return strings and operands that C{flatten} joins."""
+            return (
+                ['( ', self.opmap[self.operator], ' '] +
+                _interleave(self.operands, ', ') + [' )'])
+
+    _flatten = _func(Operator.flatten)
 
     # Distinguish operators by arity
     class Unary(Operator):
         pass
 
     class Binary(Operator):
-        def flatten(self, *arg, **kw):
+        def _flatten_items(self):
             """Infix flattener for consistency with parser.
 
             Override it if you want prefix or postfix.
             """
-            return ' '.join([
-                '(',
-                self.operands[0].flatten(*arg, **kw),
-                self.opmap[self.operator],
-                self.operands[1].flatten(*arg, **kw),
-                ')'])
+            return ['( ', self.operands[0],
+                    ' {op} '.format(op=self.opmap[self.operator]),
+                    self.operands[1], ' )']
+
+    class NAry(Operator):
+        """Associative operator with any number of operands.
+
+        For example conjunction and disjunction.
+        The operands are stored flat, so the tree is shallow.
+        Flattening nests them as a balanced binary tree,
+        so the resulting formula has logarithmic nesting depth.
+        """
+
+        def __init__(self, operator, *operands):
+            if not operands:
+                raise ValueError('n-ary operator needs operands')
+            super(NAry, self).__init__(operator, *operands)
+
+        def _flatten_items(self):
+            op = self.operator
+            return [balanced_fold(
+                lambda x, y: Binary(op, x, y), self.operands)]
 
     class Nodes(object):
         """AST nodes for a generic grammar."""
@@ -226,9 +265,59 @@ def make_nodes(opmap=None):
     nodes.Operator = Operator
     nodes.Unary = Unary
     nodes.Binary = Binary
+    nodes.NAry = NAry
     return nodes
 
 
+def _func(method):
+    """Return function of (possibly unbound) C{method}."""
+    return getattr(method, '__func__', method)
+
+
+def _interleave(operands, sep):
+    """Return C{operands} with C{sep} between them."""
+    r = list()
+    for x in operands:
+        r.append(x)
+        r.append(sep)
+    return r[:-1]
+
+
+def _repr_items(u):
+    return (
+        ['{t}({op}, '.format(t=type(u).__name__, op=repr(u.operator))] +
+        _interleave(u.operands, ', ') + [')'])
+
+
+def _str_items(u):
+    return (['({op} '.format(op=u.operator)] +
+            _interleave(u.operands, ' ') + [')'])
+
+
+def _unfold(u, items, leaf):
+    """Return strings of tree C{u} in order, using an explicit stack.
+
+    @param items: maps operator to C{list} of strings and
+        operands (nodes), or to C{None} to use C{leaf}.
+    @param leaf: maps terminal, or operator with
+        C{items} that returns C{None}, to C{str}
+    @rtype: C{list} of C{str}
+    """
+    out = list()
+    stack = [u]
+    while stack:
+        x = stack.pop()
+        if not hasattr(x, 'type'):
+            out.append(x)
+            continue
+        xyz = items(x) if hasattr(x, 'operands') else None
+        if xyz is None:
+            out.append(leaf(x))
+        else:
+            stack.extend(reversed(xyz))
+    return out
+
+
 def make_fol_nodes(opmap=None):
     """AST classes for fragment of first-order logic."""
     nodes = make_nodes(opmap)
@@ -282,6 +371,10 @@ def make_fol_nodes(opmap=None):
             super(Str, self).__init__(value)
             self.type = 'str'
 
+        def flatten(self, *arg, **kw):
+            # quotes make the result parsable again
+            return '"{v}"'.format(v=self.value)
+
     class Comparator(nodes.Binary):
         """Binary relational operator (2-ary predicate)."""
 
@@ -301,3 +394,52 @@ def make_fol_nodes(opmap=None):
 
 
 nodes = make_fol_nodes()
+
+
+def conj(iterable, nodes=nodes):
+    """Return AST of conjunction, skipping C{None} items.
+
+    The conjuncts are operands of a single C{NAry} node,
+    which flattens to a balanced tree, so the formula's depth
+    is logarithmic in the number of conjuncts.
+    The empty conjunction is C{True}.
+    """
+    return _fold('&', iterable, 'True', nodes)
+
+
+def disj(iterable, nodes=nodes):
+    """Return AST of disjunction, skipping C{None} items.
+
+    The empty disjunction is C{False}. See also L{conj}.
+    """
+    return _fold('|', iterable, 'False', nodes)
+
+
+def _fold(op, iterable, empty, nodes):
+    operands = [x for x in iterable if x is not None]
+    if not operands:
+        return nodes.Bool(empty)
+    if len(operands) == 1:
+        return operands[0]
+    return nodes.NAry(op, *operands)
+
+
+def balanced_fold(f, iterable, empty=None):
+    """Return C{f} applied to the items pairwise, as a balanced tree.
+
+    For example, C{f(f(a, b), f(c, d))} for items C{a, b, c, d},
+    so the nesting depth is logarithmic in the number of items.
+    Used for n-ary formulas and for BDD conjunctions and disjunctions.
+
+    @param f: associative binary function
+    @param empty: returned if C{iterable} is empty
+    """
+    items = list(iterable)
+    if not items:
+        return empty
+    while len(items) > 1:
+        pairs = [f(u, v) for u, v in zip(items[::2], items[1::2])]
+        if len(items) % 2:
+            pairs.append(items[-1])
+        items = pairs
+    return items[0]
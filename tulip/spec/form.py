@@ -47,6 +47,7 @@ import pprint
 import time
 import re
 import copy
+from tulip.spec import ast
 from tulip.spec import parser
 from tulip.spec import transformation as tx
 from tulip.spec import translation as ts
@@ -315,6 +316,13 @@ class GRSpec(LTL):
       - C{sys_prog}: a list of string that specifies the progress
         requirement.
 
+      - C{tables}: C{dict} that maps C{'env_safety'} and
+        C{'sys_safety'} to lists of L{Table}.  Each table is
+        a relation conjoined to the respective safety formula.
+        Solvers that read formulas see the tables expanded
+        (L{expand_tables}), whereas L{interfaces.omega}
+        builds them directly as BDDs.
+
     An empty list for any formula (e.g., if env_init = []) is marked
     as "True" in the specification. This corresponds to the constant
     Boolean function, which usually means that subformula has no
@@ -351,19 +359,23 @@ class GRSpec(LTL):
             converted to an empty list.  A string is placed in a list.
             iterables are converted to lists.  Cf. L{GRSpec}.
 
+            Items of an iterable can also be ASTs, as built by
+            L{synth.sys_to_spec}.  Each AST is stored as its flattened
+            string, and cached, so it is not parsed again.
+
         @type moore: bool
         @type plus_one: bool
         @param qinit: see class docstring
         """
         self.parser = parser
-        self._ast = dict()
+        self._clauses = None
+        self._share(_ClauseCache())
         self._cache = {
             'string': dict(),
             'jtlv': dict(),
             'gr1c': dict(),
             'slugs': dict()
         }
-        self._bool_int = dict()
         self._parts = {
             x + y
             for x in {'env_', 'sys_'}
@@ -372,6 +384,7 @@ class GRSpec(LTL):
         self.moore = moore
         self.plus_one = plus_one
         self.qinit = qinit
+        self.tables = {'env_safety': list(), 'sys_safety': list()}
 
         if env_vars is None:
             env_vars = dict()
@@ -397,19 +410,58 @@ class GRSpec(LTL):
 
             if isinstance(x, str):
                 if not x:
-                    setattr(self, formula_component, [])
+                    x = []
                 else:
-                    setattr(self, formula_component, [x])
-            elif not isinstance(x, list):
-                setattr(self, formula_component, list(x))
-
+                    x = [x]
             setattr(self, formula_component,
-                    copy.deepcopy(getattr(self, formula_component)))
+                    [self._add_clause(c) for c in x])
 
-        LTL.__init__(self, formula=self.to_canon(),
-                     input_variables=self.env_vars,
+        LTL.__init__(self, input_variables=self.env_vars,
                      output_variables=self.sys_vars)
 
+    def __del__(self):
+        # `__init__` may have failed before creating the cache
+        if getattr(self, '_clauses', None) is not None:
+            self._clauses.refs -= 1
+
+    @property
+    def formula(self):
+        """Formula in TuLiP LTL syntax, as returned by L{to_canon}.
+
+        Computed on access, so it reflects the current clauses.
+        """
+        return self.to_canon()
+
+    @formula.setter
+    def formula(self, f):
+        # derived from the clauses, so ignore (`LTL.__init__` sets it)
+        pass
+
+    @property
+    def _ast(self):
+        """C{dict} that maps clauses to ASTs (shared cache)."""
+        return self._clauses.ast
+
+    @property
+    def _bool_int(self):
+        """C{dict} that maps clauses to int/bool forms (shared cache)."""
+        return self._clauses.bool_int
+
+    def _share(self, cache):
+        """Use the clause cache C{cache}."""
+        if self._clauses is not None:
+            self._clauses.refs -= 1
+        cache.refs += 1
+        self._clauses = cache
+
+    def _add_clause(self, x):
+        """Return clause C{x} as string, caching it if an AST."""
+        if isinstance(x, str) or not hasattr(x, 'flatten'):
+            return x
+        f = x.flatten()
+        self._ast[f] = x
+        return f
+
     def declare(self, *arg, **kw):
         """Declare flexible variables.
 
@@ -473,7 +525,6 @@ class GRSpec(LTL):
         return self.to_canon()
 
     def dumps(self, timestamp=False):
-        self.formula = self.to_canon()
         return LTL.dumps(self, timestamp=timestamp)
 
     @staticmethod
@@ -528,6 +579,13 @@ class GRSpec(LTL):
                     '(' + f + ')' for f in self.env_safety
                 ]) + '\n'
             )
+        if self.tables['env_safety']:
+            output += (
+                '    TABLES\n\t  ' +
+                '\n\t& '.join([
+                    repr(t) for t in self.tables['env_safety']
+                ]) + '\n'
+            )
         if self.env_prog:
             output += (
                 '    LIVENESS\n\t  []<>' +
@@ -551,6 +609,13 @@ class GRSpec(LTL):
                     '(' + f + ')' for f in self.sys_safety
                 ]) + '\n'
             )
+        if self.tables['sys_safety']:
+            output += (
+                '    TABLES\n\t  ' +
+                '\n\t& '.join([
+                    repr(t) for t in self.tables['sys_safety']
+                ]) + '\n'
+            )
         if self.sys_prog:
             output += (
                 '    LIVENESS\n\t  []<>' +
@@ -588,19 +653,25 @@ class GRSpec(LTL):
                     ' found in {name}: {f}'.format(f=f, name=name))
 
     def copy(self):
-        """Return a copy of `self`."""
+        """Return a copy of `self`.
+
+        The variable domains are shared with C{self},
+        because they are replaced, not modified, by L{GRSpec}.
+        """
         r = GRSpec(
-            env_vars=dict(self.env_vars),
-            sys_vars=dict(self.sys_vars),
-            env_init=copy.copy(self.env_init),
-            env_safety=copy.copy(self.env_safety),
-            env_prog=copy.copy(self.env_prog),
-            sys_init=copy.copy(self.sys_init),
-            sys_safety=copy.copy(self.sys_safety),
-            sys_prog=copy.copy(self.sys_prog))
-        r.moore = self.moore
-        r.plus_one = self.plus_one
-        r.qinit = self.qinit
+            moore=self.moore,
+            plus_one=self.plus_one,
+            qinit=self.qinit,
+            parser=self.parser)
+        # `LTL.*_variables` equal these (see `self.__init__`)
+        r.env_vars.update(self.env_vars)
+        r.sys_vars.update(self.sys_vars)
+        # clauses are strings, so no need to call `_add_clause`
+        for p in self._parts:
+            setattr(r, p, list(getattr(self, p)))
+        # ASTs are not modified in place, so can be shared
+        r._share(self._clauses)
+        r.tables = {k: list(v) for k, v in self.tables.items()}
         return r
 
     def __or__(self, other):
@@ -617,12 +688,12 @@ class GRSpec(LTL):
         assert self.qinit == other.qinit, (
             self.qinit, other.qinit)
         # common vars have same types ?
-        for varname in set(other.env_vars) & set(result.env_vars):
-            if other.env_vars[varname] != result.env_vars[varname]:
+        for varname, dom in other.env_vars.items():
+            if result.env_vars.get(varname, dom) != dom:
                 raise ValueError('Mismatched variable domains')
 
-        for varname in set(other.sys_vars) & set(result.sys_vars):
-            if other.sys_vars[varname] != result.sys_vars[varname]:
+        for varname, dom in other.sys_vars.items():
+            if result.sys_vars.get(varname, dom) != dom:
                 raise ValueError('Mismatched variable domains')
 
         result.env_vars.update(other.env_vars)
@@ -630,9 +701,30 @@ class GRSpec(LTL):
 
         for x in self._parts:
             getattr(result, x).extend(getattr(other, x))
-
+        result._clauses.merge(other._clauses)
+        for k, v in other.tables.items():
+            result.tables[k].extend(v)
         return result
 
+    def expand_tables(self):
+        """Return spec with each L{Table} replaced by formulas.
+
+        The clauses of each table are appended to the
+        corresponding safety formula, and cached as ASTs.
+
+        @return: C{self} if there are no tables, otherwise a copy
+        @rtype: L{GRSpec}
+        """
+        if not any(self.tables.values()):
+            return self
+        r = self.copy()
+        for part, tables in r.tables.items():
+            clauses = getattr(r, part)
+            for t in tables:
+                clauses.extend(r._add_clause(u) for u in t.to_ast())
+        r.tables = {k: list() for k in r.tables}
+        return r
+
     def to_canon(self):
         """Output formula in TuLiP LTL syntax.
 
@@ -641,20 +733,22 @@ class GRSpec(LTL):
         of the TuLiP User's Guide.
         """
         conj_cstr = lambda s: ' && ' if s else ''
+        env_safety = self.env_safety + self._table_clauses('env_safety')
+        sys_safety = self.sys_safety + self._table_clauses('sys_safety')
 
         assumption = ''
         if self.env_init:
             assumption += _conj(self.env_init)
-        if self.env_safety:
-            assumption += conj_cstr(assumption) + _conj(self.env_safety, '[]')
+        if env_safety:
+            assumption += conj_cstr(assumption) + _conj(env_safety, '[]')
         if self.env_prog:
             assumption += conj_cstr(assumption) + _conj(self.env_prog, '[]<>')
 
         guarantee = ''
         if self.sys_init:
             guarantee += conj_cstr(guarantee) + _conj(self.sys_init)
-        if self.sys_safety:
-            guarantee += conj_cstr(guarantee) + _conj(self.sys_safety, '[]')
+        if sys_safety:
+            guarantee += conj_cstr(guarantee) + _conj(sys_safety, '[]')
         if self.sys_prog:
             guarantee += conj_cstr(guarantee) + _conj(self.sys_prog, '[]<>')
 
@@ -667,6 +761,11 @@ class GRSpec(LTL):
         else:
             return 'True'
 
+    def _table_clauses(self, part):
+        # tables are set after `LTL.__init__` calls `to_canon`
+        tables = getattr(self, 'tables', dict()).get(part, list())
+        return [u.flatten() for t in tables for u in t.to_ast()]
+
     def sub_values(self, var_values):
         """Substitute given values for variables.
 
@@ -685,15 +784,16 @@ class GRSpec(LTL):
             keyed by original clause (before substitution).
         """
         logger.info('substitute values for variables...')
-        a = copy.deepcopy(self._ast)
-        for formula, tree in a.items():
-            g = tx.Tree.from_recursive_ast(tree)
+        a = dict()
+        table = tx.SymbolTable()
+        for formula, tree in self._ast.items():
+            g = tx.ArrayTree.from_recursive_ast(tree, table)
             tx.sub_values(g, var_values)
             a[formula] = g.to_recursive_ast()
         logger.info('done with substitutions.\n')
         return a
 
-    def compile_init(self, no_str):
+    def compile_init(self, no_str, vectorized=False):
         """Compile python expression for initial conditions.
 
         The returned bytecode can be used with C{eval}
@@ -711,9 +811,16 @@ class GRSpec(LTL):
             where all string variables have been replaced by integers.
             Otherwise compile the original formula containing strings.
 
+        @param vectorized: if True, then compile for C{dict} values
+            that are C{numpy} arrays of valuations, one entry per
+            valuation. The result is a Boolean array (or scalar,
+            if the formula has no variables).
+        @type vectorized: C{bool}
+
         @return: python expression compiled for C{eval}
         @rtype: C{code}
         """
+        lang, conj = ('numpy', '&') if vectorized else ('python', 'and')
         self.str_to_int()
         init = {'env': self.env_init, 'sys': self.sys_init}
         pyinit = dict()
@@ -721,14 +828,18 @@ class GRSpec(LTL):
             if no_str:
                 clauses = [self._bool_int[x] for x in clauses]
             logger.info('clauses to compile: ' + str(clauses))
-            c = [ts.translate_ast(self.ast(x), 'python').flatten()
+            c = [ts.translate_ast(self.ast(x), lang).flatten()
                  for x in clauses]
             logger.info('after translation to python: ' + str(c))
-            s = _conj(c, op='and')
+            s = _conj(c, op=conj)
             if not s:
                 s = 'True'
             pyinit[side] = s
-        s = 'not ({assumption}) or ({assertion})'.format(
+        if vectorized:
+            f = '(({assumption}) == False) | ({assertion})'
+        else:
+            f = 'not ({assumption}) or ({assertion})'
+        s = f.format(
             assumption=pyinit['env'],
             assertion=pyinit['sys'])
         return compile(s, '<string>', 'eval')
@@ -744,6 +855,11 @@ class GRSpec(LTL):
         vars_dict = dict(self.env_vars)
         vars_dict.update(self.sys_vars)
         fvars = {v: d for v, d in vars_dict.items() if isinstance(d, list)}
+        if not self._clauses.agrees_with(fvars):
+            # int forms in the shared cache are for other domains
+            self._share(self._clauses.fork())
+        self._clauses.str_domains.update(fvars)
+        table = tx.SymbolTable()
         # replace symbols by ints
         for p in self._parts:
             for x in getattr(self, p):
@@ -755,7 +871,7 @@ class GRSpec(LTL):
                 # get AST
                 a = self.ast(x)
                 # create AST copy with int and bool vars only
-                g = tx.Tree.from_recursive_ast(a)
+                g = tx.ArrayTree.from_recursive_ast(a, table)
                 tx.sub_constants(g, fvars)
                 b = g.to_recursive_ast()
                 # formula of int/bool AST
@@ -775,13 +891,15 @@ class GRSpec(LTL):
             logger.debug('current cache of ASTs:\n' +
                          pprint.pformat(self._ast) + 3 * '\n')
             logger.debug('check if: ' + str(x) + ', is in cache.')
-        if x in self._ast:
+        u = self._ast.get(x)
+        if u is not None:
             logger.debug(str(x) + ' is already in cache')
-        else:
-            logger.info('AST cache does not contain:\n\t' + str(x) +
-                        '\nNeed to parse.')
-            self.parse()
-        return self._ast[x]
+            return u
+        logger.info('AST cache does not contain:\n\t' + str(x) +
+                    '\nNeed to parse.')
+        vardoms = dict(self.env_vars)
+        vardoms.update(self.sys_vars)
+        return self._parse_clause(x, vardoms, tx.SymbolTable())
 
     def parse(self):
         """Parse each clause and store it.
@@ -792,6 +910,7 @@ class GRSpec(LTL):
         logger.info('parsing ASTs to cache them...')
         vardoms = dict(self.env_vars)
         vardoms.update(self.sys_vars)
+        table = tx.SymbolTable()
         # parse new clauses and cache the resulting ASTs
         for p in self._parts:
             s = getattr(self, p)
@@ -799,16 +918,25 @@ class GRSpec(LTL):
                 if x in self._ast:
                     logger.debug(str(x) + ' is already in cache')
                     continue
-                logger.debug('parse: ' + str(x))
-                tree = self.parser.parse(x)
-                g = tx.Tree.from_recursive_ast(tree)
-                tx.check_for_undefined_identifiers(g, vardoms)
-                self._ast[x] = tree
+                self._parse_clause(x, vardoms, table)
         # rm cached ASTs that correspond to deleted clauses
         self._collect_cache_garbage(self._ast)
         logger.info('done parsing ASTs.\n')
 
+    def _parse_clause(self, x, vardoms, table):
+        """Parse clause C{x}, check its variables, and cache its AST."""
+        logger.debug('parse: ' + str(x))
+        tree = self.parser.parse(x)
+        g = tx.ArrayTree.from_recursive_ast(tree, table)
+        tx.check_for_undefined_identifiers(g, vardoms)
+        self._ast[x] = tree
+        return tree
+
     def _collect_cache_garbage(self, cache):
+        if self._clauses.refs > 1:
+            # other specs may use the entries
+            logger.info('GRSpec cache is shared, no garbage collected.')
+            return
         logger.info('collecting garbage from GRSpec cache...')
         # rm cached ASTs that correspond to deleted clauses
         s = set(cache)
@@ -826,6 +954,165 @@ class GRSpec(LTL):
         logger.info('cleaned ' + str(len(s)) + ' cached elements.\n')
 
 
+class _ClauseCache(object):
+    """ASTs and int/bool forms of clauses, shared by specifications.
+
+    A L{GRSpec} shares its cache with its copies and unions
+    (L{GRSpec.copy}, L{GRSpec.__or__}), so each clause is parsed
+    and converted to integers once for all of them.
+    The ASTs are not modified in place, so sharing them is safe.
+
+    The attribute C{refs} counts the specifications that use
+    the cache. Garbage is collected only by a sole user.
+
+    The int/bool forms depend on the domains of string variables,
+    which are recorded in C{str_domains}.
+    """
+
+    def __init__(self):
+        self.ast = dict()
+        self.bool_int = dict()
+        self.str_domains = dict()
+        self.refs = 0
+
+    def agrees_with(self, str_domains):
+        """Return C{True} if C{str_domains} agree with C{self}.
+
+        @param str_domains: maps string variables to domains
+        @type str_domains: C{dict}
+        """
+        return all(
+            self.str_domains.get(var, dom) == dom
+            for var, dom in str_domains.items())
+
+    def fork(self):
+        """Return new cache with the ASTs, but no int/bool forms."""
+        r = _ClauseCache()
+        r.ast.update(self.ast)
+        return r
+
+    def merge(self, other):
+        """Add the entries of cache C{other}."""
+        if other is self:
+            return
+        self.ast.update(other.ast)
+        if not self.agrees_with(other.str_domains):
+            return
+        self.bool_int.update(other.bool_int)
+        self.str_domains.update(other.str_domains)
+
+
+class Table(object):
+    """Relation over variables, given by the tuples it contains.
+
+    Each column is a variable name.  A name ending with a prime,
+    for example C{"loc'"}, refers to the next value of that variable.
+    Each row is a tuple of values, one for each column.
+    The value C{None} leaves that column unconstrained in the row.
+    The relation holds if the variables equal some row.
+
+    Values have the type of the variable in L{GRSpec}:
+    C{bool}, C{int}, or C{str} for variables with a domain
+    that is a list of strings.
+    The first column must have a value in each row,
+    because rows are grouped by it when expanding to formulas.
+
+    A table has as many rows as its relation has tuples,
+    whereas formulas repeat the state in each disjunct.
+    Example: the transitions of a transition system::
+
+      t = Table(['loc', "loc'"], [('s0', 's1'), ('s1', 's0')])
+      spec.tables['sys_safety'].append(t)
+    """
+
+    def __init__(self, columns, rows=None):
+        """Instantiate a table.
+
+        @type columns: iterable of C{str}
+        @param rows: iterable of tuples, with one value per column
+        """
+        self.columns = tuple(columns)
+        self.rows = list()
+        if rows is not None:
+            self.add_rows_from(rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return 'Table({c}, <{n} rows>)'.format(
+            c=list(self.columns), n=len(self.rows))
+
+    def add_rows_from(self, rows):
+        """Add each tuple in C{rows} to the relation."""
+        n = len(self.columns)
+        for row in rows:
+            row = tuple(row)
+            if len(row) != n:
+                raise ValueError(
+                    'row {r} should have {n} values'.format(r=row, n=n))
+            if row[0] is None:
+                raise ValueError(
+                    'first column cannot be `None` in row {r}'.format(r=row))
+            self.rows.append(row)
+
+    def to_ast(self, nodes=ast.nodes):
+        """Return list of clause ASTs equivalent to the relation.
+
+        For each value C{v} of the first column C{x}, a clause::
+
+          (x = v) -> (row_1 | row_2 | ...)
+
+        where each C{row_i} is the conjunction of the remaining
+        values in a row that starts with C{v}, and one more clause
+        that C{x} takes one of these values.
+        """
+        groups = dict()
+        values = list()  # in order of first appearance
+        for row in self.rows:
+            v = row[0]
+            if v not in groups:
+                groups[v] = list()
+                values.append(v)
+            groups[v].append(row[1:])
+        first = self.columns[0]
+        rest = self.columns[1:]
+        clauses = list()
+        for v in values:
+            rows = groups[v]
+            post = ast.disj(
+                (ast.conj(
+                    (_cell_ast(c, w, nodes)
+                     for c, w in zip(rest, row) if w is not None),
+                    nodes)
+                 for row in rows),
+                nodes)
+            pre = _cell_ast(first, v, nodes)
+            clauses.append(nodes.Binary('->', pre, post))
+        clauses.append(ast.disj(
+            (_cell_ast(first, v, nodes) for v in values), nodes))
+        return clauses
+
+
+def _cell_ast(column, value, nodes):
+    """Return AST of C{column = value}."""
+    primed = column.endswith("'")
+    var = nodes.Var(column[:-1] if primed else column)
+    if isinstance(value, bool):
+        u = var if value else nodes.Unary('!', var)
+    elif isinstance(value, int):
+        u = nodes.Comparator('=', var, nodes.Num(str(value)))
+    elif isinstance(value, str):
+        u = nodes.Comparator('=', var, nodes.Str(value))
+    else:
+        raise TypeError(
+            'unsupported value {v} in column {c}'.format(
+                v=value, c=column))
+    if primed:
+        u = nodes.Unary('X', u)
+    return u
+
+
 def replace_dependent_vars(spec, bool2form):
     logger.debug('replacing dependent variables using map:\n\t' +
                  str(bool2form))
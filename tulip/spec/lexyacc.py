@@ -234,6 +234,10 @@ class Parser(object):
         """
         if debuglog is None:
             debuglog = logging.getLogger(PARSER_LOGGER)
+        # `ply.yacc` formats the result of each reduction
+        # for the log, which is quadratic in the formula's length
+        if not debuglog.isEnabledFor(logging.INFO):
+            debuglog = None
         root = self.parser.parse(
             formula,
             lexer=self.lexer.lexer,
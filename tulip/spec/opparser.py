@@ -0,0 +1,297 @@
+# Copyright (c) 2017 by California Institute of Technology
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the California Institute of Technology nor
+#    the names of its contributors may be used to endorse or promote
+#    products derived from this software without specific prior
+#    written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL CALTECH
+# OR THE CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF
+# USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+# OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+#
+"""Operator precedence parser for LTL.
+
+Parses the same language as L{lexyacc.Parser},
+to the same AST, without building C{ply} tables.
+The lexer is a single regular expression,
+with the token rules of L{lexyacc.Lexer}.
+The parser uses explicit stacks of operands and operators,
+so deeply nested formulas do not exceed the recursion limit.
+
+Operator precedence and associativity are taken from
+C{lexyacc.Parser.precedence}. Conflicts are resolved
+as by C{ply.yacc} for that grammar:
+
+  - a binary or prefix operator on the stack is reduced
+    before an incoming binary operator of lower precedence,
+    or of equal precedence if left-associative
+  - prime applies to the operand immediately to its left
+  - truncation has no precedence, so it applies to
+    the formula to its left, up to the enclosing parenthesis.
+"""
+from __future__ import absolute_import
+import logging
+import re
+import warnings
+
+import tulip.spec.ast
+from tulip.spec import lexyacc
+
+
+logger = logging.getLogger(__name__)
+PREFIX = {'NOT', 'ALWAYS', 'EVENTUALLY', 'NEXT'}
+CONNECTIVES = {
+    'AND', 'OR', 'XOR', 'IMP', 'BIMP',
+    'UNTIL', 'WEAK_UNTIL', 'RELEASE'}
+PREDICATES = {'EQUALS', 'NEQUALS', 'LT', 'LE', 'GT', 'GE'}
+FUNCTIONS = {'TIMES', 'DIV', 'PLUS', 'MINUS'}
+BINARY = CONNECTIVES | PREDICATES | FUNCTIONS
+
+
+class Lexer(object):
+    """Tokenize with the rules of L{lexyacc.Lexer}."""
+
+    def __init__(self, rules=lexyacc.Lexer):
+        self.reserved = rules.reserved
+        self.values = rules.values
+        self.regex = re.compile(_master_regex(rules), re.VERBOSE)
+        self.ignore = rules.t_ignore
+
+    def tokenize(self, s):
+        """Return C{list} of C{(type, value)} tokens of C{s}.
+
+        Illegal characters are skipped with a warning,
+        as by L{lexyacc.Lexer}.
+        """
+        tokens = list()
+        append = tokens.append
+        match = self.regex.match
+        ignore = self.ignore
+        reserved = self.reserved
+        values = self.values
+        i = 0
+        n = len(s)
+        while i < n:
+            if s[i] in ignore:
+                i += 1
+                continue
+            m = match(s, i)
+            if m is None:
+                warnings.warn(
+                    'Illegal character "{t}"'.format(t=s[i]))
+                i += 1
+                continue
+            i = m.end()
+            t = m.lastgroup
+            v = m.group()
+            if t == 'NAME':
+                v = values.get(v, v)
+                low = v.lower()
+                if low in ('false', 'true'):
+                    t = reserved[low]
+                else:
+                    t = reserved.get(v, t)
+            elif t == 'ALWAYS':
+                v = 'G'
+            elif t == 'EVENTUALLY':
+                v = 'F'
+            elif t == 'AND':
+                v = '&'
+            elif t == 'OR':
+                v = '|'
+            elif t in ('comment', 'newline'):
+                continue
+            append((t, v))
+        return tokens
+
+
+class Parser(object):
+    """Parse LTL formulas to AST, same as L{lexyacc.Parser}."""
+
+    def __init__(self, ast=None, lexer=None):
+        if ast is None:
+            ast = tulip.spec.ast.nodes
+        if lexer is None:
+            lexer = Lexer()
+        self.ast = ast
+        self.lexer = lexer
+        # token -> (precedence, left-associative)
+        self.precedence = dict()
+        for i, level in enumerate(lexyacc.Parser.precedence, 1):
+            for t in level[1:]:
+                self.precedence[t] = (i, level[0] == 'left')
+
+    def parse(self, formula):
+        """Parse formula string and create abstract syntax tree (AST)."""
+        tokens = self.lexer.tokenize(formula)
+        tokens.append((None, None))
+        ast = self.ast
+        prec = self.precedence
+        # operands, and stack of operators:
+        # `[kind, token, value]`, where kind is
+        # 'prefix', 'binary', '(', or 'ite' (value counts commas)
+        out = list()
+        ops = list()
+        operand = True
+        i = 0
+        while True:
+            t, v = tokens[i]
+            i += 1
+            if operand:
+                operand = False
+                if t == 'NAME':
+                    out.append(ast.Var(v))
+                elif t == 'NUMBER':
+                    out.append(ast.Num(v))
+                elif t == 'TRUE' or t == 'FALSE':
+                    out.append(ast.Bool(v))
+                elif t == 'MINUS':
+                    num = _expect(tokens, i, 'NUMBER')
+                    i += 1
+                    out.append(ast.Num('-' + num))
+                elif t == 'DQUOTES':
+                    name = _expect(tokens, i, 'NAME')
+                    _expect(tokens, i + 1, 'DQUOTES')
+                    i += 2
+                    out.append(ast.Str(name))
+                elif t in PREFIX:
+                    ops.append(['prefix', t, v])
+                    operand = True
+                elif t == 'LPAREN':
+                    if tokens[i][0] == 'ITE':
+                        ops.append(['ite', None, 0])
+                        i += 1
+                    else:
+                        ops.append(['(', None, None])
+                    operand = True
+                else:
+                    _syntax_error(tokens, i - 1)
+            elif t == 'PRIME':
+                out[-1] = ast.Unary('X', out[-1])
+            elif t == 'TRUNCATE':
+                # no precedence, so below any operator
+                self._reduce_all(ops, out)
+                num = _expect(tokens, i, 'NUMBER')
+                i += 1
+                out[-1] = ast.Arithmetic(v, out[-1], ast.Num(num))
+            elif t in BINARY:
+                p, left = prec[t]
+                while ops and ops[-1][0] in ('prefix', 'binary'):
+                    q, left_q = prec[ops[-1][1]]
+                    if q < p or (q == p and not left_q):
+                        break
+                    self._reduce(ops.pop(), out)
+                ops.append(['binary', t, v])
+                operand = True
+            elif t == 'RPAREN' or t == 'COMMA' or t is None:
+                self._reduce_all(ops, out)
+                if t is None:
+                    if ops:
+                        _syntax_error(tokens, i - 1)
+                    break
+                if not ops:
+                    _syntax_error(tokens, i - 1)
+                kind, _, commas = ops[-1]
+                if t == 'COMMA':
+                    if kind != 'ite' or commas == 2:
+                        _syntax_error(tokens, i - 1)
+                    ops[-1][2] += 1
+                    operand = True
+                elif kind == '(':
+                    ops.pop()
+                elif commas == 2:
+                    ops.pop()
+                    z = out.pop()
+                    y = out.pop()
+                    x = out.pop()
+                    out.append(ast.Operator('ite', x, y, z))
+                else:
+                    _syntax_error(tokens, i - 1)
+            else:
+                _syntax_error(tokens, i - 1)
+        (u,) = out
+        return u
+
+    def _reduce_all(self, ops, out):
+        """Reduce operators down to the innermost parenthesis."""
+        while ops and ops[-1][0] in ('prefix', 'binary'):
+            self._reduce(ops.pop(), out)
+
+    def _reduce(self, op, out):
+        kind, t, v = op
+        ast = self.ast
+        if kind == 'prefix':
+            out.append(ast.Unary(v, out.pop()))
+            return
+        y = out.pop()
+        x = out.pop()
+        if t in CONNECTIVES:
+            out.append(ast.Binary(v, x, y))
+        elif t in PREDICATES:
+            out.append(ast.Comparator(v, x, y))
+        else:
+            assert t in FUNCTIONS, t
+            out.append(ast.Arithmetic(v, x, y))
+
+
+def _master_regex(rules):
+    """Return regex that matches tokens as C{ply.lex} would.
+
+    C{ply.lex} tries the rules that are functions in
+    the order they are defined, then the rules that are
+    strings by decreasing length of their regex.
+    """
+    funcs = list()
+    strings = list()
+    for name in dir(rules):
+        if not name.startswith('t_') or name in ('t_error', 't_ignore'):
+            continue
+        rule = getattr(rules, name)
+        if callable(rule):
+            line = getattr(rule, '__func__', rule).__code__.co_firstlineno
+            funcs.append((line, name[2:], rule.__doc__))
+        else:
+            strings.append((name[2:], rule))
+    funcs.sort()
+    strings.sort(key=lambda x: len(x[1]), reverse=True)
+    rules = [(t, r) for _, t, r in funcs] + strings
+    return '|'.join(
+        '(?P<{t}>{r})'.format(t=t, r=r) for t, r in rules)
+
+
+def _expect(tokens, i, t):
+    """Return value of token C{i}, if it has type C{t}."""
+    if tokens[i][0] != t:
+        _syntax_error(tokens, i)
+    return tokens[i][1]
+
+
+def _syntax_error(tokens, i):
+    t, v = tokens[i]
+    if t is None:
+        raise Exception('Syntax error at end of formula')
+    raise Exception(
+        'Syntax error at "{p}"\n'.format(p=v) +
+        'remaining input:\n{s}\n'.format(
+            s=' '.join(v for _, v in tokens[i + 1:-1])))
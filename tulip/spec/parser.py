@@ -34,26 +34,38 @@
 from __future__ import absolute_import
 from __future__ import print_function
 import re
-from tulip.spec import ast, lexyacc
+from tulip.spec import ast, lexyacc, opparser
 
 
 # cache
 parsers = dict()
+parser_types = {'ply': lexyacc.Parser, 'opp': opparser.Parser}
 
 
-def parse(formula, full_operators=False):
+def parse(formula, full_operators=False, parser='opp'):
     """Parse formula string and create abstract syntax tree (AST).
 
     @param full_operators: replace full names of operators
         with their symbols (case insensitive,
         each operator must be a separate word).
     @type full_operators: C{bool}
+
+    @param parser: which parser to use:
+
+        - C{'opp'}: operator precedence parser
+          (L{opparser.Parser}), faster
+        - C{'ply'}: LALR(1) parser built with C{ply.yacc}
+          (L{lexyacc.Parser})
+
+        Both return the same AST.
     """
     if full_operators:
         formula = _replace_full_name_operators(formula)
-    if parsers.get('ply') is None:
-        parsers['ply'] = lexyacc.Parser()
-    spec = parsers['ply'].parse(formula)
+    if parser not in parser_types:
+        raise ValueError('unknown parser "{p}"'.format(p=parser))
+    if parsers.get(parser) is None:
+        parsers[parser] = parser_types[parser]()
+    spec = parsers[parser].parse(formula)
     # did ply fail merely printing warnings ?
     if spec is None:
         raise Exception('Parsing formula:\n{f}\nfailed'.format(f=formula))
@@ -31,6 +31,7 @@
 # SUCH DAMAGE.
 #
 """Syntactic manipulation of trees."""
+from array import array
 import logging
 import copy
 import os
@@ -79,33 +80,55 @@ class Tree(nx.MultiDiGraph):
     def from_recursive_ast(cls, u):
         tree = cls()
         tree.root = u
-        tree._recurse(u)
+        tree._add_from(u)
         return tree
 
-    def _recurse(self, u):
-        if hasattr(u, 'value'):
-            # necessary this terminal is the root
-            self.add_node(u)
-        elif hasattr(u, 'operator'):
-            for i, v in enumerate(u.operands):
-                self.add_edge(u, v, key=i)
-                self._recurse(v)
-        else:
-            raise Exception('unknown node type: {u}'.format(u=u))
+    def _add_from(self, u):
+        """Add the tree rooted at C{u}, in depth-first order.
+
+        Uses an explicit stack, instead of recursion.
+        """
+        # (parent, key, node)
+        stack = [(None, None, u)]
+        while stack:
+            p, i, u = stack.pop()
+            if p is not None:
+                self.add_edge(p, u, key=i)
+            if hasattr(u, 'value'):
+                # necessary if this terminal is the root
+                self.add_node(u)
+            elif hasattr(u, 'operator'):
+                stack.extend(
+                    (u, i, v) for i, v in
+                    reversed(list(enumerate(u.operands))))
+            else:
+                raise Exception('unknown node type: {u}'.format(u=u))
         return u
 
     def to_recursive_ast(self, u=None):
         if u is None:
             u = self.root
-        w = copy.copy(u)
-        if not self.succ.get(u):
-            assert hasattr(u, 'value')
-        else:
-            w.operands = [self.to_recursive_ast(v)
-                          for _, v, _ in sorted(
-                              self.edges_iter(u, keys=True),
-                              key=lambda x: x[2])]
-            assert len(u.operands) == len(w.operands)
+        results = list()
+        # (node, number of operands, or None if not visited yet)
+        stack = [(u, None)]
+        while stack:
+            u, n = stack.pop()
+            if n is not None:
+                w = copy.copy(u)
+                i = len(results) - n
+                w.operands = results[i:]
+                assert len(u.operands) == len(w.operands)
+                results[i:] = [w]
+            elif not self.succ.get(u):
+                assert hasattr(u, 'value')
+                results.append(copy.copy(u))
+            else:
+                operands = [v for _, v, _ in sorted(
+                    self.edges_iter(u, keys=True),
+                    key=lambda x: x[2])]
+                stack.append((u, len(operands)))
+                stack.extend((v, None) for v in reversed(operands))
+        (w,) = results
         return w
 
     def add_subtree(self, leaf, tree):
@@ -147,6 +170,232 @@ class Tree(nx.MultiDiGraph):
         p.write(filename, format=fext)
 
 
+class SymbolTable(object):
+    """Interned symbols of L{ArrayTree}s.
+
+    Each distinct symbol (operator, or terminal with its value)
+    is stored once in C{symbols}, as an AST node
+    (operators without operands). Trees that share
+    a table share these nodes, so a symbol is interned
+    once for all the clauses of a specification.
+    """
+
+    def __init__(self):
+        self.symbols = list()
+        self.index = dict()
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def intern(self, u):
+        """Return index of the symbol of AST node C{u}.
+
+        The symbol is added to C{self.symbols} if new.
+        """
+        if hasattr(u, 'operands'):
+            key = (type(u), u.operator)
+        elif hasattr(u, 'value'):
+            key = (type(u), u.value)
+        else:
+            raise Exception('unknown node type: {u}'.format(u=u))
+        k = self.index.get(key)
+        if k is not None:
+            return k
+        k = len(self.symbols)
+        if hasattr(u, 'operands'):
+            u = copy.copy(u)
+            u.operands = list()
+        self.symbols.append(u)
+        self.index[key] = k
+        return k
+
+
+class ArrayTree(object):
+    """Abstract syntax tree stored in flat arrays.
+
+    A lighter alternative to L{Tree} for rewriting terminals,
+    as done by L{sub_values} and L{sub_constants}.
+    The nodes are the integers C{0, ..., n - 1} in depth-first order,
+    so the root is C{0}. The arrays are:
+
+      - C{kind}: index in C{self.symbols} of each node
+      - C{parent}: parent of each node, C{-1} for the root
+      - C{first}: index in C{children} of each node's first child
+      - C{arity}: number of children of each node
+      - C{children}: children of all nodes, concatenated
+
+    Replacing a terminal changes only its entry in C{kind}.
+    A tree built by L{from_recursive_ast} remembers its source AST,
+    so L{to_recursive_ast} shares the subtrees that were not
+    rewritten with that AST, instead of copying them.
+
+    @param table: symbols, shared with other trees
+        (a new table if C{None})
+    @type table: L{SymbolTable}
+    """
+
+    def __init__(self, table=None):
+        if table is None:
+            table = SymbolTable()
+        self.table = table
+        self.symbols = table.symbols
+        self.kind = array('l')
+        self.parent = array('l')
+        self.first = array('l')
+        self.arity = array('l')
+        self.children = array('l')
+        # AST node and symbol of each node, as built
+        self._source = None
+        self._source_kind = None
+
+    def __len__(self):
+        return len(self.kind)
+
+    def __repr__(self):
+        return repr(self.to_recursive_ast())
+
+    @property
+    def variables(self):
+        """Return the set of variables in C{tree}.
+
+        @rtype: C{set} of L{Var}
+        """
+        symbols = self.symbols
+        return {symbols[k] for k in set(self.kind)
+                if symbols[k].type == 'var'}
+
+    @classmethod
+    def from_recursive_ast(cls, u, table=None):
+        tree = cls(table)
+        children = tree.children
+        add_kind = tree.kind.append
+        add_parent = tree.parent.append
+        add_first = tree.first.append
+        add_arity = tree.arity.append
+        get = tree.table.index.get
+        intern = tree.table.intern
+        source = list()
+        add_source = source.append
+        i = 0
+        # (node, parent, index in `children`)
+        stack = [(u, -1, -1)]
+        while stack:
+            u, p, j = stack.pop()
+            add_source(u)
+            operands = getattr(u, 'operands', None)
+            if operands is None:
+                k = get((type(u), getattr(u, 'value', None)))
+            else:
+                k = get((type(u), u.operator))
+            add_kind(intern(u) if k is None else k)
+            add_parent(p)
+            if j >= 0:
+                children[j] = i
+            j = len(children)
+            add_first(j)
+            if operands is None:
+                add_arity(0)
+            else:
+                n = len(operands)
+                add_arity(n)
+                children.extend([-1] * n)
+                for k in range(n - 1, -1, -1):
+                    stack.append((operands[k], i, j + k))
+            i += 1
+        tree._source = source
+        tree._source_kind = array('l', tree.kind)
+        return tree
+
+    def to_recursive_ast(self):
+        symbols = self.symbols
+        kind = self.kind
+        first = self.first
+        arity = self.arity
+        children = self.children
+        source = self._source
+        source_kind = self._source_kind
+        results = [None] * len(kind)
+        # children follow their parent
+        for i in range(len(kind) - 1, -1, -1):
+            n = arity[i]
+            if n == 2:
+                j = first[i]
+                operands = [results[children[j]],
+                            results[children[j + 1]]]
+            elif n:
+                j = first[i]
+                operands = [results[k] for k in children[j:j + n]]
+            # share unchanged subtree with source AST
+            if source is not None and kind[i] == source_kind[i]:
+                v = source[i]
+                if not n or all(
+                        x is y for x, y in zip(operands, v.operands)):
+                    results[i] = v
+                    continue
+            u = symbols[kind[i]]
+            w = object.__new__(type(u))
+            w.__dict__.update(u.__dict__)
+            if n:
+                w.operands = operands
+            results[i] = w
+        return results[0]
+
+    def intern(self, u):
+        """Return index of the symbol of AST node C{u}."""
+        return self.table.intern(u)
+
+    def node(self, i):
+        """Return the symbol of node C{i}, as an AST node."""
+        return self.symbols[self.kind[i]]
+
+    def successors(self, i):
+        """Return C{list} of the children of node C{i}."""
+        j = self.first[i]
+        return self.children[j:j + self.arity[i]].tolist()
+
+    def nodes_of_type(self, t):
+        """Return C{list} of nodes whose symbol has C{type} C{t}."""
+        symbols = self.symbols
+        return [i for i, k in enumerate(self.kind)
+                if symbols[k].type == t]
+
+    def relabel(self, old2new):
+        """Replace the symbols of nodes.
+
+        @param old2new: maps nodes to AST terminals
+        @type old2new: C{dict}
+        """
+        kind = self.kind
+        intern = self.intern
+        for i, u in old2new.items():
+            kind[i] = intern(u)
+
+    def pair_node_to_var(self, c):
+        """Return nodes of variable and L{Binary} above node C{c}.
+
+        As L{pair_node_to_var}, for this tree.
+
+        @rtype: C{(int, int)}
+        """
+        parent = self.parent
+        # find parent Binary operator
+        while True:
+            old = c
+            c = parent[c]
+            if c < 0:
+                raise ValueError(
+                    'no binary operator above: {u}'.format(
+                        u=self.node(old)))
+            if self.arity[c] == 2:
+                break
+        p, q = self.successors(c)
+        v = p if q == old else q
+        # go down until terminal found
+        while self.arity[v]:
+            v = self.children[self.first[v]]
+        return v, c
+
+
 def ast_to_labeled_graph(tree, detailed):
     """Convert AST to C{NetworkX.DiGraph} for graphics.
 
@@ -183,7 +432,7 @@ def check_for_undefined_identifiers(tree, domains):
       - binary operator between variable and
         invalid value for that variable.
 
-    @type tree: L{Tree}
+    @type tree: L{Tree} or L{ArrayTree}
 
     @param domains: variable definitions:
 
@@ -192,6 +441,15 @@ def check_for_undefined_identifiers(tree, domains):
         See L{GRSpec} for more details of available domain types.
     @type domains: C{dict}
     """
+    if isinstance(tree, ArrayTree):
+        for u in tree.variables:
+            if u.value not in domains:
+                raise ValueError(
+                    ('Undefined variable "{var}" missing from '
+                     'symbol table:\n\t{doms}\n'
+                     'in subformula:\n\t{f}').format(
+                         var=u.value, f=tree, doms=domains))
+        return
     for u in tree:
         if u.type == 'var' and u.value not in domains:
             var = u.value
@@ -242,38 +500,54 @@ def sub_values(tree, var_values):
     """Substitute given values for variables.
 
     @param tree: AST
+    @type tree: L{Tree} or L{ArrayTree}
 
     @type var_values: C{dict}
 
     @return: AST with L{Var} nodes replaces by
         L{Num}, L{Const}, or L{Bool}
     """
-    old2new = dict()
-    for u in tree.nodes_iter():
-        if u.type != 'var':
-            continue
-        val = var_values[u.value]
-        # instantiate appropriate value type
-        if isinstance(val, bool):
-            v = nodes.Bool(val)
-        elif isinstance(val, int):
-            v = nodes.Num(val)
-        elif isinstance(val, str):
-            v = nodes.Str(val)
-        old2new[u] = v
+    if isinstance(tree, ArrayTree):
+        # once per variable, instead of once per occurrence
+        symbols = tree.symbols
+        old2new = {
+            k: tree.intern(_value_to_node(var_values[symbols[k].value]))
+            for k in set(tree.kind) if symbols[k].type == 'var'}
+        tree.kind = array(
+            'l', (old2new.get(k, k) for k in tree.kind))
+        return
+    old2new = {
+        u: _value_to_node(var_values[u.value])
+        for u in tree.nodes_iter() if u.type == 'var'}
     # replace variable by value
     nx.relabel_nodes(tree, old2new, copy=False)
 
 
+def _value_to_node(val):
+    """Return terminal AST node for python value C{val}."""
+    # instantiate appropriate value type
+    if isinstance(val, bool):
+        return nodes.Bool(str(val))
+    elif isinstance(val, int):
+        return nodes.Num(str(val))
+    elif isinstance(val, str):
+        return nodes.Str(val)
+    raise TypeError('unknown type of value: {v}'.format(v=val))
+
+
 def sub_constants(tree, var_str2int):
     """Replace string constants by integers.
 
     To be used for converting arbitrary finite domains
     to integer domains prior to calling gr1c.
 
+    @type tree: L{Tree} or L{ArrayTree}
     @param const2int: {'varname':['const_val0', ...], ...}
     @type const2int: C{dict} of C{list}
     """
+    if isinstance(tree, ArrayTree):
+        _sub_constants_array(tree, var_str2int)
+        return
     # logger.info('substitute ints for constants in:\n\t' + str(self))
     old2new = dict()
     for u in tree.nodes_iter():
@@ -290,6 +564,23 @@ def sub_constants(tree, var_str2int):
     # logger.info('result after substitution:\n\t' + str(self) + '\n')
 
 
+def _sub_constants_array(tree, var_str2int):
+    """Replace string constants by integers in L{ArrayTree}."""
+    kind = tree.kind
+    # (variable symbol, string symbol) -> number symbol
+    cache = dict()
+    for i in tree.nodes_of_type('str'):
+        v, _ = tree.pair_node_to_var(i)
+        key = (kind[v], kind[i])
+        k = cache.get(key)
+        if k is None:
+            str2int = var_str2int[str(tree.node(v))]
+            x = str2int.index(tree.node(i).value)
+            k = tree.intern(nodes.Num(str(x)))
+            cache[key] = k
+        kind[i] = k
+
+
 def sub_bool_with_subtree(tree, bool2subtree):
     """Replace selected Boolean variables with given AST.
 
@@ -327,6 +618,9 @@ def pair_node_to_var(tree, c):
     @return: variable, constant
     @rtype: C{(L{Var}, L{Const})}
     """
+    if isinstance(tree, ArrayTree):
+        v, c = tree.pair_node_to_var(c)
+        return tree.node(v), tree.node(c)
     # find parent Binary operator
     while True:
         old = c
@@ -422,7 +716,7 @@ def _check_var_conflicts(s, variables):
 
 def check_var_name_conflict(f, varname):
     t = parser.parse(f)
-    g = Tree.from_recursive_ast(t)
+    g = ArrayTree.from_recursive_ast(t)
     v = {x.value for x in g.variables}
     if varname in v:
         raise ValueError('var name "{v}" already used'.format(v=varname))
@@ -434,7 +728,6 @@ def collect_primed_vars(t):
 
     @type t: recursive AST
     """
-    g = Tree.from_recursive_ast(t)
     # (node, context)
     Q = [(t, False)]
     primed = set()
@@ -446,7 +739,7 @@ def collect_primed_vars(t):
             c = (u.operator == 'X') or c
         except AttributeError:
             pass
-        Q.extend((v, c) for v in g.successors_iter(u))
+        Q.extend((v, c) for v in getattr(u, 'operands', ()))
     return primed
 
 
@@ -38,6 +38,7 @@
   - SPIN: http://spinroot.com/spin/Man/ltl.html
           http://spinroot.com/spin/Man/operators.html
   - python (Boolean formulas only)
+  - numpy (Boolean formulas only, over arrays)
   - WRING: http://vlsi.colorado.edu/~rbloem/wring.html
         (see top of file: LTL.pm)
 """
@@ -189,6 +190,46 @@ def make_python_nodes():
     return nodes
 
 
+def make_numpy_nodes():
+    """Python expressions that evaluate elementwise over arrays.
+
+    Variables can be bound to C{numpy} arrays of equal length
+    (or scalars), so a formula is evaluated for many valuations
+    at once. Logic operators become bitwise, negation a
+    comparison with C{False}, because C{not} is undefined
+    for arrays.
+    """
+    opmap = {'True': 'True', 'False': 'False',
+             '!': '!', '&': '&', '|': '|',
+             '^': '^', '=': '==', '!=': '!=',
+             '<': '<',
+             '>=': '>=', '<=': '<=', '>': '>',
+             '+': '+', '-': '-'}
+    nodes = ast.make_fol_nodes(opmap)
+
+    class Unary(nodes.Unary):
+        def flatten(self, *arg, **kw):
+            return '({x} == False)'.format(
+                x=self.operands[0].flatten())
+
+    class Imp(nodes.Binary):
+        def flatten(self, *arg, **kw):
+            return '(({l} == False) | {r})'.format(
+                l=self.operands[0].flatten(),
+                r=self.operands[1].flatten())
+
+    class BiImp(nodes.Binary):
+        def flatten(self, *arg, **kw):
+            return '({l} == {r})'.format(
+                l=self.operands[0].flatten(),
+                r=self.operands[1].flatten())
+
+    nodes.Unary = Unary
+    nodes.Imp = Imp
+    nodes.BiImp = BiImp
+    return nodes
+
+
 lang2nodes = {
     'jtlv': make_jtlv_nodes(),
     'gr1c': make_gr1c_nodes(),
@@ -196,6 +237,7 @@ lang2nodes = {
     'promela': make_promela_nodes(),
     'smv': make_smv_nodes(),
     'python': make_python_nodes(),
+    'numpy': make_numpy_nodes(),
     'wring': make_wring_nodes()}
 
 
@@ -383,6 +425,7 @@ def translate(spec, lang):
 
     Consult the respective documentation in L{tulip.interfaces}
     concerning formats and links to further reading.
+    Any tables in C{spec.tables} are expanded to formulas.
 
     @type spec: L{GRSpec}
     @type lang: 'gr1c', 'slugs', 'jtlv', or 'wring'
@@ -395,6 +438,7 @@ def translate(spec, lang):
     """
     if not isinstance(spec, tulip.spec.form.GRSpec):
         raise TypeError('translate requires first argument (spec) to be of type GRSpec')
+    spec = spec.expand_tables()
     spec.check_syntax()
     spec.str_to_int()
     # pprint.pprint(spec._bool_int)
@@ -412,51 +456,97 @@ def translate_ast(tree, lang):
 
     @type tree: L{Nodes.Node}
     @type lang: 'gr1c' or 'slugs' or 'jtlv' or
-      'promela' or 'smv' or 'python' or 'wring'
+      'promela' or 'smv' or 'python' or 'numpy' or 'wring'
 
     @return: tree using AST nodes of C{lang}
     @rtype: L{FOL.Node}
     """
-    if lang == 'python':
+    if lang in ('python', 'numpy'):
         return _ast_to_python(tree, lang2nodes[lang])
     else:
         return _ast_to_lang(tree, lang2nodes[lang])
 
 
 def _ast_to_lang(u, nodes):
-    cls = getattr(nodes, type(u).__name__)
-    if hasattr(u, 'value'):
-        return cls(u.value)
-    elif hasattr(u, 'operator'):
-        xyz = [_ast_to_lang(x, nodes) for x in u.operands]
-        return cls(u.operator, *xyz)
-    else:
-        raise TypeError('Unknown node type "{t}"'.format(
-            t=type(u).__name__))
+    def make(u, xyz):
+        cls = getattr(nodes, type(u).__name__)
+        if hasattr(u, 'value'):
+            return cls(u.value)
+        elif hasattr(u, 'operator'):
+            return cls(u.operator, *xyz)
+        else:
+            raise TypeError('Unknown node type "{t}"'.format(
+                t=type(u).__name__))
+    return _map_tree(u, make)
 
 
 def _ast_to_python(u, nodes):
-    cls = getattr(nodes, type(u).__name__)
-    if hasattr(u, 'value'):
-        return cls(u.value)
-    elif not hasattr(u, 'operands'):
-        raise TypeError(
-            'AST node: {u}'.format(u=type(u).__name__) +
-            ', is neither terminal nor operator.')
-    elif len(u.operands) == 1:
-        assert u.operator == '!'
-        return cls(u.operator, _ast_to_python(u.operands[0], nodes))
-    elif len(u.operands) == 2:
-        assert u.operator in {'&', '|', '^', '->', '<->',
-                              '>', '>=', '=', '!=', '<=', '<',
-                              '+', '-', '*', '/'}
-        if u.operator == '->':
-            cls = nodes.Imp
-        elif u.operator == '<->':
-            cls = nodes.BiImp
-        return cls(u.operator,
-                   _ast_to_python(u.operands[0], nodes),
-                   _ast_to_python(u.operands[1], nodes))
-    else:
-        raise ValueError(
-            'Operator: {u}, is neither unary nor binary.'.format(u=u))
+    def make(u, xyz):
+        cls = getattr(nodes, type(u).__name__)
+        if hasattr(u, 'value'):
+            return cls(u.value)
+        elif not hasattr(u, 'operands'):
+            raise TypeError(
+                'AST node: {u}'.format(u=type(u).__name__) +
+                ', is neither terminal nor operator.')
+        elif len(xyz) == 1:
+            assert u.operator == '!'
+            return cls(u.operator, *xyz)
+        elif u.operator in {'&', '|'}:
+            return _merge_nary(u.operator, xyz, nodes)
+        elif len(xyz) == 2:
+            assert u.operator in {'&', '|', '^', '->', '<->',
+                                  '>', '>=', '=', '!=', '<=', '<',
+                                  '+', '-', '*', '/'}
+            if u.operator == '->':
+                cls = nodes.Imp
+            elif u.operator == '<->':
+                cls = nodes.BiImp
+            return cls(u.operator, *xyz)
+        else:
+            raise ValueError(
+                'Operator: {u}, is neither unary nor binary.'.format(u=u))
+    return _map_tree(u, make)
+
+
+def _merge_nary(op, xyz, nodes):
+    """Return C{NAry} node of associative C{op} over C{xyz}.
+
+    Operands that are C{NAry} nodes of C{op} are merged.
+    So chains (for example left-deep, as parsed) become shallow,
+    and flatten to balanced formulas, which python can compile.
+    The operands are new nodes, so they are modified in place.
+    """
+    def merges(x):
+        return type(x) is nodes.NAry and x.operator == op
+    first = xyz[0]
+    u = first if merges(first) else nodes.NAry(op, first)
+    for x in xyz[1:]:
+        if merges(x):
+            u.operands.extend(x.operands)
+        else:
+            u.operands.append(x)
+    return u
+
+
+def _map_tree(u, make):
+    """Return tree built bottom-up from C{u}, using an explicit stack.
+
+    @param make: maps node and C{list} of the new operands
+        to new node. Nodes without operands are passed C{None}.
+    """
+    results = list()
+    stack = [(u, False)]
+    while stack:
+        x, visited = stack.pop()
+        operands = getattr(x, 'operands', None)
+        if operands is None:
+            results.append(make(x, None))
+        elif visited:
+            i = len(results) - len(operands)
+            results[i:] = [make(x, results[i:])]
+        else:
+            stack.append((x, True))
+            stack.extend((y, False) for y in reversed(operands))
+    (r,) = results
+    return r
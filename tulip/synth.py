@@ -33,9 +33,26 @@
 from __future__ import absolute_import
 import copy
 import logging
+import multiprocessing as mp
+import os
 import pprint
+import shutil
+import signal
+import tempfile
+import time
 import warnings
 
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    resource = None
+try:
+    from multiprocessing.connection import wait as _wait
+except ImportError:
+    _wait = None
+
 from tulip.interfaces import gr1c
 from tulip.interfaces import gr1py
 from tulip.interfaces import omega as omega_int
@@ -43,7 +60,10 @@ try:
     from tulip.interfaces import slugs
 except ImportError:
     slugs = None
-from tulip.spec import GRSpec
+from tulip.spec import GRSpec, Table
+from tulip.spec import ast
+from tulip.spec import parser
+from tulip.spec.ast import nodes
 from tulip import transys
 
 
@@ -68,30 +88,6 @@ def _conj(set0):
         if x != ''])
 
 
-def _conj_intersection(set0, set1, parenth=True):
-    if parenth:
-        return ' && '.join([
-            '(' + str(x) + ')'
-            for x in set0
-            if x in set1])
-    else:
-        return ' && '.join([
-            str(x)
-            for x in set0
-            if x in set1])
-
-
-def _conj_neg(set0, parenth=True):
-    if parenth:
-        return ' && '.join([
-            '!(' + str(x) + ')'
-            for x in set0])
-    else:
-        return ' && '.join([
-            '!' + str(x)
-            for x in set0])
-
-
 def _conj_neg_diff(set0, set1, parenth=True):
     if parenth:
         return ' && '.join([
@@ -105,6 +101,55 @@ def _conj_neg_diff(set0, set1, parenth=True):
             if x not in set1])
 
 
+def _ast_not(u):
+    return nodes.Unary('!', u)
+
+
+def _ast_next(u):
+    return nodes.Unary('X', u)
+
+
+def _ast_imp(u, v):
+    return nodes.Binary('->', u, v)
+
+
+def _ast_copy(u):
+    """Return copy of AST C{u}.
+
+    Each clause gets its own nodes,
+    because L{tx.Tree} identifies nodes by C{id}.
+    """
+    root = copy.copy(u)
+    stack = [root]
+    while stack:
+        w = stack.pop()
+        if hasattr(w, 'operands'):
+            w.operands = [copy.copy(x) for x in w.operands]
+            stack.extend(w.operands)
+    return root
+
+
+def _ast_mutex(ids):
+    """Return AST of mutual exclusion among C{ids} values."""
+    values = list(ids.values())
+    return ast.conj(
+        ast.disj([
+            _ast_not(_ast_copy(x)),
+            ast.conj(_ast_not(_ast_copy(y))
+                      for y in values if y is not x)])
+        for x in values)
+
+
+def _ast_exactly_one(ids):
+    """Return AST of n-ary xor among C{ids} values."""
+    values = list(ids.values())
+    return ast.disj(
+        ast.conj(
+            [_ast_copy(x)] +
+            [_ast_not(_ast_copy(y)) for y in values if y is not x])
+        for x in values)
+
+
 def mutex(iterable):
     """Mutual exclusion for all time."""
     iterable = list(filter(lambda x: x != '', iterable))
@@ -139,31 +184,32 @@ def _conj_action(actions_dict, action_type, nxt=False, ids=None):
     @param nxt: prepend or not with the next operator
     @type nxt: bool
 
-    @param ids: map C{action_value} -> value used in solver input,
+    @param ids: map C{action_value} -> AST of value used in solver input,
         for example, for gr1c
     @type ids: dict
 
     @return:
-        - conjunct (includes C{&&} operator) if:
+        - AST of conjunct if:
 
             - C{action_type} in C{actions_dict}, and
             - C{action_value} is not the empty string (modeling "no constrain")
 
           includes next operator (C{X}) if C{nxt = True}.
-        - empty string otherwise
-    @rtype: str
+        - C{None} otherwise
     """
     if action_type not in actions_dict:
-        return ''
+        return None
     action = actions_dict[action_type]
     if ids is not None:
-        action = ids[action]
-    if action is '':
-        return ''
+        u = _ast_copy(ids[action])
+    elif action is '':
+        return None
+    else:
+        u = parser.parse(action)
     if nxt:
-        return ' X' + _pstr(action)
+        return _ast_next(u)
     else:
-        return _pstr(action)
+        return u
 
 
 def _conj_actions(actions_dict, solver_expr=None, nxt=False):
@@ -171,24 +217,21 @@ def _conj_actions(actions_dict, solver_expr=None, nxt=False):
 
     Includes solver expression substitution.
     See also L{_conj_action}.
+
+    @return: AST, or C{None} if C{actions_dict} is empty
     """
-    logger.debug('conjunction of actions: ' + str(actions_dict))
-    logger.debug('mapping to solver equivalents: ' + str(solver_expr))
     if not actions_dict:
-        logger.debug('actions_dict empty, returning empty string\n')
-        return ''
+        return None
     if solver_expr is not None:
-        actions = [solver_expr[type_name][action_value]
+        actions = [_ast_copy(solver_expr[type_name][action_value])
                    for type_name, action_value in actions_dict.items()]
     else:
-        actions = actions_dict
-    logger.debug('after substitution: ' + str(actions))
-    conjuncted_actions = _conj(actions)
-    logger.debug('conjuncted actions: ' + str(conjuncted_actions) + '\n')
+        actions = [parser.parse(x) for x in actions_dict]
+    u = ast.conj(actions)
     if nxt:
-        return ' X' + _pstr(conjuncted_actions)
+        return _ast_next(u)
     else:
-        return _pstr(conjuncted_actions)
+        return u
 
 # duplicate states are impossible, because each networkx vertex is unique
 # non-contiguous integerss for states fine: you are lossing efficiency
@@ -253,6 +296,29 @@ def iter2var(states, variables, statevar, bool_states, must):
       - constraints to be added to C{trans} and/or C{init} in GR(1)
     @rtype: C{dict}, C{list}
     """
+    ids, constraint = _iter2ast(
+        states, variables, statevar, bool_states, must)
+    state_ids = {k: v.flatten() for k, v in ids.items()}
+    if constraint is not None:
+        constraint = [constraint.flatten()]
+    logger.debug(
+        'for tulip variable: ' + str(statevar) + '\n'
+        'the map from [tulip action values] ---> '
+        '[solver expressions] is:\n' + 2 * '\t' + str(state_ids))
+    return state_ids, constraint
+
+
+def _iter2ast(states, variables, statevar, bool_states, must):
+    """Represent finite domain in GR(1), as ASTs.
+
+    Same as L{iter2var}, except for the return value.
+
+    @return: C{tuple} of:
+      - mapping from values to ASTs of GR(1) expressions
+      - AST of constraint to be added to C{trans} and C{init},
+        or C{None}
+    @rtype: C{dict}, AST or C{None}
+    """
     if not states:
         logger.debug('empty container, so empty dict for solver expr')
         return dict(), None
@@ -260,14 +326,8 @@ def iter2var(states, variables, statevar, bool_states, must):
                  'to expression understood by a GR(1) solver.')
     assert must in {'mutex', 'xor', None}
     # options for modeling actions
-    if must in {'mutex', 'xor'}:
-        use_mutex = True
-    else:
-        use_mutex = False
-    if must == 'xor':
-        min_one = True
-    else:
-        min_one = False
+    use_mutex = must in {'mutex', 'xor'}
+    min_one = must == 'xor'
     # no mutex -> cannot use int variable
     if not use_mutex:
         logger.debug('not using mutex: Booleans must model actions')
@@ -277,22 +337,19 @@ def iter2var(states, variables, statevar, bool_states, must):
         'mutex: ' + str(use_mutex) + '\n\t'
         'min_one: ' + str(min_one))
     all_str = all(isinstance(x, str) for x in states)
+    constraint = None
     if bool_states:
         logger.debug('states modeled as Boolean variables')
         if not all_str:
             raise TypeError('If Boolean, all states must be strings.')
-        state_ids = {x: x for x in states}
+        state_ids = {x: nodes.Var(x) for x in states}
         variables.update({s: 'boolean' for s in states})
-        # single action ?
-        if len(mutex(state_ids.values())) == 0:
-            return state_ids
         # handle multiple actions
-        if use_mutex and not min_one:
-            constraint = mutex(state_ids.values())[0]
-        elif use_mutex and min_one:
-            constraint = exactly_one(state_ids.values())[0]
-        elif min_one:
-            raise Exception('min_one requires mutex')
+        if len(state_ids) > 1 and use_mutex:
+            if min_one:
+                constraint = _ast_exactly_one(state_ids)
+            else:
+                constraint = _ast_mutex(state_ids)
     else:
         logger.debug('states not modeled as Booleans')
         if statevar in variables:
@@ -306,14 +363,14 @@ def iter2var(states, variables, statevar, bool_states, must):
                 n = max(states)
             else:
                 n = max(states) + 1
-            f = lambda x: statevar + ' = ' + str(x)
+            const = lambda x: nodes.Num(str(x))
             domain = (min(states), n)
             logger.debug('created solver variable: ' + str(statevar) +
                          '\n\t with domain: ' + str(domain))
         elif all_str:
             logger.debug('all states are strings')
             assert use_mutex
-            f = lambda x: statevar + ' = "' + str(x) + '"'
+            const = nodes.Str
             domain = list(states)
             if not min_one:
                 domain += [statevar + 'none']
@@ -323,21 +380,18 @@ def iter2var(states, variables, statevar, bool_states, must):
                     'could be False (constraint: min_one = False).')
         else:
             raise TypeError('Integer and string states must not be mixed.')
-        state_ids = {x: f(x) for x in states}
+        state_ids = {
+            x: nodes.Comparator('=', nodes.Var(statevar), const(x))
+            for x in states}
         variables[statevar] = domain
-        constraint = None
-    logger.debug(
-        'for tulip variable: ' + str(statevar) + '\n'
-        'the map from [tulip action values] ---> '
-        '[solver expressions] is:\n' + 2 * '\t' + str(state_ids))
     return state_ids, constraint
 
 
 def _add_actions(constraint, init, trans):
     if constraint is None:
         return
-    trans += ['X (' + constraint[0] + ')']
-    init += constraint
+    trans.append(_ast_next(_ast_copy(constraint)))
+    init.append(constraint)
 
 
 def _fts2spec(
@@ -373,7 +427,7 @@ def _fts2spec(
 
 def sys_to_spec(
     ofts, ignore_initial, statevar,
-    bool_states=False, bool_actions=False
+    bool_states=False, bool_actions=False, tables=False
 ):
     """Convert transition system to GR(1) fragment of LTL.
 
@@ -440,7 +494,16 @@ def sys_to_spec(
           - Otherwise use a single integer variable,
             that ranges over the possible action values.
 
+    @param tables: if C{True}, then represent the transitions
+        as a L{spec.Table} in C{tables['sys_safety']},
+        instead of one formula for each state.
+        Ignored if states or actions are Boolean variables,
+        or edges are labeled with the key C{'actions'}.
+    @type tables: bool
+
     @return: logic formula in GR(1) form representing C{ofts}.
+        The clauses are built as ASTs, which the L{GRSpec}
+        caches, so they are not parsed again.
     @rtype: L{GRSpec}
     """
     if not isinstance(ofts, transys.FiniteTransitionSystem):
@@ -465,7 +528,7 @@ def sys_to_spec(
         logger.debug(msg)
         if 'sys' in action_type:
             logger.debug('Found sys action')
-            action_ids, constraint = iter2var(
+            action_ids, constraint = _iter2ast(
                 codomain, sys_vars,
                 action_type, bool_actions, ofts.sys_actions_must)
             _add_actions(constraint, sys_init, sys_trans)
@@ -473,29 +536,41 @@ def sys_to_spec(
             sys_action_ids[action_type] = action_ids
         elif 'env' in action_type:
             logger.debug('Found env action')
-            action_ids, constraint = iter2var(
+            action_ids, constraint = _iter2ast(
                 codomain, env_vars,
                 action_type, bool_actions, ofts.env_actions_must)
             _add_actions(constraint, env_init, env_trans)
             logger.debug('Updating env_action_ids with:\n\t' + str(action_ids))
             env_action_ids[action_type] = action_ids
-    state_ids, constraint = iter2var(states, sys_vars, statevar,
-                                     bool_states, must='xor')
+    state_ids, constraint = _iter2ast(states, sys_vars, statevar,
+                                      bool_states, must='xor')
     if constraint is not None:
-        sys_trans += constraint
+        sys_trans.append(constraint)
     sys_init += _sys_init_from_ts(states, state_ids, aps, ignore_initial)
-    sys_trans += _sys_trans_from_ts(
-        states, state_ids, trans,
-        sys_action_ids=sys_action_ids, env_action_ids=env_action_ids)
+    table = None
+    if tables:
+        action_types = [
+            k for ids in (sys_action_ids, env_action_ids)
+            for k, v in ids.items() if v]
+        table = _sys_trans_table(
+            trans, statevar, action_types,
+            dict(sys_vars, **env_vars))
+    if table is None:
+        sys_trans += _sys_trans_from_ts(
+            states, state_ids, trans,
+            sys_action_ids=sys_action_ids, env_action_ids=env_action_ids)
     tmp_init, tmp_trans = _ap_trans_from_ts(states, state_ids, aps)
     sys_init += tmp_init
     sys_trans += tmp_trans
     env_trans += _env_trans_from_sys_ts(
         states, state_ids, trans, env_action_ids)
-    return GRSpec(
+    spec = GRSpec(
         sys_vars=sys_vars, env_vars=env_vars,
         env_init=env_init, sys_init=sys_init,
         env_safety=env_trans, sys_safety=sys_trans)
+    if table is not None:
+        spec.tables['sys_safety'].append(table)
+    return spec
 
 
 def env_to_spec(
@@ -541,13 +616,13 @@ def env_to_spec(
     env_action_ids = dict()
     for action_type, codomain in actions.items():
         if 'sys' in action_type:
-            action_ids, constraint = iter2var(
+            action_ids, constraint = _iter2ast(
                 codomain, sys_vars, action_type,
                 bool_actions, ofts.sys_actions_must)
             _add_actions(constraint, sys_init, sys_trans)
             sys_action_ids[action_type] = action_ids
         elif 'env' in action_type:
-            action_ids, constraint = iter2var(
+            action_ids, constraint = _iter2ast(
                 codomain, env_vars, action_type,
                 bool_actions, ofts.env_actions_must)
             _add_actions(constraint, env_init, env_trans)
@@ -556,10 +631,10 @@ def env_to_spec(
     # whether the user will provide a system TS as well
     # and whether that TS will contain all the system actions
     # defined in the environment TS
-    state_ids, constraint = iter2var(states, env_vars, statevar,
-                                     bool_states, must='xor')
+    state_ids, constraint = _iter2ast(states, env_vars, statevar,
+                                      bool_states, must='xor')
     if constraint is not None:
-        env_trans += constraint
+        env_trans.append(constraint)
     env_init += _sys_init_from_ts(states, state_ids, aps, ignore_initial)
     env_trans += _env_trans_from_env_ts(
         states, state_ids, trans,
@@ -588,9 +663,7 @@ def _sys_init_from_ts(states, state_ids, aps, ignore_initial=False):
             ' - assumption if this is an environment TS,\n'
             '   so the spec becomes trivially True.')
         raise Exception(msg)
-        init += ['False']
-        return init
-    init += [_disj([state_ids[s] for s in states.initial])]
+    init.append(ast.disj(_ast_copy(state_ids[s]) for s in states.initial))
     return init
 
 
@@ -648,73 +721,108 @@ def _sys_trans_from_ts(
 
             C{action_type = i}
 
+            The solver expressions are ASTs.
+
             where C{i} corresponds to that particular  C{action_type}.
 
     @param env_action_ids: same as C{sys-action_ids}
+
+    @return: ASTs of clauses
+    @rtype: C{list}
     """
     logger.debug('modeling sys transitions in logic')
     sys_trans = list()
+    graph = trans.graph
     # Transitions
     for from_state in states:
-        from_state_id = state_ids[from_state]
-        precond = _pstr(from_state_id)
-        cur_trans = trans.find([from_state])
-        msg = ('from state: ' + str(from_state) +
-               ', the available transitions are:\n\t' + str(cur_trans))
-        logger.debug(msg)
-        # no successor states ?
-        if not cur_trans:
-            logger.debug('state: ' + str(from_state) + ' is deadend !')
-            sys_trans += [precond + ' -> X(False)']
-            continue
-        cur_str = list()
-        for (from_state, to_state, label) in cur_trans:
-            to_state_id = state_ids[to_state]
-            postcond = ['X' + _pstr(to_state_id)]
-            logger.debug('label = ' + str(label))
-            if 'previous' in label:
-                previous = label['previous']
-            else:
-                previous = set()
-            logger.debug('previous = ' + str(previous))
+        precond = state_ids[from_state]
+        cur_ast = list()
+        for _, to_state, label in graph.edges_iter(from_state, data=True):
+            postcond = [_ast_next(_ast_copy(state_ids[to_state]))]
+            previous = label.get('previous', set())
             env_actions = {k: v for k, v in label.items() if 'env' in k}
             prev_env_act = {k: v for k, v in env_actions.items()
                             if k in previous}
             next_env_act = {k: v for k, v in env_actions.items()
                             if k not in previous}
-            postcond += [_conj_actions(prev_env_act, env_action_ids,
-                                       nxt=False)]
-            postcond += [_conj_actions(next_env_act, env_action_ids,
-                                       nxt=True)]
+            postcond.append(_conj_actions(prev_env_act, env_action_ids,
+                                          nxt=False))
+            postcond.append(_conj_actions(next_env_act, env_action_ids,
+                                          nxt=True))
             sys_actions = {k: v for k, v in label.items() if 'sys' in k}
             prev_sys_act = {k: v for k, v in sys_actions.items()
                             if k in previous}
             next_sys_act = {k: v for k, v in sys_actions.items()
                             if k not in previous}
-            postcond += [_conj_actions(prev_sys_act, sys_action_ids,
-                                       nxt=False)]
-            postcond += [_conj_actions(next_sys_act, sys_action_ids,
-                                       nxt=True)]
+            postcond.append(_conj_actions(prev_sys_act, sys_action_ids,
+                                          nxt=False))
+            postcond.append(_conj_actions(next_sys_act, sys_action_ids,
+                                          nxt=True))
             # if system FTS given
             # in case 'actions in label, then action_ids is a dict,
             # not a dict of dicts, because certainly this came
             # from an FTS, not an OpenFTS
-            if 'actions' in previous:
-                postcond += [_conj_action(label, 'actions',
-                                          ids=action_ids, nxt=False)]
-            else:
-                postcond += [_conj_action(label, 'actions',
-                                          ids=action_ids, nxt=True)]
-            cur_str += [_conj(postcond)]
-            msg = (
-                'guard to state: ' + str(to_state) +
-                ', with state_id: ' + str(to_state_id) +
-                ', has post-conditions: ' + str(postcond))
-            logger.debug(msg)
-        sys_trans += [precond + ' -> (' + _disj(cur_str) + ')']
+            postcond.append(_conj_action(
+                label, 'actions', ids=action_ids,
+                nxt='actions' not in previous))
+            cur_ast.append(ast.conj(postcond))
+        # no successor states ?
+        if not cur_ast:
+            logger.debug('state: ' + str(from_state) + ' is deadend !')
+            post = _ast_next(nodes.Bool('False'))
+        else:
+            post = ast.disj(cur_ast)
+        sys_trans.append(_ast_imp(_ast_copy(precond), post))
     return sys_trans
 
 
+def _sys_trans_table(trans, statevar, action_types, variables):
+    """Return transition relation as a L{spec.Table}.
+
+    Same relation as L{_sys_trans_from_ts}, with one row for each edge.
+    Columns are the current and next state, and each action type,
+    current or next depending on the edge attribute C{'previous'}.
+    States without successors appear in no row,
+    so they are excluded, as by C{X(False)} in formulas.
+
+    @param action_types: names of action variables
+    @param variables: C{dict} of declared variables,
+        to check that states and actions are integer or string variables
+    @return: L{spec.Table}, or C{None} if the relation
+        cannot be represented by a table over these variables
+    """
+    for var in [statevar] + action_types:
+        if not isinstance(variables.get(var), (list, tuple)):
+            logger.debug(
+                '"{v}" is not an integer or string variable, '
+                'so no table'.format(v=var))
+            return None
+    columns = [statevar, statevar + "'"]
+    for t in action_types:
+        columns.extend([t, t + "'"])
+    rows = list()
+    graph = trans.graph
+    for from_state, to_state, label in graph.edges_iter(data=True):
+        if 'actions' in label:
+            logger.debug('edge with key "actions", so no table')
+            return None
+        previous = label.get('previous', set())
+        row = [from_state, to_state]
+        for t in action_types:
+            value = label.get(t)
+            if t in previous:
+                row.extend([value, None])
+            else:
+                row.extend([None, value])
+        rows.append(row)
+    # drop unconstrained columns
+    used = [i for i in range(len(columns))
+            if i < 2 or any(r[i] is not None for r in rows)]
+    return Table(
+        [columns[i] for i in used],
+        ([r[i] for i in used] for r in rows))
+
+
 def _env_trans_from_sys_ts(states, state_ids, trans, env_action_ids):
     """Convert environment actions to GR(1) env_safety.
 
@@ -734,34 +842,28 @@ def _env_trans_from_sys_ts(states, state_ids, trans, env_action_ids):
     # this probably useless for multiple action types
     if not env_action_ids:
         return env_trans
+    graph = trans.graph
     for from_state in states:
-        from_state_id = state_ids[from_state]
-        precond = _pstr(from_state_id)
-        cur_trans = trans.find([from_state])
-        # no successor states ?
-        if not cur_trans:
-            # nothing modeled for env, since sys has X(False) anyway
-            # for action_type, codomain_map in env_action_ids.items():
-            # env_trans += [precond + ' -> X(' + s + ')']
-            continue
         # collect possible next env actions
-        next_env_action_combs = set()
-        for (from_state, to_state, label) in cur_trans:
+        # (no successor states: nothing modeled for env,
+        # since sys has X(False) anyway)
+        next_env_action_combs = dict()
+        for _, _, label in graph.edges_iter(from_state, data=True):
             env_actions = {k: v for k, v in label.items() if 'env' in k}
             if not env_actions:
                 continue
-            logger.debug('env_actions: ' + str(env_actions))
-            logger.debug('env_action_ids: ' + str(env_action_ids))
-            env_action_comb = _conj_actions(env_actions, env_action_ids)
-            logger.debug('env_action_comb: ' + str(env_action_comb))
-            next_env_action_combs.add(env_action_comb)
-        next_env_actions = _disj(next_env_action_combs)
-        logger.debug('next_env_actions: ' + str(next_env_actions))
+            key = frozenset(env_actions.items())
+            if key in next_env_action_combs:
+                continue
+            next_env_action_combs[key] = _conj_actions(
+                env_actions, env_action_ids)
         # no next env actions ?
-        if not next_env_actions:
+        if not next_env_action_combs:
             continue
-        env_trans += [precond + ' -> X(' +
-                      next_env_actions + ')']
+        next_env_actions = ast.disj(next_env_action_combs.values())
+        env_trans.append(_ast_imp(
+            _ast_copy(state_ids[from_state]),
+            _ast_next(next_env_actions)))
     return env_trans
 
 
@@ -775,39 +877,42 @@ def _env_trans_from_env_ts(
     i.e., constrains the next environment state variables' valuation
     depending on the previous environment state variables valuation
     and the previous system action (system output).
+
+    @return: ASTs of clauses
+    @rtype: C{list}
     """
     env_trans = list()
+    graph = trans.graph
     for from_state in states:
-        from_state_id = state_ids[from_state]
-        precond = _pstr(from_state_id)
-        cur_trans = trans.find([from_state])
-        # no successor states ?
-        if not cur_trans:
-            env_trans += [precond + ' -> X(False)']
-            msg = (
-                'Environment dead-end found.\n'
-                'If sys can force env to dead-end,\n'
-                'then GR(1) assumption becomes False,\n'
-                'and spec trivially True.')
-            warnings.warn(msg)
-            continue
+        precond = state_ids[from_state]
         cur_list = list()
         found_free = False  # any environment transition
         # not conditioned on the previous system output ?
-        for (from_state, to_state, label) in cur_trans:
-            to_state_id = state_ids[to_state]
-            postcond = ['X' + _pstr(to_state_id)]
+        for _, to_state, label in graph.edges_iter(from_state, data=True):
+            postcond = [_ast_next(_ast_copy(state_ids[to_state]))]
             env_actions = {k: v for k, v in label.items() if 'env' in k}
-            postcond += [_conj_actions(env_actions, env_action_ids, nxt=True)]
+            postcond.append(
+                _conj_actions(env_actions, env_action_ids, nxt=True))
             # remember: this is an environment FTS, so no next for sys
             sys_actions = {k: v for k, v in label.items() if 'sys' in k}
-            postcond += [_conj_actions(sys_actions, sys_action_ids)]
-            postcond += [_conj_action(label, 'actions', nxt=True,
-                                      ids=action_ids)]
+            postcond.append(_conj_actions(sys_actions, sys_action_ids))
+            postcond.append(_conj_action(label, 'actions', nxt=True,
+                                         ids=action_ids))
             # todo: test this claus
             if not sys_actions:
                 found_free = True
-            cur_list += [_conj(postcond)]
+            cur_list.append(ast.conj(postcond))
+        # no successor states ?
+        if not cur_list:
+            env_trans.append(_ast_imp(
+                _ast_copy(precond), _ast_next(nodes.Bool('False'))))
+            msg = (
+                'Environment dead-end found.\n'
+                'If sys can force env to dead-end,\n'
+                'then GR(1) assumption becomes False,\n'
+                'and spec trivially True.')
+            warnings.warn(msg)
+            continue
         # can sys kill env by setting all previous sys outputs to False ?
         # then env assumption becomes False,
         # so the spec trivially True: avoid this
@@ -816,58 +921,44 @@ def _env_trans_from_env_ts(
                   'instead will take disjunction with negated sys actions'
             logger.debug(msg)
             for action_type, codomain in sys_action_ids.items():
-                conj = _conj_neg(codomain.values())
-                cur_list += [conj]
-                msg = (
-                    'for action_type: ' + str(action_type) + '\n' +
-                    'with codomain: ' + str(codomain) + '\n' +
-                    'the negated conjunction is: ' + str(conj))
-                logger.debug(msg)
-        env_trans += [_pstr(precond) + ' -> (' + _disj(cur_list) + ')']
+                conj = ast.conj(_ast_not(_ast_copy(x))
+                                 for x in codomain.values())
+                cur_list.append(conj)
+        env_trans.append(_ast_imp(_ast_copy(precond), ast.disj(cur_list)))
     return env_trans
 
 
 def _ap_trans_from_ts(states, state_ids, aps):
     """Require atomic propositions to follow states according to label.
+
+    @return: ASTs of clauses for C{init} and C{trans}
+    @rtype: C{tuple} of two C{list}
     """
     init = list()
     trans = list()
     # no AP labels ?
     if not aps:
         return (init, trans)
-    # initial labeling
-    for state in states:
-        state_id = state_ids[state]
-        label = states[state]
-        ap_str = _sprint_aps(label, aps)
-        if not ap_str:
-            continue
-        init += ['!(' + _pstr(state_id) + ') || (' + ap_str + ')']
-    # transitions of labels
     for state in states:
         label = states[state]
         state_id = state_ids[state]
-        tmp = _sprint_aps(label, aps)
-        if not tmp:
-            continue
-        trans += ['X((' + str(state_id) + ') -> (' + tmp + '))']
+        # initial labeling
+        init.append(ast.disj([
+            _ast_not(_ast_copy(state_id)),
+            _ap_ast(label, aps)]))
+        # transitions of labels
+        trans.append(_ast_next(_ast_imp(
+            _ast_copy(state_id),
+            _ap_ast(label, aps))))
     return (init, trans)
 
 
-def _sprint_aps(label, aps):
-    if 'ap' in label:
-        tmp0 = _conj_intersection(aps, label['ap'], parenth=False)
-    else:
-        tmp0 = ''
-    if 'ap' in label:
-        tmp1 = _conj_neg_diff(aps, label['ap'], parenth=False)
-    else:
-        tmp1 = _conj_neg(aps, parenth=False)
-    if len(tmp0) > 0 and len(tmp1) > 0:
-        tmp = tmp0 + ' && ' + tmp1
-    else:
-        tmp = tmp0 + tmp1
-    return tmp
+def _ap_ast(label, aps):
+    """Return AST of conjunction that fixes the values of C{aps}."""
+    ap_label = label.get('ap', ())
+    return ast.conj(
+        [nodes.Var(p) for p in aps if p in ap_label] +
+        [_ast_not(nodes.Var(p)) for p in aps if p not in ap_label])
 
 
 def build_dependent_var_table(fts, statevar):
@@ -994,6 +1085,196 @@ def synthesize_many(specs, ts=None, ignore_init=None,
     return _synthesize(specs, solver, rm_deadends=True)
 
 
+def synthesize_batch(
+        specs, solver='omega', workers=None,
+        timeout=None, max_memory=None,
+        rm_deadends=True):
+    """Synthesize from many specifications in parallel.
+
+    Each job runs in its own process, with at most C{workers}
+    processes at a time, so a job can be stopped without affecting
+    the others.  Results are yielded as each job finishes,
+    in the order of completion.
+
+    A job that exceeds C{timeout} is killed, together with any
+    solver it started (e.g., C{gr1c} or C{slugs}), because each job
+    runs in its own process group.  Each job writes temporary files
+    to its own directory, which is removed when the job ends.
+
+    The specifications are passed to the jobs by C{fork},
+    so this function is available on POSIX systems.
+
+    Example::
+
+      for i, ctrl, stats in synth.synthesize_batch(specs, workers=4):
+          print(i, stats['status'], stats['time'])
+
+    @param specs: specifications to synthesize from,
+        as from L{synthesize} after adding any transition systems
+    @type specs: iterable of L{GRSpec}
+    @param solver: see L{synthesize}
+    @param workers: number of parallel jobs,
+        by default the number of CPUs
+    @type workers: C{int}
+    @param timeout: wall-clock time limit for each job, in seconds
+    @type timeout: C{float}
+    @param max_memory: limit of address space for each job,
+        including the solver it calls, in bytes
+    @type max_memory: C{int}
+    @param rm_deadends: see L{synthesize}
+
+    @return: generator of C{(index, ctrl, stats)}, where C{index}
+        is the position of the specification in C{specs},
+        C{ctrl} a L{MealyMachine} or C{None},
+        and C{stats} a C{dict} with keys:
+
+          - C{'status'}: C{'done'}, C{'timeout'},
+            C{'memory'} (limit exceeded), or C{'error'}
+          - C{'time'}: wall-clock time, in seconds
+          - C{'max_rss'}: peak resident memory of the job
+            and its solver, in kilobytes, if known
+          - C{'error'}: message, if C{'status'} is C{'error'}
+
+        C{ctrl} is C{None} if unrealizable,
+        or C{'status'} is not C{'done'}.
+    """
+    if not hasattr(os, 'fork'):
+        raise NotImplementedError(
+            '`synthesize_batch` requires `os.fork`.')
+    if workers is None:
+        workers = mp.cpu_count()
+    if workers < 1:
+        raise ValueError(
+            '`workers` must be positive, got: {w}'.format(w=workers))
+    jobs = iter(enumerate(specs))
+    running = dict()
+    try:
+        while True:
+            while len(running) < workers:
+                job = next(jobs, None)
+                if job is None:
+                    break
+                i, spec = job
+                running[i] = _start_job(
+                    spec, solver, rm_deadends, max_memory)
+            if not running:
+                return
+            for i in _wait_jobs(running, timeout):
+                ctrl, stats = _finish_job(running.pop(i), timeout)
+                yield i, ctrl, stats
+    finally:
+        # generator closed early, or error
+        for job in running.values():
+            _kill_job(job)
+
+
+def _start_job(spec, solver, rm_deadends, max_memory):
+    """Fork process that synthesizes from C{spec}."""
+    tmpdir = tempfile.mkdtemp(prefix='tulip_batch_')
+    recv, send = mp.Pipe(duplex=False)
+    p = mp.Process(
+        target=_batch_worker,
+        args=(send, spec, solver, rm_deadends, max_memory, tmpdir))
+    p.daemon = True
+    p.start()
+    send.close()
+    return dict(process=p, conn=recv, start=time.time(), tmpdir=tmpdir)
+
+
+def _wait_jobs(running, timeout):
+    """Return indices of jobs that finished or timed out."""
+    poll = 0.05
+    if timeout is not None:
+        now = time.time()
+        left = min(job['start'] + timeout - now
+                   for job in running.values())
+        poll = max(min(poll, left), 0)
+    conns = {job['conn']: i for i, job in running.items()}
+    if _wait is not None:
+        ready = _wait(list(conns), poll)
+    else:
+        ready = [c for c in conns if c.poll(poll / len(conns))]
+    done = [conns[c] for c in ready]
+    if timeout is not None:
+        now = time.time()
+        done.extend(
+            i for i, job in running.items()
+            if i not in done and now - job['start'] > timeout)
+    return done
+
+
+def _finish_job(job, timeout):
+    """Return result of job, killing it if still running."""
+    conn = job['conn']
+    ctrl = None
+    if conn.poll():
+        try:
+            ctrl, stats = conn.recv()
+        except EOFError:
+            # exited without sending a result
+            job['process'].join()
+            stats = dict(
+                status='error',
+                error='exit code {c}'.format(c=job['process'].exitcode))
+        else:
+            job['process'].join()
+    else:
+        stats = dict(status='timeout')
+        logger.info('job exceeded timeout of {t} sec'.format(t=timeout))
+    stats['time'] = time.time() - job['start']
+    stats.setdefault('max_rss', None)
+    _kill_job(job)
+    return ctrl, stats
+
+
+def _kill_job(job):
+    """Kill process group of job, and remove its temporary files."""
+    p = job['process']
+    if p.is_alive():
+        try:
+            os.killpg(p.pid, signal.SIGKILL)
+        except OSError:
+            p.terminate()
+    p.join()
+    # solvers started by the job may still be exiting
+    try:
+        os.killpg(p.pid, signal.SIGKILL)
+    except OSError:
+        pass
+    job['conn'].close()
+    shutil.rmtree(job['tmpdir'], ignore_errors=True)
+
+
+def _batch_worker(conn, spec, solver, rm_deadends, max_memory, tmpdir):
+    """Synthesize in child process, and send C{(ctrl, stats)}."""
+    # own group, so that the parent can kill the solvers too
+    os.setpgid(0, 0)
+    os.environ['TMPDIR'] = tmpdir
+    tempfile.tempdir = tmpdir
+    if max_memory is not None:
+        if resource is None:
+            raise ImportError('Limiting memory requires `resource`.')
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory, max_memory))
+    try:
+        ctrl = _synthesize(spec, solver, rm_deadends)
+        stats = dict(status='done')
+    except MemoryError:
+        ctrl = None
+        stats = dict(status='memory')
+    except Exception as e:
+        ctrl = None
+        stats = dict(status='error', error=repr(e))
+    if resource is not None:
+        stats['max_rss'] = max(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    try:
+        conn.send((ctrl, stats))
+    except MemoryError:
+        conn.send((None, dict(status='memory')))
+    conn.close()
+
+
 def synthesize(
         specs,
         env=None,
@@ -1001,7 +1282,9 @@ def synthesize(
         ignore_env_init=False,
         ignore_sys_init=False,
         rm_deadends=True,
-        solver='omega'):
+        solver='omega',
+        cache=None,
+        symbolic=False):
     """Function to call the appropriate synthesis tool on the specification.
 
     There are three attributes of C{specs} that define what
@@ -1089,25 +1372,58 @@ def synthesize(
           - C{"slugs"}: use slugs via L{interfaces.slugs}.
             C++ using CUDD, symbolic
 
+    @param cache: store of results from previous calls.
+        If the same specification was solved before,
+        then the solver is not called.
+    @type cache: L{cache.SynthesisCache}
+
+    @param symbolic: if C{True}, then return the strategy
+        as BDDs, without enumerating its states.
+        Requires C{solver='omega'} and C{specs.moore = False}.
+        Ignores C{rm_deadends} and C{cache}.
+    @type symbolic: bool
+
     @return: If spec is realizable,
         then return a Mealy machine implementing the strategy.
         Otherwise return None.
-    @rtype: L{MealyMachine} or None
+    @rtype: L{MealyMachine}, L{transys.symbolic.SymbolicMealyMachine},
+        or None
     """
     specs = _spec_plus_sys(
         specs, env, sys,
         ignore_env_init,
-        ignore_sys_init)
-    return _synthesize(specs, solver, rm_deadends)
+        ignore_sys_init,
+        tables=(solver == 'omega'))
+    if symbolic:
+        if solver != 'omega':
+            raise ValueError(
+                'Symbolic strategies require `solver="omega"`.')
+        return omega_int.synthesize_symbolic(specs)
+    return _synthesize(specs, solver, rm_deadends, cache)
 
 
-def _synthesize(specs, solver, rm_deadends):
+def _synthesize(specs, solver, rm_deadends, cache=None):
     """Return `MealyMachine` or `None` that implements `specs`.
 
     @type specs: L{spec.GRSpec}
     @type rm_deadends: C{bool}
+    @type cache: L{cache.SynthesisCache} or C{None}
     @rtype: L{MealyMachine} or C{None}
     """
+    if cache is None:
+        strategy = _call_solver(specs, solver)
+    else:
+        key = cache.key(specs, solver, 'synthesize')
+        try:
+            strategy = cache[key]
+        except KeyError:
+            strategy = _call_solver(specs, solver)
+            cache[key] = strategy
+    return _trim_strategy(strategy, specs, rm_deadends=rm_deadends)
+
+
+def _call_solver(specs, solver):
+    """Return strategy graph from C{solver}, or C{None}."""
     if solver == 'gr1c':
         strategy = gr1c.synthesize(specs)
     elif solver == 'slugs':
@@ -1126,7 +1442,7 @@ def _synthesize(specs, solver, rm_deadends):
             'Unknown solver: "{solver}". '
             'Available options are: {options}').format(
                 solver=solver, options=options))
-    return _trim_strategy(strategy, specs, rm_deadends=rm_deadends)
+    return strategy
 
 
 def _trim_strategy(strategy, specs, rm_deadends):
@@ -1157,14 +1473,34 @@ def is_realizable(
         sys=None,
         ignore_env_init=False,
         ignore_sys_init=False,
-        solver='omega'):
+        solver='omega',
+        cache=None):
     """Check realizability.
 
     For details see L{synthesize}.
     """
     specs = _spec_plus_sys(
         specs, env, sys,
-        ignore_env_init, ignore_sys_init)
+        ignore_env_init, ignore_sys_init,
+        tables=(solver == 'omega'))
+    if cache is None:
+        r = _check_realizable(specs, solver)
+    else:
+        key = cache.key(specs, solver, 'is_realizable')
+        try:
+            r = cache[key]
+        except KeyError:
+            r = _check_realizable(specs, solver)
+            cache[key] = r
+    if r:
+        logger.debug('is realizable')
+    else:
+        logger.debug('is not realizable')
+    return r
+
+
+def _check_realizable(specs, solver):
+    """Return C{True} if C{solver} finds C{specs} realizable."""
     if solver == 'gr1c':
         r = gr1c.check_realizable(specs)
     elif solver == 'slugs':
@@ -1182,16 +1518,18 @@ def is_realizable(
             'Undefined synthesis solver. '
             'Available options are "gr1c", '
             '"slugs", and "gr1py"')
-    if r:
-        logger.debug('is realizable')
-    else:
-        logger.debug('is not realizable')
     return r
 
 
 def _spec_plus_sys(
         specs, env, sys,
-        ignore_env_init, ignore_sys_init):
+        ignore_env_init, ignore_sys_init,
+        tables=False):
+    """Return conjunction of C{specs} with the formulas of C{env}, C{sys}.
+
+    @param tables: passed to L{sys_to_spec},
+        for solvers that build tables directly
+    """
     if sys is not None:
         if hasattr(sys, 'state_varname'):
             statevar = sys.state_varname
@@ -1201,10 +1539,11 @@ def _spec_plus_sys(
             statevar = 'loc'
         sys_formula = sys_to_spec(
             sys, ignore_sys_init,
-            statevar=statevar)
+            statevar=statevar, tables=tables)
         _copy_options_from_ts(sys_formula, sys, specs)
         specs = specs | sys_formula
-        logger.debug('sys TS:\n' + str(sys_formula.pretty()) + _hl)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('sys TS:\n' + str(sys_formula.pretty()) + _hl)
     if env is not None:
         if hasattr(env, 'state_varname'):
             statevar = sys.state_varname
@@ -1217,8 +1556,10 @@ def _spec_plus_sys(
             statevar=statevar)
         _copy_options_from_ts(env_formula, env, specs)
         specs = specs | env_formula
-        logger.debug('env TS:\n' + str(env_formula.pretty()) + _hl)
-    logger.info('Overall Spec:\n' + str(specs.pretty()) + _hl)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('env TS:\n' + str(env_formula.pretty()) + _hl)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info('Overall Spec:\n' + str(specs.pretty()) + _hl)
     return specs
 
 
@@ -1266,56 +1607,21 @@ def strategy2mealy(A, spec):
         k: v for k, v in sys_vars.items()
         if isinstance(v, list)})
     mach.states.add_from(A)
-    # transitions labeled with I/O
-    for u in A:
-        for v in A.successors_iter(u):
-            d = A.node[v]['state']
-            d = _int2str(d, str_vars)
-            mach.transitions.add(u, v, **d)
-
-            logger.info('node: {v}, state: {d}'.format(v=v, d=d))
+    # transitions labeled with I/O,
+    # one label per node, shared by its incoming edges
+    labels = {
+        v: _int2str(d['state'], str_vars)
+        for v, d in A.nodes_iter(data=True)}
+    mach.transitions.add_new_from(
+        (u, v, labels[v]) for u, v in A.edges_iter())
+    logger.info('added {m} transitions'.format(m=A.number_of_edges()))
     # special initial state, for first reaction
     initial_state = 'Sinit'
     mach.states.add(initial_state)
     mach.states.initial.add(initial_state)
-    # fix an ordering for keys
-    # because tuple(dict.items()) is not safe:
-    # https://docs.python.org/2/library/stdtypes.html#dict.items
-    try:
-        u = next(iter(A))
-        keys = A.node[u]['state'].keys()
-    except Exception:
-        logger.warning('strategy has no states.')
-    # to store tuples of dict values for fast search
-    isinit = spec.compile_init(no_str=True)
-    # Mealy reaction to initial env input
-    init_valuations = set()
-    tmp = dict()
-    for u, d in A.nodes_iter(data=True):
-        var_values = d['state']
-        vals = tuple(var_values[k] for k in keys)
-        # already an initial valuation ?
-        if vals in init_valuations:
-            continue
-        # add edge: Sinit -> u ?
-        tmp.update(var_values)
-        if eval(isinit, tmp):
-            label = _int2str(var_values, str_vars)
-            mach.transitions.add(initial_state, u, **label)
-            # remember variable values to avoid
-            # spurious non-determinism wrt the machine's memory
-            #
-            # in other words,
-            # "state" omits the strategy's memory
-            # hidden (existentially quantified)
-            # so multiple nodes can be labeled with the same state
-            #
-            # non-uniqueness here would be equivalent to
-            # multiple choices for initializing the hidden memory.
-            init_valuations.add(vals)
-            logger.debug('found initial state: {u}'.format(u=u))
-        logger.debug('machine vertex: {u}, has var values: {v}'.format(
-                     u=u, v=var_values))
+    mach.transitions.add_new_from(
+        (initial_state, u, labels[u])
+        for u in _initial_nodes(A, spec))
     n = len(A)
     m = len(mach)
     assert m == n + 1, (n, m)
@@ -1331,6 +1637,54 @@ def strategy2mealy(A, spec):
     return mach
 
 
+def _initial_nodes(A, spec):
+    """Return nodes of strategy C{A} that can be initial.
+
+    The initial condition of C{spec} is evaluated over
+    all node valuations at once, as C{numpy} columns.
+    Among nodes with the same valuation, only the first
+    one is returned.
+
+    @type A: C{networkx.DiGraph}
+    @type spec: L{GRSpec}
+    @rtype: C{list}
+    """
+    nodes = A.nodes()
+    if not nodes:
+        logger.warning('strategy has no states.')
+        return list()
+    states = [A.node[u]['state'] for u in nodes]
+    # fix an ordering for keys
+    # because tuple(dict.items()) is not safe:
+    # https://docs.python.org/2/library/stdtypes.html#dict.items
+    keys = list(states[0])
+    columns = {k: np.array([d[k] for d in states]) for k in keys}
+    isinit = spec.compile_init(no_str=True, vectorized=True)
+    mask = np.broadcast_to(eval(isinit, columns), len(nodes))
+    # Mealy reaction to initial env input
+    init_valuations = set()
+    init = list()
+    for i in np.flatnonzero(mask):
+        d = states[i]
+        vals = tuple(d[k] for k in keys)
+        # remember variable values to avoid
+        # spurious non-determinism wrt the machine's memory
+        #
+        # in other words,
+        # "state" omits the strategy's memory
+        # hidden (existentially quantified)
+        # so multiple nodes can be labeled with the same state
+        #
+        # non-uniqueness here would be equivalent to
+        # multiple choices for initializing the hidden memory.
+        if vals in init_valuations:
+            continue
+        init_valuations.add(vals)
+        init.append(nodes[i])
+        logger.debug('found initial state: {u}'.format(u=nodes[i]))
+    return init
+
+
 def _int2str(label, str_vars):
     """Replace integers with string values for string variables.
 
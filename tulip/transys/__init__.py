@@ -54,3 +54,5 @@ from .automata import (
 from .machines import MooreMachine, MealyMachine
 
 from .products import OnTheFlyProductAutomaton
+
+from .symbolic import SymbolicFTS, SymbolicMealyMachine
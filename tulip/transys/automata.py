@@ -105,7 +105,7 @@ class FiniteStateAutomaton(LabeledDiGraph):
             edge_label_types=edge_label_types)
         # accepting states
         if accepting_states_type is None:
-            self._accepting = SubSet(self.states)
+            self._accepting = SubSet(self.states, hashable=True)
             self._accepting_type = SubSet
         else:
             self._accepting = accepting_states_type(self)
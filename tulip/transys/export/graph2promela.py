@@ -34,7 +34,12 @@ Convert state graphs to promela
 """
 from __future__ import print_function
 
-from time import strftime
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from tulip.transys.export import stream
 
 def fts2promela(graph, procname=None):
     """Convert (possibly labeled) state graph to Promela str.
@@ -62,70 +67,14 @@ def fts2promela(graph, procname=None):
 
     @param procname: Promela process name (after proctype)
     @type procname: str (default: system name)
-    """
-    def state_ap2promela(state, graph, ap_alphabet):
-        ap_label = get_label_of(state, graph)
-        s = ''
-        for prop in ap_alphabet:
-            if prop is True:
-                continue
-
-            if prop in ap_label:
-                s += '\t\t ' +str(prop) +' = 1;\n'
-            else:
-                s += '\t\t ' +str(prop) +' = 0;\n'
-
-        s += '\t\t printf("State: ' +str(state) +'\\n");\n'
-        s += '\t\n'
-        return s
-
-    def trans2promela(transitions, graph, ap_alphabet):
-        s = '\t if\n'
-        for (from_state, to_state, sublabels_dict) in transitions:
-            s += '\t :: atomic{\n'
-            s += '\t\t printf("' +str(sublabels_dict) +'\\n");\n'
-            s += state_ap2promela(to_state, graph, ap_alphabet)
-            s += '\t\t goto ' +str(to_state) +'\n'
-            s += '\t }\n'
-        s += '\t fi;\n\n'
-        return s
-
-    def get_label_of(state, graph):
-        state_label_pairs = graph.states.find([state] )
-        (state_, ap_label) = state_label_pairs[0]
-        print('state:\t' +str(state) )
-        print('ap label:\t' +str(ap_label) )
-        return ap_label['ap']
-
-    if procname is None:
-        procname = graph.name
 
-    s = '/*\n * Promela file generated with TuLiP\n'
-    s += ' * Date: '+str(strftime('%x %X %z') ) +'\n */\n\n'
-    for ap in graph.atomic_propositions:
-        # convention "!" means negation
-        if ap not in {None, True}:
-            s += 'bool ' +str(ap) +';\n'
-
-    s += '\nactive proctype ' +procname +'(){\n'
-
-    s += '\t if\n'
-    for initial_state in graph.states.initial:
-        s += '\t :: goto ' +str(initial_state) +'\n'
-    s += '\t fi;\n'
-
-    ap_alphabet = graph.atomic_propositions
-    for state in graph.states():
-        out_transitions = graph.transitions.find(
-            {state}, as_dict=True
-        )
-
-        s += str(state).replace(' ', '_') +':'
-        s += trans2promela(out_transitions, graph,
-                           ap_alphabet)
-
-    s += '}\n'
-    return s
+    See Also
+    ========
+    L{stream.write_promela}, to write directly to a file
+    """
+    s = StringIO()
+    stream.write_promela(graph, s, procname)
+    return s.getvalue()
 
 #def mealy2promela():
 #    """Convert Mealy machine to Promela str.
@@ -36,10 +36,13 @@ Export html containing d3.js animating SVG
 # but it is not sufficiently developed yet,
 # so here the wheel is partially re-invented
 
+import codecs
+import io
 import os
 import inspect
+import shutil
 
-from networkx.readwrite import json_graph
+from tulip.transys.export import stream
 
 def _format_label(label_def, label_dot_format):
     """Format state/edge labels, which pop-up on mouse hover.
@@ -56,7 +59,7 @@ def _format_label(label_def, label_dot_format):
 
     return s
 
-def labeled_digraph2d3(graph, html_file_name='index.html'):
+def labeled_digraph2d3(graph, html_file_name='index.html', max_label=None):
     """Export to SVG embedded in HTML, animated with d3.js
 
     Example
@@ -73,17 +76,25 @@ def labeled_digraph2d3(graph, html_file_name='index.html'):
     ========
     FSM, BA, Mealy
 
+    The graph is streamed into the page by
+    L{stream.write_d3_json}.
+
     @param graph: labeled graph to export
     @type graph: L{LabeledDiGraph}
+
+    @param max_label: truncate node and edge annotations
+        to this many characters
+    @type max_label: C{int} or C{None} (no truncation)
     """
     file_path = inspect.getfile(inspect.currentframe())
     dir_path = os.path.dirname(os.path.abspath(file_path) )
 
     d3_file_name = os.path.join(dir_path, 'd3.v3.min.js')
-    d3_file = open(d3_file_name)
-    d3_js = d3_file.read()
+    # accepts both `str` and `unicode` in Python 2
+    html_file = codecs.open(html_file_name, 'w', encoding='utf-8')
+    write = html_file.write
 
-    s = """
+    write("""
     <!DOCTYPE html>
     <meta charset="utf-8">
     <style>
@@ -106,13 +117,14 @@ def labeled_digraph2d3(graph, html_file_name='index.html'):
     </style>
 
     <script>
-    """
+    """)
 
     # embed d3.js to create single .html,
     # instead of bunch of files
-    s += d3_js
+    with io.open(d3_file_name, encoding='utf-8') as d3_file:
+        shutil.copyfileobj(d3_file, html_file)
 
-    s += """
+    s = """
     </script>
     <body>
 
@@ -146,15 +158,10 @@ def labeled_digraph2d3(graph, html_file_name='index.html'):
     var graph = """
 
     # embed to avoid browser local file-loading restrictions
-    try:
-        s += json_graph.dumps(graph)
-    except:
-        # better error msg for numpy array
-        import json
-        data = json_graph.node_link_data(graph)
-        s += json.dumps(data, default=lambda x: str(x) )
+    write(s)
+    stream.write_d3_json(graph, html_file, max_label=max_label)
 
-    s += ';'
+    s = ';'
 
     s += """
     function draw(graph){
@@ -244,6 +251,6 @@ def labeled_digraph2d3(graph, html_file_name='index.html'):
     </body>
     """
 
-    html_file = open(html_file_name, 'w')
-    html_file.write(s)
+    write(s)
+    html_file.close()
     return True
@@ -0,0 +1,297 @@
+# Copyright (c) 2017 by California Institute of Technology
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the California Institute of Technology nor
+#    the names of its contributors may be used to endorse or promote
+#    products derived from this software without specific prior
+#    written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL CALTECH
+# OR THE CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF
+# USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+# OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+"""Streaming export of labeled graphs to DOT, d3 JSON and Promela.
+
+The writers in this module emit each node and edge as soon as it is
+read from the graph iterators, so memory use does not grow with the
+size of the output. They do not depend on C{pydot}.
+
+All writers accept either an open file handle or a file path.
+Paths ending in C{'.gz'} are compressed with C{gzip},
+unless C{compress} is passed explicitly.
+"""
+from __future__ import print_function
+
+import codecs
+from collections import Iterable
+from contextlib import contextmanager
+import gzip
+import json
+from time import strftime
+
+
+def write_dot(graph, f, max_label=None, rankdir='TB', compress=None):
+    """Write graph in DOT format.
+
+    Each state is written as a node with an integer identifier,
+    labeled by the state and its annotations.
+    Initial states get an incoming edge from a phantom node.
+    Unlike L{graph2dot.save_dot}, no layout program is called.
+
+    @type graph: L{LabeledDiGraph}
+
+    @param f: file handle or path
+    @param max_label: truncate each label to this many characters
+    @type max_label: C{int} or C{None} (no truncation)
+
+    @param rankdir: direction for dot layout
+    @type rankdir: str = 'TB' | 'LR'
+
+    @param compress: write gzip, default: if C{f} ends with C{'.gz'}
+    @type compress: C{bool} or C{None}
+    """
+    shape = getattr(graph, 'dot_node_shape', dict(normal='circle'))
+    normal = shape['normal']
+    accept = shape.get('accepting', normal)
+    style = '"rounded"' if normal == 'rectangle' else '""'
+    accepting = getattr(graph.states, 'accepting', ())
+    initial = graph.states.initial
+    state_fmt = getattr(graph, '_state_dot_label_format', dict())
+    edge_fmt = getattr(graph, '_transition_dot_label_format', dict())
+    edge_mask = getattr(graph, '_transition_dot_mask', dict())
+    ids = dict()
+    with _open(f, compress) as out:
+        write = out.write
+        write('digraph {name} {{\n'.format(
+            name=_dot_quote(graph.name or 'G')))
+        write('\toverlap=false;\n\tsplines=true;\n'
+              '\tnodesep=0.5;\n\tranksep=0.1;\n')
+        write('\trankdir={r};\n'.format(r=rankdir))
+        for i, (u, d) in enumerate(graph.nodes_iter(data=True)):
+            ids[u] = i
+            label = _truncate(
+                _state_label(graph, u, d, state_fmt, '\n'), max_label)
+            write(
+                '\t{i} [label={label}, shape={shape}, style={style}, '
+                'color={color}];\n'.format(
+                    i=i, label=_dot_quote(label),
+                    shape=accept if u in accepting else normal,
+                    style=style,
+                    color=_dot_quote(d.get('color', 'black'))))
+            if u in initial:
+                write(
+                    '\tphantominit{i} [label="", shape=none, width=0];\n'
+                    '\tphantominit{i} -> {i};\n'.format(i=i))
+        for u, v, d in graph.edges_iter(data=True):
+            label = _truncate(
+                _edge_label(graph, d, edge_fmt, edge_mask, '\n'), max_label)
+            write('\t{u} -> {v} [label={label}, color={color}];\n'.format(
+                u=ids[u], v=ids[v], label=_dot_quote(label),
+                color=_dot_quote(d.get('color', 'black'))))
+        write('}\n')
+
+
+def write_d3_json(graph, f, max_label=None, compress=None):
+    """Write graph as node-link JSON, as loaded by d3.js.
+
+    The format is that of C{networkx.readwrite.json_graph.node_link_data}:
+    edges refer to nodes by their index in C{"nodes"}.
+    Node identifiers and all annotations are converted to strings.
+
+    @type graph: L{LabeledDiGraph}
+
+    @param f: file handle or path
+    @param max_label: truncate each string to this many characters
+    @type max_label: C{int} or C{None} (no truncation)
+
+    @param compress: write gzip, default: if C{f} ends with C{'.gz'}
+    @type compress: C{bool} or C{None}
+    """
+    ids = dict()
+    with _open(f, compress) as out:
+        write = out.write
+        write('{"directed": true, "multigraph": true, ')
+        write('"graph": {{"name": {name}}}, '.format(
+            name=json.dumps(graph.name or '')))
+        write('"nodes": [')
+        sep = '\n'
+        for i, (u, d) in enumerate(graph.nodes_iter(data=True)):
+            ids[u] = i
+            node = {k: _truncate(_format_value(v), max_label)
+                    for k, v in d.items()}
+            node['id'] = _truncate(str(u), max_label)
+            write(sep)
+            write(json.dumps(node, sort_keys=True))
+            sep = ',\n'
+        write('],\n"links": [')
+        sep = '\n'
+        for u, v, key, d in graph.edges_iter(data=True, keys=True):
+            link = {k: _truncate(_format_value(x), max_label)
+                    for k, x in d.items()}
+            link.update(source=ids[u], target=ids[v], key=key)
+            write(sep)
+            write(json.dumps(link, sort_keys=True, default=str))
+            sep = ',\n'
+        write(']}')
+
+
+def write_promela(graph, f, procname=None, max_label=None, compress=None):
+    """Write (possibly labeled) state graph as a Promela process.
+
+    Streaming version of L{graph2promela.fts2promela},
+    which describes the generated code.
+
+    @type graph: L{FTS}
+
+    @param f: file handle or path
+    @param procname: Promela process name (after proctype)
+    @type procname: str (default: system name)
+
+    @param max_label: truncate the transition labels printed
+        at each step to this many characters
+    @type max_label: C{int} or C{None} (no truncation)
+
+    @param compress: write gzip, default: if C{f} ends with C{'.gz'}
+    @type compress: C{bool} or C{None}
+    """
+    if procname is None:
+        procname = graph.name
+    aps = [p for p in getattr(graph, 'atomic_propositions', ())
+           if p not in {None, True}]
+    # cache the assignments to bits per state
+    bits = dict()
+
+    def assignments(state):
+        s = bits.get(state)
+        if s is not None:
+            return s
+        label = graph.node[state].get('ap', ())
+        s = ''.join(
+            '\t\t {p} = {b};\n'.format(p=p, b=int(p in label))
+            for p in aps)
+        s += '\t\t printf("State: {u}\\n");\n\t\n'.format(u=state)
+        bits[state] = s
+        return s
+
+    with _open(f, compress) as out:
+        write = out.write
+        write('/*\n * Promela file generated with TuLiP\n')
+        write(' * Date: {d}\n */\n\n'.format(d=strftime('%x %X %z')))
+        for p in aps:
+            # convention "!" means negation
+            write('bool {p};\n'.format(p=p))
+        write('\nactive proctype {name}(){{\n'.format(name=procname))
+        write('\t if\n')
+        for u in graph.states.initial:
+            write('\t :: goto {u}\n'.format(u=_promela_label(u)))
+        write('\t fi;\n')
+        for u in graph.nodes_iter():
+            write(_promela_label(u) + ':\t if\n')
+            for _, v, d in graph.edges_iter(u, data=True):
+                write('\t :: atomic{\n')
+                write('\t\t printf("{s}\\n");\n'.format(
+                    s=_truncate(str(d), max_label).replace('"', "'")))
+                write(assignments(v))
+                write('\t\t goto {v}\n'.format(v=_promela_label(v)))
+                write('\t }\n')
+            write('\t fi;\n\n')
+        write('}\n')
+
+
+@contextmanager
+def _open(f, compress=None):
+    """Yield writable text stream for file handle or path.
+
+    File handles are left open.
+    """
+    if hasattr(f, 'write'):
+        yield f
+        return
+    if compress is None:
+        compress = f.endswith('.gz')
+    # codecs writers accept both `str` and `unicode` in Python 2
+    if compress:
+        out = codecs.getwriter('utf-8')(gzip.open(f, 'wb'))
+    else:
+        out = codecs.open(f, 'w', encoding='utf-8')
+    try:
+        yield out
+    finally:
+        out.close()
+
+
+def _truncate(s, n):
+    """Return C{s} cut to C{n} characters, marking the cut by '...'."""
+    if n is None or len(s) <= n:
+        return s
+    if n <= 3:
+        return s[:n]
+    return s[:n - 3] + '...'
+
+
+def _format_value(value):
+    """Return str, with iterables in set notation: {...}."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, Iterable):
+        return '{' + ', '.join(str(x) for x in value) + '}'
+    return str(value)
+
+
+def _state_label(graph, state, data, label_format, newline):
+    """Return label of C{state}, with annotations on separate lines."""
+    label_def = getattr(graph, '_state_label_def', data)
+    kv_sep = label_format.get('type?label', ':')
+    lines = [str(state)]
+    for label_type, label_value in data.items():
+        if label_type not in label_def:
+            continue
+        name = label_format.get(label_type, label_type)
+        lines.append(name + kv_sep + _format_value(label_value))
+    return newline.join(lines)
+
+
+def _edge_label(graph, data, label_format, label_mask, newline):
+    """Return label of edge, skipping masked annotations."""
+    label_def = getattr(graph, '_transition_label_def', data)
+    kv_sep = label_format.get('type?label', ':')
+    lines = list()
+    for label_type, label_value in data.items():
+        if label_type not in label_def:
+            continue
+        if label_type in label_mask:
+            if not label_mask[label_type](label_value):
+                continue
+        name = label_format.get(label_type, label_type)
+        lines.append(name + kv_sep + _format_value(label_value))
+    return newline.join(lines)
+
+
+def _dot_quote(s):
+    """Return C{s} as a DOT double-quoted string."""
+    s = str(s).replace('\\', '\\\\').replace('"', '\\"')
+    return '"' + s.replace('\n', '\\n') + '"'
+
+
+def _promela_label(state):
+    """Return Promela label for C{state}."""
+    return str(state).replace(' ', '_')
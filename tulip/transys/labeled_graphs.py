@@ -148,7 +148,7 @@ class States(object):
 
     @initial.setter
     def initial(self, states):
-        s = SubSet(self)
+        s = SubSet(self, hashable=True)
         s |= states
         self._initial = s
 
@@ -453,6 +453,10 @@ class Transitions(object):
         self.graph.add_edges_from(transitions, attr_dict=attr_dict,
                                   check=check, **attr)
 
+    def add_new_from(self, transitions, check=True):
+        """Wrapper of L{LabeledDiGraph.add_new_edges_from}."""
+        self.graph.add_new_edges_from(transitions, check=check)
+
     def add_comb(self, from_states, to_states, attr_dict=None,
                  check=True, **attr):
         """Add an edge for each combination C{(u, v)},
@@ -835,12 +839,13 @@ class LabeledDiGraph(nx.MultiDiGraph):
 
     def _check_for_untyped_keys(self, typed_attr, type_defs, check):
         untyped_keys = set(typed_attr).difference(type_defs)
-        msg = (
-            'checking for untyped keys...\n' +
-            'attribute dict: ' + str(typed_attr) + '\n' +
-            'type definitions: ' + str(type_defs) + '\n' +
-            'untyped_keys: ' + str(untyped_keys))
-        logger.debug(msg)
+        if logger.isEnabledFor(logging.DEBUG):
+            msg = (
+                'checking for untyped keys...\n' +
+                'attribute dict: ' + str(typed_attr) + '\n' +
+                'type definitions: ' + str(type_defs) + '\n' +
+                'untyped_keys: ' + str(untyped_keys))
+            logger.debug(msg)
         if untyped_keys:
             msg = (
                 'The following edge attributes:\n' +
@@ -974,12 +979,7 @@ class LabeledDiGraph(nx.MultiDiGraph):
         if v not in self.succ:
             raise ValueError('Graph does not have node v: ' + str(v))
         attr_dict = self._update_attr_dict_with_attr(attr_dict, attr)
-        # define typed dict
-        typed_attr = TypedDict()
-        typed_attr.set_types(self._edge_label_types)
-        typed_attr.update(copy.deepcopy(self._edge_label_defaults))
-        # type checking happens here
-        typed_attr.update(attr_dict)
+        typed_attr = self._typed_edge_attr(attr_dict)
         logger.debug('Given: attr_dict = ' + str(attr_dict))
         logger.debug('Stored in: typed_attr = ' + str(typed_attr))
         # may be possible to speedup using .succ
@@ -1029,6 +1029,67 @@ class LabeledDiGraph(nx.MultiDiGraph):
             self.succ[u][v] = keydict
             self.pred[v][u] = keydict
 
+    def _typed_edge_attr(self, attr_dict):
+        """Return L{TypedDict} with defaults updated by C{attr_dict}.
+
+        Raise C{ValueError} if C{attr_dict} contains
+        typed key with invalid value.
+        """
+        typed_attr = TypedDict()
+        typed_attr.set_types(self._edge_label_types)
+        typed_attr.update(copy.deepcopy(self._edge_label_defaults))
+        # type checking happens here
+        typed_attr.update(attr_dict)
+        return typed_attr
+
+    def add_new_edges_from(self, labeled_ebunch, check=True):
+        """Add labeled edges between nodes not yet connected.
+
+        Faster than L{add_edges_from} for large graphs,
+        for example when converting strategies to machines:
+
+          - each distinct label C{dict} object is type checked once,
+            so pass the same object for edges with the same label
+          - existing edges are not searched for duplicate labels,
+            because there are none.
+
+        The edges get distinct L{TypedDict} objects,
+        but the label values are shared among them.
+
+        @param labeled_ebunch: iterable of 3-tuples C{(u, v, label)},
+            where C{label} is a C{dict}.
+            Each pair C{(u, v)} must appear at most once.
+
+        @param check: raise C{AttributeError} if a label
+            has untyped attribute keys, otherwise warn
+
+        Raise C{ValueError} if C{u} or C{v} are not already nodes,
+        or if C{G} already has an edge from C{u} to C{v}.
+        """
+        types = self._edge_label_types
+        # id -> (label, typed label), the label is kept
+        # so that its id is not reused while adding
+        typed = dict()
+        for u, v, label in labeled_ebunch:
+            succ = self.succ.get(u)
+            if succ is None:
+                raise ValueError('Graph does not have node u: ' + str(u))
+            if v not in self.succ:
+                raise ValueError('Graph does not have node v: ' + str(v))
+            if v in succ:
+                raise ValueError(
+                    'Graph already has edges from: ' + str(u) +
+                    ' to: ' + str(v))
+            i = id(label)
+            if i not in typed:
+                typed_attr = self._typed_edge_attr(label)
+                self._check_for_untyped_keys(typed_attr, types, check)
+                typed[i] = (label, typed_attr)
+            _, typed_attr = typed[i]
+            keydict = {0: typed_attr.copy()}
+            succ[v] = keydict
+            self.pred[v][u] = keydict
+
     def add_edges_from(self, labeled_ebunch, attr_dict=None,
                        check=True, **attr):
         """Add multiple labeled edges.
@@ -1130,17 +1191,61 @@ class LabeledDiGraph(nx.MultiDiGraph):
         return False
 
     def remove_deadends(self):
-        """Recursively delete nodes with no outgoing transitions."""
+        """Recursively delete nodes with no outgoing transitions.
+
+        Single pass over a worklist of nodes that have
+        no remaining successors, in O(V + E).
+        Each node keeps a count of its distinct successors
+        that have not been removed. Removing a node decrements
+        the counts of its predecessors, and predecessors with
+        count zero become dead ends in turn.
+
+        The dead ends are removed in bulk from the adjacency
+        dictionaries and from each L{SubSet} of the states
+        (e.g., initial and accepting states), without calling
+        C{remove_node} per node.
+
+        @return: number of nodes removed
+        @rtype: C{int}
+        """
         n = len(self)
-        s = {1}
-        while s:
-            s = {n for n in self if not self.succ[n]}
-            self.states.remove_from(s)
+        succ = self.succ
+        pred = self.pred
+        count = {u: len(nbrs) for u, nbrs in succ.items()}
+        stack = [u for u, c in count.items() if c == 0]
+        dead = set(stack)
+        while stack:
+            v = stack.pop()
+            for u in pred[v]:
+                if u in dead:
+                    continue
+                count[u] -= 1
+                if count[u] == 0:
+                    dead.add(u)
+                    stack.append(u)
+        # successors of dead nodes are dead,
+        # so only edges from live predecessors need cleanup
+        for v in dead:
+            for u in pred[v]:
+                if u not in dead:
+                    del succ[u][v]
+        for v in dead:
+            del succ[v]
+            del pred[v]
+            del self.node[v]
+        subsets = {
+            id(s): s for s in vars(self.states).values()
+            if isinstance(s, SubSet)}
+        for s in subsets.values():
+            for v in dead.intersection(s):
+                s.remove(v)
+        r = len(dead)
         m = len(self)
         assert n == 0 or m > 0, 'removed all {n} nodes!'.format(n=n)
-        assert n >= 0, 'added {n} nodes'.format(n=n)
-        print('removed {r} nodes from '
-              '{n} total'.format(r=n - m, n=n))
+        assert m == n - r, (m, n, r)
+        logger.info('removed {r} nodes from '
+                    '{n} total'.format(r=r, n=n))
+        return r
 
     def dot_str(self, wrap=10, **kwargs):
         """Return dot string.
@@ -1183,7 +1288,7 @@ class LabeledDiGraph(nx.MultiDiGraph):
 
         See Also
         ========
-        L{plot}, C{pydot.Dot.write}
+        L{plot}, L{write}, C{pydot.Dot.write}
 
         @param filename: file path to save image to
             Default is C{self.name}, unless C{name} is empty,
@@ -1244,6 +1349,56 @@ class LabeledDiGraph(nx.MultiDiGraph):
                            prog, wrap, tikz=tikz)
         return True
 
+    def write(self, f, fileformat=None, max_label=None, compress=None):
+        """Stream graph to file, without building it in memory.
+
+        Unlike L{save}, this method does not require C{pydot}
+        and does not call a layout program.
+
+        Available formats:
+
+            - dot
+            - json (node-link format for d3.js)
+            - pml (Promela)
+
+        See Also
+        ========
+        L{save}, L{tulip.transys.export.stream}
+
+        @param f: file handle or path.
+            If C{f} is a path ending in C{'.gz'},
+            then the output is compressed with gzip.
+
+        @param fileformat: default is the extension of C{f}
+            (before any C{'.gz'})
+        @type fileformat: 'dot' | 'json' | 'pml'
+
+        @param max_label: truncate labels to this many characters
+        @type max_label: C{int} or C{None} (no truncation)
+
+        @param compress: write gzip, default: if C{f} ends with C{'.gz'}
+        @type compress: C{bool} or C{None}
+        """
+        from tulip.transys.export import stream
+        if fileformat is None:
+            if hasattr(f, 'write'):
+                raise ValueError(
+                    'fileformat needed when writing to file handle')
+            fname, ext = os.path.splitext(f)
+            if ext == '.gz':
+                fname, ext = os.path.splitext(fname)
+            fileformat = ext[1:]
+        kw = dict(max_label=max_label, compress=compress)
+        if fileformat == 'dot':
+            stream.write_dot(self, f, **kw)
+        elif fileformat == 'json':
+            stream.write_d3_json(self, f, **kw)
+        elif fileformat in {'promela', 'Promela', 'pml'}:
+            stream.write_promela(self, f, self.name, **kw)
+        else:
+            raise ValueError(
+                'Unknown fileformat: {f}'.format(f=fileformat))
+
     def plot(self, rankdir='LR', prog=None, wrap=10, ax=None):
         """Plot image using dot.
 
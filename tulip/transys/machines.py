@@ -34,8 +34,12 @@ from __future__ import absolute_import
 from __future__ import print_function
 
 import copy
+import logging
 from pprint import pformat
 from random import choice
+
+import numpy as np
+
 from tulip.transys.labeled_graphs import LabeledDiGraph
 # inline imports:
 #
@@ -43,6 +47,7 @@ from tulip.transys.labeled_graphs import LabeledDiGraph
 # from tulip.transys.export import machine2scxml
 
 
+logger = logging.getLogger(__name__)
 _hl = 40 * '-'
 # port type
 pure = {'present', 'absent'}
@@ -573,6 +578,13 @@ class MealyMachine(Transducer):
         """
         return self.reaction(from_state, inputs, lazy=True)
 
+    def compile(self):
+        """Return executor of this machine, see L{CompiledMealy}.
+
+        @rtype: L{CompiledMealy}
+        """
+        return CompiledMealy(self)
+
     def run(self, from_state=None, input_sequences=None):
         """Guided or interactive run.
 
@@ -588,13 +600,210 @@ class MealyMachine(Transducer):
                               input_sequences=input_sequences)
 
 
+class CompiledMealy(object):
+    """Executor of an input-deterministic Mealy machine.
+
+    Each state is replaced by an integer identifier,
+    and the transitions from each state by a C{dict} that maps
+    tuples of input values to a pair of
+    next state identifier and tuple of output values.
+    So a reaction is a lookup in a hash table,
+    instead of a scan of the edges as in L{MealyMachine.reaction}.
+
+    The values in tuples are ordered as the port names in
+    C{self.input_ports} and C{self.output_ports} (sorted).
+    Use L{encode_inputs} and L{decode_outputs} to convert
+    from and to C{dict}, and C{self.states} and
+    C{self.state_ids} to convert states.
+
+    Changes to the machine after compiling it
+    are not reflected in the executor.
+
+    Example:
+
+      >>> c = mealy.compile()
+      >>> s = c.state_ids['Sinit']
+      >>> s, y = c.step(s, c.encode_inputs(dict(x=1)))
+      >>> c.decode_outputs(y)
+
+    @param mealy: input-deterministic machine
+    @type mealy: L{MealyMachine}
+    """
+
+    def __init__(self, mealy):
+        self.inputs = dict(mealy.inputs)
+        self.outputs = dict(mealy.outputs)
+        self.input_ports = tuple(sorted(self.inputs))
+        self.output_ports = tuple(sorted(self.outputs))
+        self.states = list(mealy.states)
+        self.state_ids = {u: i for i, u in enumerate(self.states)}
+        self.initial = [self.state_ids[u] for u in mealy.states.initial]
+        self._table = [dict() for u in self.states]
+        self._arrays = None
+        ids = self.state_ids
+        for u, v, d in mealy.edges_iter(data=True):
+            try:
+                x = tuple(d[k] for k in self.input_ports)
+            except KeyError:
+                raise ValueError(
+                    'transition ({u}, {v}) does not label '
+                    'all inputs: {d}'.format(u=u, v=v, d=d))
+            y = tuple(d.get(k) for k in self.output_ports)
+            r = (ids[v], y)
+            table = self._table[ids[u]]
+            if table.setdefault(x, r) != r:
+                raise ValueError(
+                    'must be input-deterministic, found two '
+                    'transitions from {u} with inputs {x}'.format(
+                        u=u, x=dict(zip(self.input_ports, x))))
+
+    def __len__(self):
+        """Return number of transitions."""
+        return sum(len(t) for t in self._table)
+
+    def step(self, state, inputs):
+        """Return next state and outputs.
+
+        @param state: state identifier
+        @type state: C{int}
+        @param inputs: input values, ordered as C{self.input_ports}
+        @type inputs: C{tuple}
+        @return: C{(next_state, outputs)}, where C{outputs}
+            is ordered as C{self.output_ports}
+        @rtype: C{(int, tuple)}
+        """
+        try:
+            return self._table[state][inputs]
+        except KeyError:
+            raise ValueError(self._invalid_input(state, inputs))
+
+    def step_batch(self, state, inputs):
+        """Return states and outputs of run that reacts to C{inputs}.
+
+        @param state: identifier of initial state
+        @type state: C{int}
+        @param inputs: input tuples, one for each step
+        @type inputs: iterable of C{tuple}
+        @return: C{(states, outputs)}: C{list} of state identifiers
+            excluding C{state}, and C{list} of output tuples
+        @rtype: C{(list, list)}
+        """
+        table = self._table
+        states = list()
+        outputs = list()
+        add_state = states.append
+        add_output = outputs.append
+        for x in inputs:
+            try:
+                state, y = table[state][x]
+            except KeyError:
+                raise ValueError(self._invalid_input(state, x))
+            add_state(state)
+            add_output(y)
+        return states, outputs
+
+    def run(self, from_state=None, input_sequences=None):
+        """Return the same as L{guided_run}, using L{step_batch}.
+
+        @param from_state: state of the machine
+            (not identifier). If C{None}, then use
+            the unique initial state.
+        @param input_sequences: one sequence of values for each input
+        @type input_sequences: C{dict} of C{list}
+        """
+        if from_state is None:
+            state = self.initial[0]
+        else:
+            state = self.state_ids[from_state]
+        seqs = [input_sequences[k] for k in self.input_ports]
+        ids, outputs = self.step_batch(state, zip(*seqs))
+        states = self.states
+        output_seqs = {
+            k: [y[i] for y in outputs]
+            for i, k in enumerate(self.output_ports)}
+        return [states[i] for i in ids], output_seqs
+
+    def encode_inputs(self, inputs):
+        """Return C{tuple} of values in C{dict} C{inputs}."""
+        return tuple(inputs[k] for k in self.input_ports)
+
+    def decode_outputs(self, outputs):
+        """Return C{dict} of values in C{tuple} C{outputs}."""
+        return dict(zip(self.output_ports, outputs))
+
+    def _dense(self):
+        """Return the transitions as arrays, for L{batch_guided_run}.
+
+        The tuple of inputs is encoded by an integer in
+        mixed radix, with one digit for each input port:
+        the index of the value among the values of that port
+        that appear in transitions.
+
+        @return: C{dict} with keys:
+            - C{'values'}: C{list} of arrays of sorted values,
+              one for each input port
+            - C{'weights'}: C{list} of weights of digits
+            - C{'next'}: array of next state, indexed by state
+              and input code (C{-1} if no transition)
+            - C{'output'}: array of index in C{'outputs'},
+              indexed as C{'next'}
+            - C{'outputs'}: array of output tuples, as rows
+        """
+        if self._arrays is not None:
+            return self._arrays
+        n = len(self.input_ports)
+        values = [
+            sorted({x[j] for t in self._table for x in t})
+            for j in range(n)]
+        weights = list()
+        size = 1
+        for v in reversed(values):
+            weights.append(size)
+            size *= len(v)
+        weights.reverse()
+        index = [{x: i for i, x in enumerate(v)} for v in values]
+        outputs = dict()
+        nxt = np.full((len(self.states), size), -1, dtype=int)
+        out = np.full((len(self.states), size), -1, dtype=int)
+        for u, t in enumerate(self._table):
+            for x, (v, y) in t.items():
+                code = sum(
+                    index[j][x[j]] * weights[j] for j in range(n))
+                nxt[u, code] = v
+                out[u, code] = outputs.setdefault(y, len(outputs))
+        rows = sorted(outputs, key=outputs.get)
+        self._arrays = dict(
+            values=[np.array(v) for v in values],
+            weights=weights,
+            next=nxt,
+            output=out,
+            outputs=np.array(rows).reshape(
+                len(rows), len(self.output_ports)))
+        return self._arrays
+
+    def _invalid_input(self, state, inputs):
+        table = self._table[state]
+        if not table:
+            return (
+                'state {u} is a dead-end. There are no possible '
+                'inputs from it.').format(u=self.states[state])
+        # arbitrary number of suggestions, as `MealyMachine.reaction`
+        some = [dict(zip(self.input_ports, x)) for x in table][:5]
+        return (
+            'not a valid input {x} at state {u}, '
+            'some possible inputs include: {t}').format(
+                x=inputs, u=self.states[state], t=some)
+
+
 def guided_run(mealy, from_state=None, input_sequences=None):
     """Run deterministic machine reacting to given inputs.
 
     @param from_state: start simulation
 
-    @param mealy: input-deterministic Mealy machine
-    @type mealy: L{MealyMachine}
+    @param mealy: input-deterministic Mealy machine,
+        or its executor, which reacts faster
+        (see L{MealyMachine.compile})
+    @type mealy: L{MealyMachine} or L{CompiledMealy}
 
     @param from_state: start simulation at this state.
         If C{None}, then use the unique initial state C{Sinit}.
@@ -619,6 +828,8 @@ def guided_run(mealy, from_state=None, input_sequences=None):
     # uniform list len ?
     if len(set(len(x) for x in seqs.values())) > 1:
         raise ValueError('All input sequences must be of equal length.')
+    if isinstance(mealy, CompiledMealy):
+        return mealy.run(from_state, seqs)
     # note: initial sys state non-determinism not checked
     # initial sys edge non-determinism checked instead (more restrictive)
     if from_state is None:
@@ -637,6 +848,156 @@ def guided_run(mealy, from_state=None, input_sequences=None):
     return (states_seq, output_seqs)
 
 
+def batch_guided_run(mealy, inputs, from_states=None,
+                     stop_at_dead_ends=False):
+    """Run many times a machine reacting to given inputs.
+
+    Vectorized counterpart of L{guided_run}:
+    all the runs advance together, by indexing arrays
+    of the transitions (see L{CompiledMealy}).
+
+    @param mealy: input-deterministic Mealy machine,
+        compiled if it is not
+    @type mealy: L{MealyMachine} or L{CompiledMealy}
+
+    @param inputs: input values of each run at each step,
+        with shape C{(K, T, n_inputs)}, where the last axis
+        is ordered as C{CompiledMealy.input_ports}
+    @type inputs: C{numpy.ndarray}
+
+    @param from_states: identifiers of the initial state of each run,
+        with shape C{(K,)}, or a single identifier for all runs.
+        If C{None}, then use the unique initial state.
+
+    @param stop_at_dead_ends: if C{True}, then a run that has
+        no transition for its inputs stops, otherwise
+        raise C{ValueError}.
+    @type stop_at_dead_ends: C{bool}
+
+    @return: C{(states, outputs)}, where:
+        - C{states}: state identifiers, with shape C{(K, T)},
+          and C{-1} after a run stops
+        - C{outputs}: output values, with shape
+          C{(K, T, n_outputs)}, unspecified after a run stops,
+          and the last axis ordered as C{CompiledMealy.output_ports}
+    @rtype: C{tuple} of C{numpy.ndarray}
+    """
+    c = _compiled(mealy)
+    d = c._dense()
+    inputs = np.asarray(inputs)
+    k, n, m = inputs.shape
+    if m != len(c.input_ports):
+        raise ValueError(
+            'expected {m} inputs {p}, got {n}'.format(
+                m=len(c.input_ports), p=c.input_ports, n=m))
+    # encode inputs, marking values that no transition has
+    codes = np.zeros((k, n), dtype=int)
+    valid = np.ones((k, n), dtype=bool)
+    for j, (values, w) in enumerate(zip(d['values'], d['weights'])):
+        x = inputs[:, :, j]
+        if not len(values):
+            valid[...] = False
+            continue
+        i = np.minimum(np.searchsorted(values, x), len(values) - 1)
+        valid &= (values[i] == x)
+        codes += i * w
+    state = _from_states(c, from_states, k)
+    states = np.full((k, n), -1, dtype=int)
+    out = np.zeros((k, n), dtype=int)
+    running = np.ones(k, dtype=bool)
+    for t in range(n):
+        u = np.maximum(state, 0)
+        x = codes[:, t]
+        state = np.where(
+            running & valid[:, t], d['next'][u, x], -1)
+        blocked = running & (state < 0)
+        if blocked.any():
+            if not stop_at_dead_ends:
+                r = np.flatnonzero(blocked)[0]
+                raise ValueError(
+                    'run {r} at step {t}: '.format(r=r, t=t) +
+                    c._invalid_input(u[r], tuple(inputs[r, t])))
+            running &= ~blocked
+        states[:, t] = state
+        out[:, t] = d['output'][u, x]
+    return states, _output_values(c, d, out)
+
+
+def batch_random_run(mealy, K, T, from_states=None, seed=None):
+    """Return C{K} runs of C{T} random reactions.
+
+    Vectorized counterpart of L{random_run}, without printing.
+    At each step, each run takes a transition
+    chosen uniformly from those of its current state.
+    A run stops at a dead-end.
+
+    @param mealy: Mealy machine, compiled if it is not
+    @type mealy: L{MealyMachine} or L{CompiledMealy}
+
+    @param from_states: as for L{batch_guided_run}
+
+    @param seed: seed of C{numpy.random.RandomState}
+        (if C{None}, then use C{numpy.random})
+
+    @return: C{(states, inputs, outputs)}, as for
+        L{batch_guided_run}, where C{inputs} has
+        shape C{(K, T, n_inputs)}
+    @rtype: C{tuple} of C{numpy.ndarray}
+    """
+    c = _compiled(mealy)
+    d = c._dense()
+    rng = np.random if seed is None else np.random.RandomState(seed)
+    nxt = d['next']
+    # enabled input codes of each state, concatenated
+    enabled = nxt >= 0
+    degree = enabled.sum(axis=1)
+    offset = np.concatenate(([0], np.cumsum(degree)[:-1]))
+    _, inputs_of = np.nonzero(enabled)
+    state = _from_states(c, from_states, K)
+    states = np.full((K, T), -1, dtype=int)
+    codes = np.zeros((K, T), dtype=int)
+    out = np.zeros((K, T), dtype=int)
+    for t in range(T):
+        u = np.maximum(state, 0)
+        running = (state >= 0) & (degree[u] > 0)
+        i = (rng.random_sample(K) * degree[u]).astype(int)
+        x = inputs_of[np.minimum(offset[u] + i, len(inputs_of) - 1)]
+        state = np.where(running, nxt[u, x], -1)
+        states[:, t] = state
+        codes[:, t] = x
+        out[:, t] = d['output'][u, x]
+    # decode inputs from mixed radix
+    columns = [
+        values[(codes // w) % len(values)]
+        for values, w in zip(d['values'], d['weights'])]
+    if columns:
+        inputs = np.stack(columns, axis=-1)
+    else:
+        inputs = np.zeros((K, T, 0))
+    return states, inputs, _output_values(c, d, out)
+
+
+def _compiled(mealy):
+    if isinstance(mealy, CompiledMealy):
+        return mealy
+    return mealy.compile()
+
+
+def _from_states(c, from_states, k):
+    """Return array of C{k} initial state identifiers."""
+    if from_states is None:
+        from_states = c.initial[0]
+    return np.broadcast_to(from_states, (k,)).astype(int)
+
+
+def _output_values(c, d, out):
+    """Return output values for indices C{out} of output tuples."""
+    rows = d['outputs']
+    if not len(rows):
+        return np.zeros(out.shape + (len(c.output_ports),))
+    return rows[np.maximum(out, 0)]
+
+
 def random_run(mealy, from_state=None, N=10):
     """Return run from given state for N random inputs.
 
@@ -944,3 +1305,136 @@ def strip_ports(mealy, names):
         d = trim_dict(d, names)
         new.add_edge(u, v, **d)
     return new
+
+
+def minimize(mealy):
+    """Return machine with equivalent states of C{mealy} merged.
+
+    Only states reachable from the initial states are kept.
+    Two states are equivalent if, for each input, they react
+    with the same outputs and move to equivalent states,
+    so the I/O behavior from each initial state is preserved.
+
+    The states are partitioned by their enabled pairs of
+    input and output values, then the partition is refined
+    with respect to predecessors of blocks, as by Hopcroft's
+    algorithm, in time O(m log n) for n states and m transitions.
+    Each block is represented by one of its states,
+    an initial state if it contains one,
+    so the initial states keep their names.
+
+    Reference
+    =========
+    Valmari A., Lehtinen P.:
+    Efficient minimization of DFAs with partial transition functions,
+    STACS 2008
+
+    @param mealy: machine with at most one transition from each
+        state for each pair of input and output values
+    @type mealy: L{MealyMachine}
+    @rtype: L{MealyMachine}
+    """
+    input_ports = sorted(mealy.inputs)
+    output_ports = sorted(mealy.outputs)
+    # reachable states, in order of iteration over `mealy`
+    reached = set(mealy.states.initial)
+    stack = list(reached)
+    while stack:
+        u = stack.pop()
+        for v in mealy.successors_iter(u):
+            if v not in reached:
+                reached.add(v)
+                stack.append(v)
+    states = [u for u in mealy if u in reached]
+    ids = {u: i for i, u in enumerate(states)}
+    n = len(states)
+    # label of transition: values of inputs and outputs
+    labels = dict()
+    inv = [list() for u in states]
+    enabled = [list() for u in states]
+    for u in states:
+        i = ids[u]
+        for _, v, d in mealy.edges_iter(u, data=True):
+            x = tuple(d.get(k) for k in input_ports)
+            y = tuple(d.get(k) for k in output_ports)
+            a = labels.setdefault((x, y), len(labels))
+            enabled[i].append(a)
+            inv[ids[v]].append((a, i))
+        if len(set(enabled[i])) < len(enabled[i]):
+            raise ValueError((
+                'state {u} has several transitions with '
+                'the same input and output values').format(u=u))
+    # initial partition, by enabled labels
+    block = [0] * n
+    blocks = list()
+    index = dict()
+    for i in range(n):
+        key = frozenset(enabled[i])
+        b = index.get(key)
+        if b is None:
+            b = len(blocks)
+            index[key] = b
+            blocks.append(set())
+        block[i] = b
+        blocks[b].add(i)
+    # the partition is stable w.r.t. all states,
+    # so stable w.r.t. the largest block, given the others
+    largest = None
+    if blocks:
+        largest = max(range(len(blocks)), key=lambda b: len(blocks[b]))
+    waiting = [b for b in range(len(blocks)) if b != largest]
+    in_waiting = [b != largest for b in range(len(blocks))]
+    while waiting:
+        b = waiting.pop()
+        in_waiting[b] = False
+        # predecessors of `b`, grouped by label
+        pre = dict()
+        for j in blocks[b]:
+            for a, i in inv[j]:
+                pre.setdefault(a, list()).append(i)
+        for a, sources in pre.items():
+            touched = dict()
+            for i in sources:
+                touched.setdefault(block[i], list()).append(i)
+            for c, split in touched.items():
+                if len(split) == len(blocks[c]):
+                    continue
+                new = len(blocks)
+                blocks.append(set(split))
+                blocks[c].difference_update(split)
+                for i in split:
+                    block[i] = new
+                if in_waiting[c]:
+                    waiting.append(new)
+                    in_waiting.append(True)
+                elif len(split) <= len(blocks[c]):
+                    waiting.append(new)
+                    in_waiting.append(True)
+                else:
+                    waiting.append(c)
+                    in_waiting[c] = True
+                    in_waiting.append(False)
+    # representative of each block
+    rep = [None] * len(blocks)
+    for u in mealy.states.initial:
+        b = block[ids[u]]
+        if rep[b] is None:
+            rep[b] = u
+    for u in states:
+        b = block[ids[u]]
+        if rep[b] is None:
+            rep[b] = u
+    new = MealyMachine()
+    new.add_inputs(mealy.inputs)
+    new.add_outputs(mealy.outputs)
+    new.add_nodes_from(rep)
+    new.states.initial.add_from(
+        rep[block[ids[u]]] for u in mealy.states.initial)
+    for u in rep:
+        for _, v, d in mealy.edges_iter(u, data=True):
+            new.add_edge(u, rep[block[ids[v]]], **d)
+    logger.info((
+        'minimized Mealy machine from {n} to {m} states '
+        '(ratio {r:.3f})').format(
+            n=len(mealy), m=len(new), r=len(new) / float(max(len(mealy), 1))))
+    return new
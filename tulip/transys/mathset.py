@@ -108,7 +108,7 @@ class MathSet(object):
     L{SubSet}, L{PowerSet}, set
     """
 
-    def __init__(self, iterable=[]):
+    def __init__(self, iterable=[], hashable=False):
         """Initialize by adding elements from iterable.
 
         Example
@@ -118,7 +118,13 @@ class MathSet(object):
         @param iterable: iterable from which to initialize the set S
             which underlies the PowerSet 2^S
         @type iterable: iterable, any element types allowed
+
+        @param hashable: if C{True}, then only hashable elements
+            are allowed, and the set behaves like a Python C{set}.
+            Adding unhashable elements raises C{TypeError}.
+        @type hashable: C{bool}
         """
+        self._hashable = hashable
         self._delete_all()
         self.add_from(iterable)
 
@@ -142,7 +148,7 @@ class MathSet(object):
         @return: self | iterable
         @rtype: MathSet
         """
-        s = MathSet(self)
+        s = MathSet(self, hashable=self._hashable)
         s.add_from(other)
         return s
 
@@ -225,6 +231,11 @@ class MathSet(object):
         return (self._set == other._set) and same_lists
 
     def __contains__(self, item):
+        if self._hashable:
+            try:
+                return item in self._set
+            except TypeError:
+                return False
         if isinstance(item, Hashable):
             try:
                 return item in self._set
@@ -266,6 +277,9 @@ class MathSet(object):
         @type item: anything, if hashable it is stored in a Python set,
             otherwise stored in a list.
         """
+        if self._hashable:
+            self._set.add(item)
+            return
         if isinstance(item, Hashable):
             try:
                 self._set.add(item)
@@ -304,22 +318,42 @@ class MathSet(object):
                 'Can only add elements to MathSet from Iterable.\n'
                 'Got:\n\t' + str(iterable) + '\n instead.')
         if isinstance(iterable, MathSet):
-            self._set |= set(iterable._set)
-            self._list = list(unique(self._list + iterable._list))
+            self._set |= iterable._set
+            self._extend_list(iterable._list)
             return
         # speed up
-        if isinstance(iterable, set):
+        if isinstance(iterable, (set, frozenset)):
             self._set |= iterable
             return
-        # filter to optimize storage
+        if self._hashable:
+            self._set.update(iterable)
+            return
+        items = list(iterable)
+        # all hashable ?
         try:
-            self._set |= set(self._filter_hashables(iterable))
-            self._list = list(unique(
-                self._list + self._filter_unhashables(iterable)))
+            self._set.update(items)
             return
-        except:
-            # ...if contents of elements in iterable are mutable
-            self._list = list(unique(self._list + list(iterable)))
+        except TypeError:
+            pass
+        # filter to optimize storage
+        unhashables = list()
+        for item in items:
+            try:
+                self._set.add(item)
+            except TypeError:
+                # ...if contents of elements in iterable are mutable
+                unhashables.append(item)
+        self._extend_list(unhashables)
+
+    def _extend_list(self, items):
+        """Append those C{items} not already in C{self._list}."""
+        if self._hashable and items:
+            raise TypeError(
+                'unhashable elements in hashable MathSet:\n\t' +
+                str(items))
+        for item in items:
+            if item not in self._list:
+                self._list.append(item)
 
     def remove(self, item):
         """Remove existing element from mathematical set.
@@ -432,7 +466,7 @@ class SubSet(MathSet):
     L{MathSet}, L{PowerSet}
     """
 
-    def __init__(self, superset, iterable=None):
+    def __init__(self, superset, iterable=None, hashable=False):
         """Define the superset of this set.
 
         @param superset: This SubSet checked vs C{superset}
@@ -440,9 +474,11 @@ class SubSet(MathSet):
 
         @param iterable: elements to add to subset
         @type iterable: Iterable
+
+        @param hashable: see L{MathSet.__init__}
         """
         self._superset = superset
-        super(SubSet, self).__init__([])
+        super(SubSet, self).__init__([], hashable=hashable)
         if not isinstance(superset, Container):
             raise TypeError('superset must be Iterable,\n'
                             'Got instead:\n\t' + str(superset))
@@ -494,14 +530,32 @@ class SubSet(MathSet):
         arguably more efficient. So both .add and .add_from
         need to be extended here.
 
+        The superset relation is checked by membership
+        in C{self.superset}, one element at a time,
+        so it costs O(1) per element if the superset supports
+        constant time C{__contains__} (e.g., states of a graph).
+
         See Also
         ========
         L{add}, L{__ior__}
         """
-        if not is_subset(new_elements, self._superset):
-            raise Exception('All new_elements:\n\t' + str(new_elements) +
-                            '\nshould already be \\in ' +
-                            'self.superset = ' + str(self._superset))
+        if not isinstance(new_elements, Iterable):
+            raise TypeError(
+                'Can only add elements to SubSet from Iterable.\n'
+                'Got:\n\t' + str(new_elements) + '\n instead.')
+        if isinstance(new_elements, str):
+            raise TypeError(
+                'new_elements should not be a string, got: ' +
+                str(new_elements))
+        if not isinstance(new_elements, Container):
+            new_elements = list(new_elements)
+        superset = self._superset
+        for x in new_elements:
+            if x not in superset:
+                raise Exception(
+                    'All new_elements:\n\t' + str(new_elements) +
+                    '\nshould already be \\in ' +
+                    'self.superset = ' + str(superset))
         super(SubSet, self).add_from(new_elements)
 
 
@@ -693,8 +747,15 @@ class PowerSet(object):
         if not isinstance(item, Iterable):
             raise Exception('Not iterable:\n\t' + str(item) + ',\n'
                             'this is a powerset, so it contains (math) sets.')
-
-        return is_subset(item, self.math_set)
+        # fast path: check each element in the underlying Python set
+        math_set = self.math_set
+        if not math_set._list and not isinstance(item, str):
+            s = math_set._set
+            try:
+                return all(x in s for x in item)
+            except TypeError:
+                return False
+        return is_subset(item, math_set)
 
     def __iter__(self):
         return powerset(self.math_set)
@@ -788,6 +849,16 @@ class TypedDict(dict):
         for key in kwargs:
             self[key] = kwargs[key]
 
+    def copy(self):
+        """Return shallow copy with the same types.
+
+        The values are not checked again.
+        """
+        d = type(self).__new__(type(self))
+        dict.update(d, self)
+        d.allowed_values = self.allowed_values
+        return d
+
     def setdefault(self, key, value=None):
         if key not in self:
             self[key] = value
@@ -420,3 +420,189 @@ def ba_ts_sync_prod(buchi_automaton, transition_system):
         prod_ba.transitions.add(
             from_state, to_state, letter=transition_label_value)
     return prod_ba
+
+
+def find_accepting_run(ts, ba):
+    """Return an accepting run of TS * BA, exploring it on-the-fly.
+
+    The product is not constructed.
+    Its states are generated lazily from the successors
+    of C{ts} and the enabled transitions of C{ba},
+    and the search stops at the first accepting lasso found.
+    Product states and transitions are as in L{ts_ba_sync_prod}.
+
+    The search is the nested depth-first search of
+    Courcoubetis, Vardi, Wolper and Yannakakis,
+    with the improvements of Schwoon and Esparza:
+    a cycle is reported as soon as the inner search
+    reaches a state on the stack of the outer search.
+    It takes linear time in the size of the
+    reachable part of the product.
+
+    The guards of C{ba} are compiled once to bitmasks
+    over the atomic propositions, so finding the enabled
+    BA transitions takes a dictionary lookup,
+    instead of scanning all BA edges (as in L{find_ba_succ}).
+
+    Reference
+    =========
+    Alg. 8, p.623 U{[BK08]
+    <https://tulip-control.sourceforge.io/doc/bibliography.html#bk08>}
+
+    @type ts: L{FiniteTransitionSystem}
+    @type ba: L{BuchiAutomaton}
+
+    @return: C{None} if the product has no accepting run,
+        otherwise C{(prefix, cycle)}, where:
+          - C{prefix} is a C{list} of product states, starting
+            at an initial state and ending at a predecessor of
+            C{cycle[0]} (empty if C{cycle[0]} is initial)
+          - C{cycle} is a C{list} of product states that contains
+            an accepting state, each state is followed by
+            the next one, and the last by C{cycle[0]}.
+
+        Each product state is a pair C{(s, q)} of
+        a C{ts} state and a C{ba} state.
+    """
+    if not ba.atomic_proposition_based:
+        raise Exception(
+            'Buchi automaton not stored as Atomic Proposition-based.')
+    guards = _BAGuards(ba, ts)
+    accepting = set(ba.states.accepting)
+
+    def succ(sq):
+        s, q = sq
+        for next_s in ts.successors_iter(s):
+            for next_q in guards.post(q, next_s):
+                yield (next_s, next_q)
+
+    init = [
+        (s0, q)
+        for s0 in ts.states.initial
+        for q0 in ba.states.initial
+        for q in guards.post(q0, s0)]
+    if not init:
+        logger.debug('no initial product states')
+    visited = set()
+    red = set()
+    for sq0 in init:
+        if sq0 in visited:
+            continue
+        visited.add(sq0)
+        path = [sq0]
+        index = {sq0: 0}
+        stack = [succ(sq0)]
+        while stack:
+            sq = path[-1]
+            next_sq = next(stack[-1], None)
+            if next_sq is None:
+                # post-order: search for a cycle through `sq`
+                if sq[1] in accepting:
+                    r = _inner_dfs(sq, succ, index, red)
+                    if r is not None:
+                        j, inner = r
+                        return (path[:j], path[j:] + inner)
+                stack.pop()
+                path.pop()
+                del index[sq]
+                continue
+            # cycle closed by the outer search ?
+            if next_sq in index and (
+                    sq[1] in accepting or next_sq[1] in accepting):
+                j = index[next_sq]
+                return (path[:j], path[j:])
+            if next_sq in visited:
+                continue
+            visited.add(next_sq)
+            index[next_sq] = len(path)
+            path.append(next_sq)
+            stack.append(succ(next_sq))
+    return None
+
+
+def _inner_dfs(seed, succ, index, red):
+    """Search for a path from C{seed} to a state in C{index}.
+
+    @param index: maps states on the outer stack to their depth
+    @param red: states visited by previous inner searches
+
+    @return: C{None} if no state in C{index} is reachable,
+        otherwise C{(j, inner)}, where C{j} is the depth of
+        the state reached, and C{inner} the path after
+        C{seed} that leads to it (excluding both).
+    """
+    path = [seed]
+    stack = [succ(seed)]
+    while stack:
+        next_sq = next(stack[-1], None)
+        if next_sq is None:
+            stack.pop()
+            path.pop()
+            continue
+        if next_sq in index:
+            return (index[next_sq], path[1:])
+        if next_sq in red:
+            continue
+        red.add(next_sq)
+        path.append(next_sq)
+        stack.append(succ(next_sq))
+    return None
+
+
+class _BAGuards(object):
+    """Guards of a L{BuchiAutomaton} compiled to bitmasks.
+
+    Each set of atomic propositions maps to an C{int},
+    with one bit per proposition.
+    A letter C{{True}} matches any label,
+    otherwise letters match labels exactly,
+    as in L{find_ba_succ}.
+    """
+
+    def __init__(self, ba, ts):
+        aps = list(ba.atomic_propositions)
+        aps.extend(p for p in ts.atomic_propositions if p not in aps)
+        self._bits = {p: 1 << i for i, p in enumerate(aps)}
+        self._ts = ts
+        self._masks = dict()
+        self._exact = dict()
+        self._any = dict()
+        for q, next_q, d in ba.edges_iter(data=True):
+            letter = d.get('letter')
+            if letter is None:
+                continue
+            if letter == {True}:
+                self._any.setdefault(q, list()).append(next_q)
+                continue
+            m = self.mask(letter)
+            self._exact.setdefault(q, dict()).setdefault(
+                m, list()).append(next_q)
+
+    def mask(self, aps):
+        """Return bitmask of the set of propositions C{aps}."""
+        m = 0
+        for p in aps:
+            m |= self._bits[p]
+        return m
+
+    def label(self, s):
+        """Return bitmask of the label of TS state C{s} (cached)."""
+        m = self._masks.get(s)
+        if m is None:
+            try:
+                ap = self._ts.node[s]['ap']
+            except KeyError:
+                raise Exception(
+                    'No AP label for FTS state: ' + str(s) +
+                    '\n Did you forget labeing it ?')
+            m = self.mask(ap)
+            self._masks[s] = m
+        return m
+
+    def post(self, q, s):
+        """Return BA states reachable from C{q} on reading label of C{s}."""
+        exact = self._exact.get(q)
+        r = self._any.get(q, list())
+        if exact is None:
+            return r
+        return exact.get(self.label(s), list()) + r
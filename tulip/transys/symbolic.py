@@ -0,0 +1,827 @@
+# Copyright (c) 2017 by California Institute of Technology
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the California Institute of Technology nor
+#    the names of its contributors may be used to endorse or promote
+#    products derived from this software without specific prior
+#    written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL CALTECH
+# OR THE CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF
+# USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+# OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
+# SUCH DAMAGE.
+"""Symbolic (BDD-based) finite transition systems
+
+States, atomic propositions and actions are represented by
+bits in a binary decision diagram, so the transition relation
+is never enumerated.
+The result can be converted directly to an
+C{omega.symbolic.symbolic.Automaton} for GR(1) synthesis,
+bypassing the formulae generated by L{tulip.synth.sys_to_spec}.
+
+Conversely, L{SymbolicMealyMachine} keeps the transducer
+synthesized by C{omega} as BDDs, so controllers can be
+simulated and saved without enumerating their states.
+"""
+from __future__ import absolute_import
+import copy
+import itertools
+import logging
+import pickle
+try:
+    from dd import bdd as _bdd
+except ImportError:
+    _bdd = None
+try:
+    import omega
+    from omega.symbolic import fol as _fol
+    from omega.symbolic import symbolic as sym
+except ImportError:
+    omega = None
+
+from tulip.spec.ast import balanced_fold
+
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolicFTS(object):
+    """Finite transition system stored as BDDs.
+
+    The current state is encoded by an integer variable C{statevar},
+    ranging over the indices of C{states}.
+    Each atomic proposition is a Boolean variable,
+    and each action type an integer variable
+    ranging over the indices of its codomain.
+    If C{must} for an action type is not C{'xor'},
+    then one additional value represents "no action".
+
+    Attributes (all BDD nodes in C{bdd}):
+
+      - C{init}: initial states, over state variables
+      - C{trans}: transition relation, over current and next
+        state variables, and action variables
+      - C{labels}: labeling relation, over state variables
+        and atomic propositions.
+        States not labeled explicitly satisfy no proposition.
+
+    Action variables are primed in C{trans},
+    with the exception of system actions in an environment
+    transition system, which are current
+    (as in L{tulip.synth.env_to_spec}).
+
+    Products with L{sync_prod} and L{async_prod} yield
+    systems with more than one state variable.
+    Their states are C{tuple}s with one element per component.
+
+    Example
+    =======
+    >>> ts = SymbolicFTS(range(3), aps=['home'])
+    >>> ts.add_initial_from([0])
+    >>> ts.add_transitions_from([(0, 1), (1, 2), (2, 0)])
+    >>> ts.label(0, {'home'})
+    >>> ts.states_of(ts.post(ts.init))
+    {1}
+
+    See also
+    ========
+    L{sys_to_automaton}, L{env_to_automaton}, L{FTS}
+    """
+
+    def __init__(
+        self, states, aps=None, actions=None,
+        owner='sys', statevar='loc', bdd=None,
+        sys_actions_must='xor', env_actions_must='xor'
+    ):
+        """Declare the variables of a symbolic transition system.
+
+        @param states: iterable of hashable states
+        @param aps: iterable of atomic proposition names
+        @param actions: C{dict} that maps each action type
+            to an iterable of action values.
+            Each action type should contain C{'sys'} or C{'env'}.
+        @param owner: player that controls the state,
+            C{'sys'} or C{'env'}
+        @param statevar: name of integer variable for the state
+        @param bdd: BDD manager, created if C{None}
+        @type bdd: C{dd.bdd.BDD}
+        @param sys_actions_must: C{'xor'} or C{'mutex'}
+        @param env_actions_must: C{'xor'} or C{'mutex'}
+        """
+        _assert_omega()
+        if owner not in ('sys', 'env'):
+            raise ValueError(
+                'owner must be "sys" or "env", got: {o}'.format(o=owner))
+        states = list(states)
+        if not states:
+            raise ValueError('at least one state is required.')
+        if bdd is None:
+            bdd = _bdd.BDD()
+        self.bdd = bdd
+        self.owner = owner
+        self.aps = list(aps) if aps is not None else list()
+        self.actions = dict()
+        self.sys_actions_must = sys_actions_must
+        self.env_actions_must = env_actions_must
+        self.statevars = [statevar]
+        self._states = {statevar: states}
+        self._state_ids = {statevar: {s: i for i, s in enumerate(states)}}
+        dvars = {statevar: (0, len(states) - 1)}
+        owners = {statevar: owner}
+        for ap in self.aps:
+            dvars[ap] = 'bool'
+            owners[ap] = owner
+        if actions is None:
+            actions = dict()
+        self._none = dict()
+        for action_type, codomain in actions.items():
+            if 'sys' in action_type:
+                action_owner = 'sys'
+                must = sys_actions_must
+            elif 'env' in action_type:
+                action_owner = 'env'
+                must = env_actions_must
+            else:
+                raise ValueError((
+                    'action type "{t}" should contain '
+                    '"sys" or "env"').format(t=action_type))
+            if must not in ('xor', 'mutex'):
+                raise ValueError(
+                    'unsupported `must`: {m}'.format(m=must))
+            codomain = list(codomain)
+            if not codomain:
+                continue
+            self.actions[action_type] = codomain
+            n = len(codomain)
+            if must == 'xor':
+                n -= 1
+            else:
+                self._none[action_type] = n
+            dvars[action_type] = (0, n)
+            owners[action_type] = action_owner
+        self._action_ids = {
+            t: {a: i for i, a in enumerate(c)}
+            for t, c in self.actions.items()}
+        self._dvars = dvars
+        self._owners = owners
+        self._aut = _build_vars(dvars, owners, bdd)
+        self.init = bdd.false
+        self.trans = bdd.false
+        self.labels = _conj(
+            [bdd.var(ap) for ap in self.aps], bdd, unary='!')
+
+    def __str__(self):
+        return (
+            'Symbolic transition system\n'
+            '  owner: {owner}\n'
+            '  state variables: {statevars}\n'
+            '  atomic propositions: {aps}\n'
+            '  actions: {actions}\n'
+            '  BDD nodes: {n}\n').format(
+                owner=self.owner,
+                statevars=self.statevars,
+                aps=self.aps,
+                actions=self.actions,
+                n=len(self.bdd))
+
+    @classmethod
+    def from_fts(cls, fts, statevar='loc', bdd=None):
+        """Return L{SymbolicFTS} equivalent to the L{FTS} C{fts}."""
+        ts = cls(
+            fts.states, aps=fts.aps, actions=fts.actions,
+            owner=fts.owner, statevar=statevar, bdd=bdd,
+            sys_actions_must=fts.sys_actions_must,
+            env_actions_must=fts.env_actions_must)
+        ts.add_initial_from(fts.states.initial)
+        for u, d in fts.states.find():
+            ap = d.get('ap')
+            if ap:
+                ts.label(u, ap)
+        ts.add_transitions_from(fts.transitions.find())
+        return ts
+
+    @property
+    def vars(self):
+        """Return table of integer and Boolean variables.
+
+        The table is in the format of C{omega}, including
+        the names of bits that encode each integer.
+        """
+        return self._aut.vars
+
+    def add_initial_from(self, states):
+        """Mark C{states} as initial."""
+        u = self.state_set(states)
+        self.init = self.bdd.apply('or', self.init, u)
+
+    def label(self, state, aps):
+        """Label C{state} with the set of propositions C{aps}.
+
+        Replaces any previous label of C{state}.
+        """
+        aps = set(aps)
+        missing = aps.difference(self.aps)
+        if missing:
+            raise ValueError(
+                'undeclared atomic propositions: {m}'.format(m=missing))
+        bdd = self.bdd
+        s = self._state_cube(state)
+        values = {ap: ap in aps for ap in self.aps}
+        u = bdd.apply('and', s, bdd.cube(values))
+        other = bdd.apply('diff', self.labels, s)
+        self.labels = bdd.apply('or', other, u)
+
+    def add_transition(self, from_state, to_state, **actions):
+        """Add a transition labeled with C{actions}.
+
+        @param actions: maps action types to action values.
+            Action types that are absent are unconstrained.
+        """
+        self.add_transitions_from([(from_state, to_state, actions)])
+
+    def add_transitions_from(self, transitions):
+        """Add multiple transitions.
+
+        The disjunction is taken over a balanced tree,
+        which keeps intermediate BDDs smaller than
+        adding transitions one at a time.
+
+        @param transitions: iterable of C{(u, v)} or C{(u, v, actions)},
+            where C{actions} is as in L{add_transition}.
+        """
+        bdd = self.bdd
+        edges = list()
+        for t in transitions:
+            if len(t) == 2:
+                u, v = t
+                actions = dict()
+            else:
+                u, v, actions = t
+            values = self._state_bits(u)
+            values.update(self._state_bits(v, primed=True))
+            for action_type, value in actions.items():
+                if action_type not in self.actions:
+                    continue
+                values.update(self._action_bits(action_type, value))
+            edges.append(bdd.cube(values))
+        u = _disj(edges, bdd)
+        self.trans = bdd.apply('or', self.trans, u)
+
+    def state_set(self, states):
+        """Return BDD node for the set of C{states}."""
+        cubes = [self._state_cube(s) for s in states]
+        return _disj(cubes, self.bdd)
+
+    def states_of(self, u):
+        """Return C{set} of states in the BDD node C{u}.
+
+        The support of C{u} must be contained in
+        the bits of the state variables.
+        """
+        bdd = self.bdd
+        bits = self._bits(self.statevars)
+        table = self.vars
+        r = set()
+        for model in bdd.sat_iter(u, full=True, care_bits=bits):
+            state = list()
+            for var in self.statevars:
+                bitnames = table[var]['bitnames']
+                i = sum(model[b] << j for j, b in enumerate(bitnames))
+                domain = self._states[var]
+                if i >= len(domain):
+                    break
+                state.append(domain[i])
+            else:
+                if len(state) == 1:
+                    (state,) = state
+                else:
+                    state = tuple(state)
+                r.add(state)
+        return r
+
+    def post(self, u):
+        """Return states reachable in one step from the set C{u}.
+
+        @param u: BDD node over state variables
+        """
+        bdd = self.bdd
+        prime = self._aut.prime
+        bits = self._bits(self.statevars)
+        rename = {prime[b]: b for b in bits}
+        qvars = set(bits)
+        qvars.update(self._action_qvars())
+        return _bdd.image(self.trans, u, rename, qvars, bdd)
+
+    def pre(self, u):
+        """Return states with a successor in the set C{u}.
+
+        @param u: BDD node over state variables
+        """
+        bdd = self.bdd
+        prime = self._aut.prime
+        bits = self._bits(self.statevars)
+        rename = {b: prime[b] for b in bits}
+        qvars = set(rename.values())
+        qvars.update(self._action_qvars())
+        return _bdd.preimage(self.trans, u, rename, qvars, bdd)
+
+    def reachable(self):
+        """Return states reachable from C{init} (least fixpoint)."""
+        bdd = self.bdd
+        r = self.init
+        rold = None
+        while r != rold:
+            rold = r
+            r = bdd.apply('or', r, self.post(r))
+        return r
+
+    def sync_prod(self, other):
+        """Return synchronous product with C{other}.
+
+        Both systems move simultaneously.
+        Shared action types and atomic propositions
+        must take the same values in both.
+        """
+        ts = self._product_shell(other)
+        bdd = self.bdd
+        ts.trans = bdd.apply('and', self.trans, other.trans)
+        return ts
+
+    def async_prod(self, other):
+        """Return asynchronous (interleaving) product with C{other}.
+
+        At each step exactly one of the two systems moves,
+        while the state of the other remains unchanged.
+        """
+        ts = self._product_shell(other)
+        bdd = self.bdd
+        stay_self = ts._frame(self.statevars)
+        stay_other = ts._frame(other.statevars)
+        u = bdd.apply('and', self.trans, stay_other)
+        v = bdd.apply('and', other.trans, stay_self)
+        ts.trans = bdd.apply('or', u, v)
+        return ts
+
+    def _product_shell(self, other):
+        """Return L{SymbolicFTS} with the variables of both."""
+        if other.bdd is not self.bdd:
+            raise ValueError(
+                'product requires both systems to use the same BDD.')
+        if other.owner != self.owner:
+            raise ValueError(
+                'product requires both systems to have the same owner.')
+        common = set(self.statevars).intersection(other.statevars)
+        if common:
+            raise ValueError(
+                'state variables must differ, both have: {c}'.format(
+                    c=common))
+        for t in set(self.actions).intersection(other.actions):
+            if self.actions[t] != other.actions[t]:
+                raise ValueError((
+                    'action type "{t}" has different '
+                    'codomains').format(t=t))
+        bdd = self.bdd
+        ts = copy.copy(self)
+        ts.statevars = self.statevars + other.statevars
+        ts._states = dict(self._states)
+        ts._states.update(other._states)
+        ts._state_ids = dict(self._state_ids)
+        ts._state_ids.update(other._state_ids)
+        ts.aps = self.aps + [p for p in other.aps if p not in self.aps]
+        ts.actions = dict(self.actions)
+        ts.actions.update(other.actions)
+        ts._action_ids = dict(self._action_ids)
+        ts._action_ids.update(other._action_ids)
+        ts._none = dict(self._none)
+        ts._none.update(other._none)
+        ts._dvars = dict(self._dvars)
+        ts._dvars.update(other._dvars)
+        ts._owners = dict(self._owners)
+        ts._owners.update(other._owners)
+        ts._aut = _build_vars(ts._dvars, ts._owners, bdd)
+        ts.init = bdd.apply('and', self.init, other.init)
+        ts.labels = bdd.apply('and', self.labels, other.labels)
+        return ts
+
+    @property
+    def states(self):
+        """Return iterable over states.
+
+        For products, this is an iterator over C{tuple}s.
+        """
+        if len(self.statevars) == 1:
+            (var,) = self.statevars
+            return self._states[var]
+        return itertools.product(
+            *[self._states[var] for var in self.statevars])
+
+    def _state_cube(self, state):
+        return self.bdd.cube(self._state_bits(state))
+
+    def _state_bits(self, state, primed=False):
+        if len(self.statevars) == 1:
+            state = (state,)
+        values = dict()
+        for var, s in zip(self.statevars, state):
+            try:
+                i = self._state_ids[var][s]
+            except KeyError:
+                raise ValueError(
+                    'unknown state: {s}'.format(s=s))
+            values.update(self._int_bits(var, i, primed))
+        return values
+
+    def _action_bits(self, action_type, value):
+        i = self._action_ids[action_type][value]
+        primed = not (self.owner == 'env' and 'sys' in action_type)
+        return self._int_bits(action_type, i, primed)
+
+    def _int_bits(self, var, i, primed=False):
+        bitnames = self.vars[var]['bitnames']
+        if primed:
+            prime = self._aut.prime
+            bitnames = [prime[b] for b in bitnames]
+        return {b: bool(i >> j & 1) for j, b in enumerate(bitnames)}
+
+    def _bits(self, variables):
+        table = self.vars
+        r = list()
+        for var in variables:
+            d = table[var]
+            if d['type'] == 'bool':
+                r.append(var)
+            else:
+                r.extend(d['bitnames'])
+        return r
+
+    def _action_qvars(self):
+        bits = self._bits(self.actions)
+        prime = self._aut.prime
+        return set(bits).union(prime[b] for b in bits)
+
+    def _frame(self, variables):
+        """Return BDD node that keeps C{variables} unchanged."""
+        bdd = self.bdd
+        prime = self._aut.prime
+        r = [bdd.apply('<->', bdd.var(b), bdd.var(prime[b]))
+             for b in self._bits(variables)]
+        return _conj(r, bdd)
+
+    def _prime(self, u):
+        bits = self._bits(self.statevars)
+        bits.extend(self.aps)
+        prime = self._aut.prime
+        return self.bdd.rename(u, {b: prime[b] for b in bits})
+
+
+class SymbolicMealyMachine(object):
+    """Mealy machine stored as the BDDs of a symbolic transducer.
+
+    The state of the machine is the valuation of all variables,
+    including the memory variables that the synthesizer adds
+    (their names start with C{'_'}).
+    Each reaction substitutes the current state and next inputs
+    in the transition relation, and picks an assignment to the
+    next outputs and memory, so the states are never enumerated.
+
+    Same interface for simulation as L{MealyMachine}:
+    L{reaction} and L{run}, starting from the state C{'Sinit'}.
+
+    Attributes:
+
+      - C{inputs}, C{outputs}: C{dict} that maps each
+        environment or system variable to its domain,
+        as in L{tulip.spec.form.GRSpec}
+      - C{vars}: table of variables, in the format of C{omega}
+      - C{init}: BDD of initial states
+      - C{action}: BDD of transition relation of the controller
+      - C{env_action}: BDD of environment assumption
+        about the next inputs
+
+    Example
+    =======
+    >>> m = synth.synthesize(specs, sys=ts, symbolic=True)
+    >>> state, outputs = m.reaction('Sinit', dict(x=0))
+    >>> state, outputs = m.reaction(state, dict(x=1))
+
+    See also
+    ========
+    L{tulip.interfaces.omega.synthesize_symbolic}
+    """
+
+    initial_state = 'Sinit'
+
+    def __init__(self, transducer, inputs, outputs):
+        """Wrap a transducer synthesized by C{omega}.
+
+        @param transducer: built automaton, with one BDD
+            in each of C{init['env']}, C{action['env']}
+            and C{action['sys']}
+        @type transducer: C{omega.symbolic.symbolic.Automaton}
+        @param inputs: environment variables and their domains
+        @type inputs: C{dict}
+        @param outputs: system variables and their domains
+        @type outputs: C{dict}
+        """
+        _assert_omega()
+        t = transducer
+        self.bdd = t.bdd
+        self.vars = copy.deepcopy(t.vars)
+        self.inputs = dict(inputs)
+        self.outputs = dict(outputs)
+        (self.init, ) = t.init['env']
+        (self.env_action, ) = t.action['env']
+        (self.action, ) = t.action['sys']
+        self._init_context()
+
+    def _init_context(self):
+        self._fol = _fol.Context()
+        self._fol.bdd = self.bdd
+        self._fol.vars = sym._prime_and_order_table(self.vars)
+        self._env = {
+            k for k, d in self.vars.items() if d['owner'] == 'env'}
+        self._sys = set(self.vars).difference(self._env)
+        self._sys_next = {k + "'" for k in self._sys}
+        # integer values of string variables
+        self._str2int = dict()
+        for k, dom in itertools.chain(
+                self.inputs.items(), self.outputs.items()):
+            if isinstance(dom, list):
+                self._str2int[k] = {x: i for i, x in enumerate(dom)}
+
+    def __str__(self):
+        return (
+            'Symbolic Mealy machine\n'
+            '  inputs: {inputs}\n'
+            '  outputs: {outputs}\n'
+            '  BDD nodes: {n}\n').format(
+                inputs=self.inputs,
+                outputs=self.outputs,
+                n=len(self.bdd.descendants([self.init, self.action])))
+
+    def reaction(self, from_state, inputs):
+        """Return next state and outputs, when reacting to C{inputs}.
+
+        @param from_state: C{'Sinit'}, or state returned by
+            a previous reaction
+        @type from_state: C{'Sinit'} or C{dict}
+        @param inputs: value of each input variable
+        @type inputs: C{dict}
+        @return: C{(next_state, outputs)}, where C{next_state}
+            maps each variable to an integer, and C{outputs}
+            maps each output variable to its value
+        @rtype: C{tuple} of two C{dict}
+        """
+        missing = set(self.inputs).difference(inputs)
+        if missing:
+            raise ValueError(
+                'missing input port(s): {m}'.format(m=missing))
+        x = {k: self._to_int(k, v) for k, v in inputs.items()}
+        fol = self._fol
+        if from_state == self.initial_state:
+            u = fol.replace(self.init, x)
+            care = self._sys
+        else:
+            next_x = {k + "'": v for k, v in x.items()}
+            v = fol.replace(self.env_action, from_state)
+            v = fol.replace(v, next_x)
+            if v == self.bdd.false:
+                raise ValueError(
+                    'inputs {x} violate the assumption '
+                    'at state {s}'.format(x=inputs, s=from_state))
+            u = fol.replace(self.action, from_state)
+            u = fol.replace(u, next_x)
+            care = self._sys_next
+        if u == self.bdd.false:
+            raise ValueError(
+                'no reaction to inputs {x} at state {s}'.format(
+                    x=inputs, s=from_state))
+        d = fol.pick(u, full=True, care_vars=care)
+        state = dict(x)
+        state.update((k.rstrip("'"), v) for k, v in d.items())
+        outputs = {k: self._from_int(k, state[k]) for k in self.outputs}
+        return state, outputs
+
+    def run(self, from_state=None, input_sequences=None):
+        """Return states and outputs of guided run.
+
+        @param input_sequences: one list of values for each input
+        @type input_sequences: C{dict} of C{list}
+        @return: see L{machines.guided_run}
+        """
+        from tulip.transys.machines import guided_run
+        if from_state is None:
+            from_state = self.initial_state
+        return guided_run(self, from_state, input_sequences)
+
+    def dump(self, filename):
+        """Write the machine to a pickle file.
+
+        Only the BDDs of the machine are copied to the file,
+        not other nodes of the BDD manager.
+        """
+        _assert_omega()
+        other = _bdd.BDD()
+        # same order, which may differ from the order of addition
+        levels = self.bdd.vars
+        for var in sorted(levels, key=levels.get):
+            other.add_var(var)
+        init, env_action, action = (
+            self.bdd.copy(u, other)
+            for u in (self.init, self.env_action, self.action))
+        d = dict(
+            vars=self.vars, inputs=self.inputs, outputs=self.outputs,
+            bdd=other, init=init, env_action=env_action, action=action)
+        with open(filename, 'wb') as f:
+            pickle.dump(d, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, filename):
+        """Return machine from file written by L{dump}."""
+        with open(filename, 'rb') as f:
+            d = pickle.load(f)
+        m = cls.__new__(cls)
+        m.bdd = d['bdd']
+        m.vars = d['vars']
+        m.inputs = d['inputs']
+        m.outputs = d['outputs']
+        m.init = d['init']
+        m.env_action = d['env_action']
+        m.action = d['action']
+        m._init_context()
+        return m
+
+    def _to_int(self, var, value):
+        if var in self._str2int:
+            return self._str2int[var][value]
+        if self.vars[var]['type'] == 'bool':
+            return bool(value)
+        return int(value)
+
+    def _from_int(self, var, value):
+        if var in self._str2int:
+            return self.outputs[var][value]
+        if self.vars[var]['type'] == 'bool':
+            return bool(value)
+        return value
+
+
+def sys_to_automaton(ts, ignore_initial=False):
+    """Return symbolic automaton for system transition system C{ts}.
+
+    Symbolic analogue of L{tulip.synth.sys_to_spec}.
+    The state, atomic propositions and system actions
+    are system variables, the environment actions are
+    environment variables.
+
+    The result is compiled (C{build} need not be called).
+    To add further requirements, conjoin BDD nodes to
+    C{init}, C{action} and C{win} of the result,
+    for example using its method C{add_expr}.
+    The attributes C{moore}, C{plus_one} and C{qinit}
+    have the same defaults as in L{GRSpec}, set them as needed.
+
+    @type ts: L{SymbolicFTS} with C{owner = 'sys'}
+    @param ignore_initial: omit C{ts.init}
+    @rtype: C{omega.symbolic.symbolic.Automaton}
+    """
+    if ts.owner != 'sys':
+        raise ValueError('expected system transition system.')
+    bdd = ts.bdd
+    a = _new_automaton(ts)
+    (sys_init,) = a.init['sys']
+    (sys_action,) = a.action['sys']
+    (env_action,) = a.action['env']
+    if not ignore_initial:
+        sys_init = bdd.apply('and', sys_init, ts.init)
+    sys_init = bdd.apply('and', sys_init, ts.labels)
+    u = bdd.apply('and', ts.trans, ts._prime(ts.labels))
+    sys_action = bdd.apply('and', sys_action, u)
+    # constrain env actions to those available at the current state
+    env_actions = [t for t in ts.actions if 'env' in t]
+    if env_actions:
+        prime = a.prime
+        env_bits = {prime[b] for b in ts._bits(env_actions)}
+        qvars = {b for b in bdd.support(ts.trans)
+                 if b not in env_bits}
+        qvars.difference_update(ts._bits(ts.statevars))
+        avail = bdd.exist(qvars, ts.trans)
+        qvars = {b for b in bdd.support(ts.trans)
+                 if b not in ts._bits(ts.statevars)}
+        deadend = bdd.apply('not', bdd.exist(qvars, ts.trans))
+        avail = bdd.apply('or', avail, deadend)
+        env_action = bdd.apply('and', env_action, avail)
+    a.init['sys'] = [sys_init]
+    a.action['sys'] = [sys_action]
+    a.action['env'] = [env_action]
+    return a
+
+
+def env_to_automaton(ts, ignore_initial=False):
+    """Return symbolic automaton for environment transition system C{ts}.
+
+    Symbolic analogue of L{tulip.synth.env_to_spec}.
+    The state, atomic propositions and environment actions
+    are environment variables, the system actions are
+    system variables.
+    Unlike L{tulip.synth.env_to_spec}, no disjunct is added
+    for states without any transition that is free of
+    system actions.
+
+    @type ts: L{SymbolicFTS} with C{owner = 'env'}
+    @rtype: C{omega.symbolic.symbolic.Automaton}
+    """
+    if ts.owner != 'env':
+        raise ValueError('expected environment transition system.')
+    bdd = ts.bdd
+    a = _new_automaton(ts)
+    (env_init,) = a.init['env']
+    (env_action,) = a.action['env']
+    if not ignore_initial:
+        env_init = bdd.apply('and', env_init, ts.init)
+    env_init = bdd.apply('and', env_init, ts.labels)
+    u = bdd.apply('and', ts.trans, ts._prime(ts.labels))
+    env_action = bdd.apply('and', env_action, u)
+    a.init['env'] = [env_init]
+    a.action['env'] = [env_action]
+    return a
+
+
+def _new_automaton(ts):
+    """Return compiled automaton with the type invariants of C{ts}."""
+    aut = ts._aut
+    a = copy.copy(aut)
+    a.vars = copy.deepcopy(aut.vars)
+    for attr in ('uvars', 'upvars', 'ubvars',
+                 'evars', 'epvars', 'ebvars',
+                 'uevars', 'uepvars'):
+        setattr(a, attr, set(getattr(aut, attr)))
+    a.prime = dict(aut.prime)
+    a.unprime = dict(aut.unprime)
+    a.win = {'<>[]': [ts.bdd.false], '[]<>': [ts.bdd.true]}
+    a.moore = True
+    a.plus_one = True
+    a.qinit = r'\A \A'
+    return a
+
+
+def _build_vars(dvars, owners, bdd):
+    """Return compiled C{omega} automaton declaring C{dvars} in C{bdd}.
+
+    The automaton's C{init} and C{action} contain the type invariants.
+    """
+    aut = sym.Automaton()
+    for var, dom in dvars.items():
+        if dom == 'bool':
+            d = dict(type='bool', dom=None)
+        else:
+            d = dict(type='saturating', dom=dom)
+        d['owner'] = owners[var]
+        aut.vars[var] = d
+    aut.bdd = bdd
+    sym.fill_blanks(aut)
+    return aut.build()
+
+
+def _disj(nodes, bdd):
+    """Return disjunction of C{nodes}, over a balanced tree."""
+    return balanced_fold(
+        lambda u, v: bdd.apply('or', u, v), nodes, bdd.false)
+
+
+def _conj(nodes, bdd, unary=''):
+    """Return conjunction of C{nodes}, negated if C{unary = '!'}."""
+    nodes = list(nodes)
+    if unary == '!':
+        nodes = [bdd.apply('not', u) for u in nodes]
+    return balanced_fold(
+        lambda u, v: bdd.apply('and', u, v), nodes, bdd.true)
+
+
+def _assert_omega():
+    if _bdd is None:
+        raise ImportError(
+            'Failed to import `dd.bdd`.\n'
+            'Install package `dd`.')
+    if omega is None:
+        raise ImportError(
+            'Failed to import package `omega`.')
@@ -447,14 +447,10 @@ class FiniteTransitionSystem(LabeledDiGraph):
         if fileformat not in {'promela', 'Promela', 'pml'}:
             return False
         # closed ?
-        if self.env_vars:
+        if self.actions.get('env_actions'):
             return False
-        from tulip.transys.export import graph2promela
-        s = graph2promela.fts2promela(self, self.name)
-        # dump to file
-        f = open(path, 'w')
-        f.write(s)
-        f.close()
+        from tulip.transys.export import stream
+        stream.write_promela(self, path, self.name)
         return True
 
 